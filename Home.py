@@ -7,20 +7,21 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import altair as alt
 
 from app.lib.session import init_session, is_logged_in
 from app.lib.auth_ui import auth_sidebar
 from app.lib.repos import (
-    get_my_role,
-    ensure_my_profile,
     set_my_role,
     cached_list_recipes,
     cached_list_recipe_ingredients,
     cached_list_profiles_by_ids,
     cached_list_recipe_seasons,
 )
+from app.lib import replica
+from app.lib.catalog import catalog_for
 from app.lib.ui import load_css, set_full_page_background
 from app.lib.brand import sidebar_brand
 
@@ -195,9 +196,7 @@ if not is_logged_in():
 token = st.session_state.session.access_token
 user_id = st.session_state.session.user.id
 
-ensure_my_profile(token, user_id)
-st.session_state.role = get_my_role(token, user_id)
-
+# Profile + role are resolved once per access token by init_session()
 role = (st.session_state.role or "reader")
 is_editor = (role == "editor")
 
@@ -236,7 +235,6 @@ if role != "editor":
 
             set_my_role(token, user_id, "editor")
             st.session_state.role = "editor"
-            st.cache_data.clear()
             st.success("Upgraded to editor ✅")
             st.rerun()
 
@@ -285,8 +283,9 @@ st.divider()
 st.markdown('<div class="home-analytics-title">📊 Cookbook analytics</div>', unsafe_allow_html=True)
 
 
-@st.cache_data(ttl=60, show_spinner=False)
 def _load_home_stats(access_token: str):
+    if replica.ensure_synced(access_token):
+        return replica.load_catalog()
     recipes_ = cached_list_recipes(access_token)
     links_ = cached_list_recipe_ingredients(access_token)
     seasons_ = cached_list_recipe_seasons(access_token)
@@ -296,17 +295,10 @@ def _load_home_stats(access_token: str):
 with st.spinner("Loading cookbook stats…"):
     recipes, links, seasons_rows = _load_home_stats(token)
 
-df_recipes = pd.DataFrame(recipes)
-df_links = pd.DataFrame(links)
-df_seasons = pd.DataFrame(seasons_rows)
-
-# Ensure columns exist
-for col in ["id", "name", "total_minutes", "created_by", "created_at"]:
-    if col not in df_recipes.columns:
-        df_recipes[col] = None
+catalog = catalog_for(recipes, links, seasons_rows)
 
 # Creator names
-creator_ids = tuple(sorted(df_recipes["created_by"].dropna().unique().tolist()))
+creator_ids = tuple(sorted(catalog.creators))
 profiles = cached_list_profiles_by_ids(token, creator_ids)
 
 id_to_name = {}
@@ -316,16 +308,24 @@ for p in (profiles or []):
     full = (fn + " " + ln).strip()
     id_to_name[p["id"]] = full if full else "Unknown"
 
-df_recipes["creator_name"] = df_recipes["created_by"].map(lambda uid: id_to_name.get(uid, "Unknown"))
+# Only the columns used below (no per-recipe dicts)
+creator_labels = np.array([id_to_name.get(uid, "Unknown") for uid in catalog.creators] + ["Unknown"], dtype=object)
+df_recipes = pd.DataFrame({
+    "id": catalog.ids,
+    "name": catalog.names,
+    "total_minutes": catalog.total_minutes,
+    "created_by": [catalog.creators[c] if c >= 0 else None for c in catalog.creator_codes],
+    "created_at": catalog.created_at,
+    "creator_name": creator_labels[catalog.creator_codes],
+})
 
 # KPIs
-total_recipes = int(len(df_recipes))
-total_links = int(len(df_links))
+ingredient_usage = pd.Series(catalog.ingredient_usage(), index=catalog.ingredient_names, dtype="int64")
+ingredient_usage = ingredient_usage[ingredient_usage.index != ""].groupby(level=0).sum()
 
-unique_ingredients = 0
-if not df_links.empty and "ingredients" in df_links.columns:
-    ing_names = df_links["ingredients"].apply(lambda x: (x or {}).get("name", "")).replace("", pd.NA).dropna()
-    unique_ingredients = int(ing_names.nunique())
+total_recipes = len(catalog)
+total_links = int(catalog.line_offsets[-1])
+unique_ingredients = int((ingredient_usage > 0).sum())
 
 t = pd.to_numeric(df_recipes["total_minutes"], errors="coerce").dropna()
 avg_time = int(t.mean()) if not t.empty else 0
@@ -366,11 +366,10 @@ left, right = st.columns([1.15, 1.0], gap="large")
 with left:
     with st.container(border=True):
         st.markdown("### Most used ingredients")
-        if df_links.empty or "ingredients" not in df_links.columns:
+        if ingredient_usage.empty:
             st.info("No ingredient usage data yet.")
         else:
-            ing_names = df_links["ingredients"].apply(lambda x: (x or {}).get("name", "")).replace("", pd.NA).dropna()
-            top_ing = ing_names.value_counts().head(12).reset_index()
+            top_ing = ingredient_usage.sort_values(ascending=False).head(12).reset_index()
             top_ing.columns = ["ingredient", "count"]
 
             chart = (
@@ -418,17 +417,11 @@ with right:
         st.markdown("### Recipes by season")
         ALL_SEASONS = ["winter", "spring", "summer", "fall"]
 
-        if df_seasons.empty or "season" not in df_seasons.columns:
+        season_totals = catalog.season_counts()
+        if not any(season_totals.values()):
             st.info("No season links yet.")
         else:
-            season_counts = (
-                df_seasons["season"]
-                .value_counts()
-                .reindex(ALL_SEASONS)
-                .fillna(0)
-                .astype(int)
-                .reset_index()
-            )
+            season_counts = pd.Series(season_totals).reindex(ALL_SEASONS).fillna(0).astype(int).reset_index()
             season_counts.columns = ["season", "count"]
 
             chart = (
@@ -1,5 +1,5 @@
 import streamlit as st
-from app.lib.session import init_session, logout
+from app.lib.session import init_session, logout, set_session
 from app.lib.supabase_client import get_supabase
 from supabase_auth.errors import AuthApiError, AuthWeakPasswordError
 
@@ -26,8 +26,7 @@ def auth_sidebar():
         if st.button("Login", key="login_btn"):
             try:
                 res = sb.auth.sign_in_with_password({"email": email.strip(), "password": password})
-                st.session_state.session = res.session
-                st.session_state.user = res.user
+                set_session(res.session, res.user)
                 st.rerun()
             except AuthApiError as e:
                 msg = str(e)
@@ -78,16 +77,14 @@ def auth_sidebar():
 
                 # 2) If Supabase returns a session, log them in directly
                 if getattr(res, "session", None):
-                    st.session_state.session = res.session
-                    st.session_state.user = res.user
+                    set_session(res.session, res.user)
                     st.success("Account created ✅ Logged in.")
                     st.rerun()
 
                 # 3) Otherwise, try to sign in immediately (works when email confirmation is OFF)
                 try:
                     login = sb.auth.sign_in_with_password({"email": em, "password": signup_pw})
-                    st.session_state.session = login.session
-                    st.session_state.user = login.user
+                    set_session(login.session, login.user)
                     st.success("Account created ✅ Logged in.")
                     st.rerun()
                 except Exception:
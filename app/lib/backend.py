@@ -0,0 +1,43 @@
+from typing import Dict, List, Optional, Protocol
+
+# =========================
+# Repository backend interface
+# =========================
+# The read and bulk operations of app/lib/repos.py that have more than one
+# implementation. The default one is PostgREST (the repos functions
+# themselves); REPO_BACKEND=postgres routes them to a direct Postgres
+# connection pool instead (app/lib/pg_backend.py). Writes that go through
+# RPCs and single-row edits stay on PostgREST in both modes.
+#
+# Every method takes the caller's access token: row level security applies
+# as that user whatever the transport. Rows are returned in PostgREST's JSON
+# shapes (uuids and timestamps as ISO strings). Ingredient lines carry
+# ingredient_id only; repos names them from the ingredient dictionary.
+
+
+class RepoBackend(Protocol):
+    def list_profiles_by_ids(self, access_token: str, user_ids: List[str]) -> List[Dict]: ...
+
+    def list_ingredients(self, access_token: str) -> List[Dict]: ...
+
+    def list_ingredients_by_ids(self, access_token: str, ingredient_ids: List[str]) -> List[Dict]: ...
+
+    def list_recipes(self, access_token: str) -> List[Dict]: ...
+
+    def list_my_recipes(self, access_token: str, user_id: str) -> List[Dict]: ...
+
+    def list_recipe_ingredients(self, access_token: str) -> List[Dict]: ...
+
+    def get_recipe_ingredients(self, access_token: str, recipe_id: str) -> List[Dict]: ...
+
+    def list_recipe_seasons(self, access_token: str) -> List[Dict]: ...
+
+    def get_recipe_seasons(self, access_token: str, recipe_id: str) -> List[str]: ...
+
+    def list_recipes_page(self, access_token: str, after_id: Optional[str], limit: int) -> List[Dict]: ...
+
+    def list_recipe_seasons_range(self, access_token: str, first_id: str, last_id: str) -> List[Dict]: ...
+
+    def list_recipe_ingredients_range(self, access_token: str, first_id: str, last_id: str) -> List[Dict]: ...
+
+    def import_recipes(self, access_token: str, recipes: List[Dict]) -> int: ...
@@ -0,0 +1,531 @@
+import functools
+import inspect
+import logging
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+
+# =========================
+# Stale-while-revalidate
+# =========================
+class SWRCache:
+    """
+    Process-wide stale-while-revalidate cache for ONE value (e.g. a catalog table).
+
+    - age < ttl              -> served as is
+    - ttl <= age < max_stale -> served immediately, refreshed in a background thread
+    - age >= max_stale/empty -> blocking reload (the only case a caller waits)
+    - seeded / patched       -> served as is, refreshed in a background thread
+
+    When the caller passes the table's current data `version` (see
+    VersionProbe), it replaces the clock: a value loaded at that version is
+    fresh whatever its age, and one loaded at another version is stale at once.
+
+    The refreshed value is swapped in atomically under the lock, so readers see
+    either the old or the new value, never a partial one. Values are shared by
+    every session: treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_stale: float,
+        on_update: Optional[Callable[[Any], None]] = None,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_stale = max(max_stale, ttl)
+        # Called with the new value after every successful (re)load
+        self.on_update = on_update
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._loaded_at: Optional[float] = None
+        self._refreshing = False
+        # Value came from seed() / patch(): serve it, revalidate on first use
+        self._unverified = False
+        # Bumped by clear(): a load that started before a write must not be swapped in after it
+        self._generation = 0
+        # Data version the value was loaded at (None: unknown)
+        self._version: Any = None
+        # Wall-clock time of the last local patch()/clear(): data published by
+        # other processes before it predates this process's write
+        self.changed_at = 0.0
+        self.last_error: Optional[Exception] = None
+
+    def get(self, loader: Callable[[], Any], version: Any = None) -> Any:
+        with self._lock:
+            loaded_at = self._loaded_at
+            value = self._value
+            generation = self._generation
+            age = None if loaded_at is None else time.monotonic() - loaded_at
+
+            if age is not None and version is not None and version == self._version:
+                return value
+
+            if age is not None and age < self.ttl and not self._unverified and version is None:
+                return value
+
+            if age is not None and (age < self.max_stale or self._unverified):
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._refresh, args=(loader, generation, version), daemon=True, name=f"swr-{self.name}"
+                    ).start()
+                return value
+
+        # Empty or too stale: block on the reload
+        fresh = loader()
+        self._swap(fresh, generation, version)
+        return fresh
+
+    def _refresh(self, loader: Callable[[], Any], generation: int, version: Any = None):
+        try:
+            # `version` was read before the load started: a write during the
+            # load moves the version again, so the next get() reloads
+            self._swap(loader(), generation, version)
+        except Exception as e:
+            # Keep serving the stale value; the next get() past ttl retries.
+            self.last_error = e
+            log.warning("SWR refresh of %s failed: %s", self.name, e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _swap(self, value: Any, generation: int, version: Any = None):
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._value = value
+            self._loaded_at = time.monotonic()
+            self._unverified = False
+            self._version = version
+            self.last_error = None
+        if self.on_update is not None:
+            try:
+                self.on_update(value)
+            except Exception as e:
+                log.warning("SWR on_update for %s failed: %s", self.name, e)
+
+    def seed(self, value: Any, version: Any = None):
+        """
+        Preload a value of unknown age (e.g. from an on-disk snapshot). It is served
+        immediately, whatever max_stale says, and revalidated in the background by
+        the first get() (which brings the loader / credentials to do so), unless
+        that get() finds it is still at `version`.
+        """
+        with self._lock:
+            if self._loaded_at is not None:
+                return
+            self._value = value
+            self._loaded_at = time.monotonic()
+            self._unverified = True
+            self._version = version
+
+    def patch(self, fn: Callable[[Any], Any]):
+        """
+        Apply a local edit right after a write: `fn(old) -> new` (must build a new
+        value, not mutate the shared one). The patched value is served at once and
+        reconciled with the database by a background refresh on the next get().
+        No-op if nothing is loaded yet.
+        """
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._value = fn(self._value)
+            self._unverified = True
+            self._version = None
+            # A refresh that started before the write would overwrite the patch
+            self._generation += 1
+            self.changed_at = time.time()
+
+    def peek(self) -> Any:
+        """Current value without loading (None if empty)."""
+        with self._lock:
+            return self._value
+
+    def clear(self):
+        """Drop the value: the next get() reloads (blocking). Used after writes."""
+        with self._lock:
+            self._value = None
+            self._loaded_at = None
+            self._unverified = False
+            self._version = None
+            self._generation += 1
+            self.changed_at = time.time()
+
+
+# =========================
+# Data versions (cheap freshness probe)
+# =========================
+class VersionProbe:
+    """
+    Process-wide view of per-table data versions ({table: counter}), read by a
+    cheap probe at most every `interval` seconds. Like an SWR refresh, the probe
+    runs in the background: current() always answers with the last known
+    versions at once, so a UI-only rerun never waits on (or makes) a backend
+    call, and a change is seen one probe later.
+
+    current() returns None while versions are unknown (probe failing or not
+    installed): callers then fall back to their TTLs. Listeners registered with
+    on_change(table, fn) run after a probe that saw the table's version move
+    (every table, when versions were unknown before).
+    """
+
+    # After a failed probe, wait this long before the next one
+    RETRY_AFTER = 60.0
+
+    def __init__(self, name: str, interval: float):
+        self.name = name
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._versions: Optional[Dict[str, Any]] = None
+        self._next_probe = 0.0
+        self._probing = False
+        self._listeners: Dict[str, list] = {}
+        self.probes = 0
+        self.last_error: Optional[Exception] = None
+
+    def on_change(self, table: str, fn: Callable[[], None]):
+        self._listeners.setdefault(table, []).append(fn)
+
+    def current(self, probe: Callable[[], Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Last known versions; starts `probe` in the background when one is due."""
+        if self.interval <= 0:
+            return None
+        with self._lock:
+            versions = self._versions
+            if self._probing or time.monotonic() < self._next_probe:
+                return versions
+            self._probing = True
+        threading.Thread(
+            target=self._probe, args=(probe, versions), daemon=True, name=f"probe-{self.name}"
+        ).start()
+        return versions
+
+    def _probe(self, probe: Callable[[], Dict[str, Any]], previous: Optional[Dict[str, Any]]):
+        try:
+            versions = probe()
+        except Exception as e:
+            self.last_error = e
+            log.warning("Version probe %s failed: %s", self.name, e)
+            with self._lock:
+                self._versions = None
+                self._next_probe = time.monotonic() + max(self.interval, self.RETRY_AFTER)
+                self._probing = False
+            return
+
+        with self._lock:
+            self._versions = versions
+            self._next_probe = time.monotonic() + self.interval
+            self._probing = False
+            self.probes += 1
+            self.last_error = None
+
+        previous = previous or {}
+        for table, listeners in self._listeners.items():
+            if versions.get(table) != previous.get(table):
+                for fn in listeners:
+                    try:
+                        fn()
+                    except Exception as e:
+                        log.warning("Version listener for %s failed: %s", table, e)
+
+
+# =========================
+# Single-flight (request coalescing)
+# =========================
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls within the process: the first caller for a
+    key runs the fetch, callers arriving while it is in flight wait for it and get
+    the same result (or the same exception). Nothing is cached once it completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executed: Dict[str, int] = {}
+        self._absorbed: Dict[str, int] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any], label: str = "") -> Any:
+        label = label or str(key)
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._absorbed[label] = self._absorbed.get(label, 0) + 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executed[label] = self._executed.get(label, 0) + 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def coalesce(self, fn: Callable) -> Callable:
+        """
+        Decorator for repo loaders `fn(access_token, *args)`. The token is NOT part of
+        the key: only use it on reads that return the same rows for every user.
+        """
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(access_token: str, *args):
+            key = (name,) + tuple(tuple(a) if isinstance(a, list) else a for a in args)
+            return self.do(key, lambda: fn(access_token, *args), label=name)
+
+        return wrapper
+
+    def stats(self) -> Dict[str, Any]:
+        """{"executed": n, "absorbed": n, "by_function": {name: {...}}}"""
+        with self._lock:
+            names = sorted(set(self._executed) | set(self._absorbed))
+            by_function = {
+                n: {"executed": self._executed.get(n, 0), "absorbed": self._absorbed.get(n, 0)}
+                for n in names
+            }
+            return {
+                "executed": sum(self._executed.values()),
+                "absorbed": sum(self._absorbed.values()),
+                "in_flight": len(self._calls),
+                "by_function": by_function,
+            }
+
+
+# =========================
+# Byte-bounded LRU (replacement for per-key st.cache_data)
+# =========================
+# Lists longer than this are measured from an evenly spaced sample of items
+SIZE_SAMPLE_ITEMS = 64
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Approximate footprint in bytes: pickled length, or sys.getsizeof if
+    unpicklable. A long list / tuple is scaled from a sample of its items, so
+    measuring it costs O(SIZE_SAMPLE_ITEMS), not O(len).
+    """
+    try:
+        if isinstance(value, (list, tuple)) and len(value) > SIZE_SAMPLE_ITEMS:
+            step = len(value) / SIZE_SAMPLE_ITEMS
+            sample = [value[int(i * step)] for i in range(SIZE_SAMPLE_ITEMS)]
+            return len(pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL)) * len(value) // SIZE_SAMPLE_ITEMS
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "pickled", "size", "expires_at", "owner")
+
+    def __init__(self, value, pickled, size, expires_at, owner):
+        self.value = value
+        self.pickled = pickled
+        self.size = size
+        self.expires_at = expires_at
+        self.owner = owner
+
+
+class LRUCache:
+    """
+    Process-wide LRU cache bounded by ESTIMATED BYTES rather than entry count, so
+    per-user / per-recipe keys can't grow without limit as users and tokens churn.
+    Entries also carry a TTL. `owner` (the memoized function name) is only used
+    for per-function accounting and targeted clears.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            if entry.expires_at <= time.monotonic():
+                self._drop(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        if entry.pickled is not None:
+            return True, pickle.loads(entry.pickled)
+        return True, entry.value
+
+    def set(self, key: Hashable, value: Any, ttl: float, owner: str = "", copy: bool = True):
+        """
+        copy=True stores a pickle and returns a fresh copy on every hit (like
+        st.cache_data). copy=False stores the object itself and returns it as is:
+        only for results callers never mutate.
+        """
+        if copy:
+            pickled = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            stored, size = None, len(pickled)
+        else:
+            pickled, stored, size = None, value, estimate_size(value)
+
+        if size > self.max_bytes:
+            return  # would evict everything else; don't cache it
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = _Entry(stored, pickled, size, time.monotonic() + ttl, owner)
+            self._size += size
+            self._evict()
+
+    def update(self, key: Hashable, fn: Callable[[Any], Any], added: Sequence = ()) -> bool:
+        """
+        Replace a live entry's value with fn(value), keeping its TTL. False if absent.
+        `added`: the rows fn adds (see _patch_entry).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                return False
+            self._patch_entry(entry, fn, added)
+            self._evict()
+            return True
+
+    def update_owner(self, owner: str, fn: Callable[[Any], Any], added: Sequence = ()) -> int:
+        """update() every entry of one memoized function. Returns how many were patched."""
+        with self._lock:
+            now = time.monotonic()
+            entries = [e for e in self._entries.values() if e.owner == owner and e.expires_at > now]
+            for entry in entries:
+                self._patch_entry(entry, fn, added)
+            self._evict()
+            return len(entries)
+
+    def _patch_entry(self, entry: _Entry, fn: Callable[[Any], Any], added: Sequence = ()):
+        self._size -= entry.size
+        if entry.pickled is not None:
+            entry.pickled = pickle.dumps(fn(pickle.loads(entry.pickled)), protocol=pickle.HIGHEST_PROTOCOL)
+            entry.size = len(entry.pickled)
+        else:
+            entry.value = fn(entry.value)
+            if isinstance(entry.value, (list, tuple)):
+                # Sampled: cheap enough to re-measure on every patch
+                entry.size = estimate_size(entry.value)
+            elif added:
+                # Other values (e.g. the ingredient dictionary) only grow by
+                # what a patch adds: re-pickling them would cost O(value)
+                entry.size += estimate_size(list(added))
+        self._size += entry.size
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes (lock held)."""
+        while self._size > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def clear(self, owner: Optional[str] = None):
+        with self._lock:
+            if owner is None:
+                self._entries.clear()
+                self._size = 0
+                return
+            for key in [k for k, e in self._entries.items() if e.owner == owner]:
+                self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_function: Dict[str, Dict[str, int]] = {}
+            for entry in self._entries.values():
+                f = by_function.setdefault(entry.owner, {"entries": 0, "bytes": 0})
+                f["entries"] += 1
+                f["bytes"] += entry.size
+            return {
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "by_function": by_function,
+            }
+
+
+def memoize(cache: LRUCache, ttl: float, copy: bool = True):
+    """
+    Decorator in the spirit of st.cache_data, backed by `cache`. Like Streamlit,
+    parameters whose name starts with "_" are not part of the key. The wrapper
+    gets a `.clear()` that drops only this function's entries, and `.key_for()` /
+    `.owner` for targeted update()/invalidate() on `cache`.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        name = fn.__qualname__
+        params = list(inspect.signature(fn).parameters)
+        keyed = [i for i, p in enumerate(params) if not p.startswith("_")]
+
+        @functools.wraps(fn)
+        def wrapper(*args):
+            key = (name,) + tuple(args[i] for i in keyed if i < len(args))
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = fn(*args)
+            cache.set(key, value, ttl, owner=name, copy=copy)
+            return value
+
+        def key_for(**kwargs) -> Hashable:
+            """Cache key from keyed parameters by name, e.g. key_for(recipe_id=rid)."""
+            return (name,) + tuple(kwargs[params[i]] for i in keyed)
+
+        wrapper.clear = lambda: cache.clear(owner=name)
+        wrapper.key_for = key_for
+        wrapper.owner = name
+        return wrapper
+
+    return decorator
@@ -0,0 +1,275 @@
+import sys
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# =========================
+# Columnar catalog
+# =========================
+# The cached catalog tables are lists of PostgREST dicts (one dict per recipe,
+# per season row, per ingredient line). Browse and Home only ever scan them
+# whole, so they are read through this compact form instead:
+# - recipes are integer codes (row positions); ids and names are kept once;
+# - minutes / servings are NumPy arrays;
+# - creators and ingredients are dictionary-encoded (one string per value);
+# - seasons are a 4-bit mask per recipe;
+# - ingredient lines are CSR-style: line_offsets[i]:line_offsets[i + 1] are the
+#   lines of recipe i, sorted by recipe.
+# A Catalog is immutable and shared by every session (see catalog_for).
+# Built from a shared snapshot (snapshot.ArrowRows), it reads whole columns and
+# keeps instructions / notes in the mapped file: no row dict is built.
+
+SEASONS = ("winter", "spring", "summer", "fall")
+SEASON_BITS = {s: 1 << i for i, s in enumerate(SEASONS)}
+
+
+def _column(rows: Sequence[Dict], key: str) -> Sequence:
+    """Values of `key` for every row (straight from Arrow for a snapshot)."""
+    column = getattr(rows, "column", None)
+    return column(key) if column is not None else [r.get(key) for r in rows]
+
+
+def _cells(rows: Sequence[Dict], key: str) -> Sequence:
+    """Like _column, but a snapshot's cells stay unconverted until read."""
+    cells = getattr(rows, "cells", None)
+    return cells(key) if cells is not None else [r.get(key) for r in rows]
+
+
+def _ints(rows: Sequence[Dict], key: str) -> np.ndarray:
+    return np.fromiter((v or 0 for v in _column(rows, key)), dtype=np.int32, count=len(rows))
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class RecipeView:
+    """Read-only view of one recipe of a Catalog (no per-recipe dict is built)."""
+
+    __slots__ = ("_catalog", "code")
+
+    def __init__(self, catalog: "Catalog", code: int):
+        self._catalog = catalog
+        self.code = code
+
+    id = property(lambda self: self._catalog.ids[self.code])
+    name = property(lambda self: self._catalog.names[self.code])
+    servings = property(lambda self: int(self._catalog.servings[self.code]))
+    prep_minutes = property(lambda self: int(self._catalog.prep_minutes[self.code]))
+    cook_minutes = property(lambda self: int(self._catalog.cook_minutes[self.code]))
+    total_minutes = property(lambda self: int(self._catalog.total_minutes[self.code]))
+    instructions = property(lambda self: self._catalog.instructions[self.code])
+    notes = property(lambda self: self._catalog.notes[self.code])
+
+    @property
+    def created_by(self) -> Optional[str]:
+        code = self._catalog.creator_codes[self.code]
+        return self._catalog.creators[code] if code >= 0 else None
+
+    @property
+    def seasons(self) -> List[str]:
+        return self._catalog.season_list(self.code)
+
+    def lines(self) -> List[Dict]:
+        """Ingredient lines as {name, quantity, unit, comment}."""
+        c = self._catalog
+        start, end = c.line_offsets[self.code], c.line_offsets[self.code + 1]
+        return [
+            {
+                "name": c.ingredient_names[c.line_ingredients[k]],
+                "quantity": c.line_quantity[k],
+                "unit": c.line_unit[k],
+                "comment": c.line_comment[k],
+            }
+            for k in range(start, end)
+        ]
+
+
+class Catalog:
+    __slots__ = (
+        "ids", "index", "names", "servings", "prep_minutes", "cook_minutes", "total_minutes",
+        "creators", "creator_codes", "created_at", "instructions", "notes", "season_mask",
+        "ingredient_ids", "ingredient_names", "line_offsets", "line_ingredients",
+        "line_quantity", "line_unit", "line_comment", "_folded_names",
+    )
+
+    def __init__(self, recipes: Sequence[Dict], links: Sequence[Dict], seasons: Sequence[Dict]):
+        n = len(recipes)
+        self.ids: List[str] = list(_column(recipes, "id"))
+        self.index: Dict[str, int] = {rid: i for i, rid in enumerate(self.ids)}
+        self.names: List[str] = [name or "" for name in _column(recipes, "name")]
+        self.servings = _ints(recipes, "servings")
+        self.prep_minutes = _ints(recipes, "prep_minutes")
+        self.cook_minutes = _ints(recipes, "cook_minutes")
+        self.total_minutes = _ints(recipes, "total_minutes")
+        self.created_at: List[Optional[str]] = list(_column(recipes, "created_at"))
+        self.instructions: Sequence[Optional[str]] = _cells(recipes, "instructions")
+        self.notes: Sequence[Optional[str]] = _cells(recipes, "notes")
+        # For name search; built here, not on first search: a Catalog is shared
+        # by concurrent sessions and never written after construction
+        self._folded_names: List[str] = [name.casefold() for name in self.names]
+
+        creator_index: Dict[str, int] = {}
+        self.creator_codes = np.fromiter(
+            (creator_index.setdefault(uid, len(creator_index)) if uid else -1 for uid in _column(recipes, "created_by")),
+            dtype=np.int32,
+            count=n,
+        )
+        self.creators: List[str] = list(creator_index)
+
+        self.season_mask = np.zeros(n, dtype=np.uint8)
+        for recipe_id, season in zip(_column(seasons, "recipe_id"), _column(seasons, "season")):
+            i = self.index.get(recipe_id)
+            bit = SEASON_BITS.get(season)
+            if i is not None and bit:
+                self.season_mask[i] |= bit
+
+        # Lines: encode, then sort by recipe code (stable) into CSR order
+        ingredient_index: Dict[str, int] = {}
+        self.ingredient_names: List[str] = []
+        recipe_codes: List[int] = []
+        ingredient_codes: List[int] = []
+        quantity: List[Optional[str]] = []
+        unit: List[Optional[str]] = []
+        comment: List[Optional[str]] = []
+        keys = ("recipe_id", "ingredient_id", "ingredient_name", "quantity", "unit", "comment")
+        columns = zip(*(_column(links, key) for key in keys))
+        for recipe_id, ingredient_id, ingredient_name, qty, unit_, comment_ in columns:
+            i = self.index.get(recipe_id)
+            if i is None:
+                continue
+            code = ingredient_index.get(ingredient_id)
+            if code is None:
+                code = ingredient_index[ingredient_id] = len(self.ingredient_names)
+                self.ingredient_names.append(_intern(ingredient_name or ""))
+            recipe_codes.append(i)
+            ingredient_codes.append(code)
+            quantity.append(_intern(qty))
+            unit.append(_intern(unit_))
+            comment.append(comment_)
+        self.ingredient_ids: List[str] = list(ingredient_index)
+
+        line_recipes = np.asarray(recipe_codes, dtype=np.int32)
+        order = np.argsort(line_recipes, kind="stable")
+        self.line_ingredients = np.asarray(ingredient_codes, dtype=np.int32)[order]
+        self.line_quantity = [quantity[k] for k in order]
+        self.line_unit = [unit[k] for k in order]
+        self.line_comment = [comment[k] for k in order]
+        self.line_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(line_recipes, minlength=n), out=self.line_offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def recipe(self, code: int) -> RecipeView:
+        return RecipeView(self, code)
+
+    # -------- per-recipe helpers
+    def season_list(self, code: int) -> List[str]:
+        mask = int(self.season_mask[code])
+        return [s for s in SEASONS if mask & SEASON_BITS[s]]
+
+    def line_recipes(self) -> np.ndarray:
+        """Recipe code of every line (expanded from the offsets)."""
+        return np.repeat(np.arange(len(self), dtype=np.int32), np.diff(self.line_offsets))
+
+    def ingredient_usage(self) -> np.ndarray:
+        """Number of lines per ingredient code."""
+        return np.bincount(self.line_ingredients, minlength=len(self.ingredient_names))
+
+    def season_counts(self) -> Dict[str, int]:
+        return {s: int(np.count_nonzero(self.season_mask & SEASON_BITS[s])) for s in SEASONS}
+
+    # -------- filters (boolean masks over recipe codes)
+    def filter(
+        self,
+        seasons: Optional[List[str]] = None,
+        seasons_match_all: bool = False,
+        creator_ids: Optional[List[str]] = None,
+        ingredient_codes: Optional[List[int]] = None,
+        ingredients_match_all: bool = False,
+        search: str = "",
+    ) -> np.ndarray:
+        keep = np.ones(len(self), dtype=bool)
+
+        if seasons:
+            wanted = 0
+            for s in seasons:
+                wanted |= SEASON_BITS.get(s, 0)
+            hits = self.season_mask & wanted
+            keep &= (hits == wanted) if seasons_match_all else (hits != 0)
+
+        if creator_ids is not None:
+            codes = [i for i, uid in enumerate(self.creators) if uid in set(creator_ids)]
+            keep &= np.isin(self.creator_codes, codes)
+
+        if ingredient_codes:
+            chosen = np.unique(np.asarray(ingredient_codes, dtype=np.int32))
+            matched = np.isin(self.line_ingredients, chosen)
+            # Matches per recipe from the offsets; (recipe, ingredient) is the
+            # lines' primary key, so these count distinct ingredients
+            running = np.concatenate(([0], np.cumsum(matched)))
+            per_recipe = running[self.line_offsets[1:]] - running[self.line_offsets[:-1]]
+            keep &= (per_recipe == len(chosen)) if ingredients_match_all else (per_recipe > 0)
+
+        needle = search.strip().casefold()
+        if needle:
+            keep &= np.fromiter((needle in n for n in self._folded_names), dtype=bool, count=len(self))
+
+        return keep
+
+    # -------- tabular output (only for the rows shown)
+    def frame(
+        self,
+        codes: np.ndarray,
+        creator_names: Dict[str, str],
+        clean_name: Optional[Callable[[str], str]] = None,
+    ) -> pd.DataFrame:
+        """
+        DataFrame of the Browse table for recipe `codes` (in that order).
+        `clean_name` is applied to ingredient names (empty results are left out).
+        """
+        # Last slot answers code -1 (no creator)
+        labels = np.array([creator_names.get(uid, "Unknown") for uid in self.creators] + ["Unknown"], dtype=object)
+        creator_codes = self.creator_codes[codes]
+        names = [clean_name(n) for n in self.ingredient_names] if clean_name else self.ingredient_names
+        offsets = self.line_offsets
+        ings = self.line_ingredients
+        return pd.DataFrame({
+            "id": [self.ids[i] for i in codes],
+            "name": [self.names[i] for i in codes],
+            "seasons_str": [", ".join(self.season_list(i)) or "—" for i in codes],
+            "servings": self.servings[codes],
+            "prep_minutes": self.prep_minutes[codes],
+            "cook_minutes": self.cook_minutes[codes],
+            "total_minutes": self.total_minutes[codes],
+            "created_by": [self.creators[c] if c >= 0 else None for c in creator_codes],
+            "creator_name": labels[creator_codes],
+            "ingredients_str": [
+                ", ".join(sorted({names[k] for k in ings[offsets[i]:offsets[i + 1]]} - {""})) for i in codes
+            ],
+        })
+
+
+# =========================
+# Shared instance
+# =========================
+# Built once per change of the underlying cached lists (SWR refresh or patch
+# swaps in new list objects), then shared by every session and rerun.
+_lock = threading.Lock()
+_last: Optional[Tuple[Tuple, Catalog]] = None
+
+
+def catalog_for(recipes: List[Dict], links: List[Dict], seasons: List[Dict]) -> Catalog:
+    global _last
+    key = (recipes, links, seasons)
+    with _lock:
+        if _last is not None and all(a is b for a, b in zip(_last[0], key)):
+            return _last[1]
+    catalog = Catalog(recipes or [], links or [], seasons or [])
+    with _lock:
+        # Holding the source lists keeps their ids from being reused
+        _last = (key, catalog)
+    return catalog
@@ -0,0 +1,227 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from app.lib.repos import (
+    PAGE_MAX_ROWS,
+    cached_list_profiles_by_ids,
+    list_recipe_ingredients_range,
+    list_recipe_seasons_range,
+    list_recipes_page,
+)
+
+FORMATS = ("jsonl", "parquet")
+MIME_TYPES = {"jsonl": "application/x-ndjson", "parquet": "application/vnd.apache.parquet"}
+
+DEFAULT_PAGE_SIZE = 500
+PARQUET_ROW_GROUP = 10_000
+
+
+# =========================
+# Sources (one page of recipes + their children at a time)
+# =========================
+def iter_db_pages(access_token: str, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict]:
+    """
+    Keyset-paginated walk over the whole cookbook. Each page is
+    {"recipes", "seasons", "links", "creators"}; only one page is in memory.
+    page_size is capped at the response row cap (PAGE_MAX_ROWS): a larger one
+    would read a short page as the last.
+    """
+    page_size = max(1, min(page_size, PAGE_MAX_ROWS))
+    creators: Dict[str, str] = {}
+    after_id = None
+    while True:
+        recipes = list_recipes_page(access_token, after_id, page_size)
+        if not recipes:
+            return
+        first_id, after_id = recipes[0]["id"], recipes[-1]["id"]
+
+        unknown = sorted({r["created_by"] for r in recipes if r.get("created_by")} - set(creators))
+        if unknown:
+            for p in cached_list_profiles_by_ids(access_token, tuple(unknown)):
+                full = f"{(p.get('first_name') or '').strip()} {(p.get('last_name') or '').strip()}".strip()
+                creators[p["id"]] = full or "Unknown"
+
+        yield {
+            "recipes": recipes,
+            "seasons": list_recipe_seasons_range(access_token, first_id, after_id),
+            "links": list_recipe_ingredients_range(access_token, first_id, after_id),
+            "creators": creators,
+        }
+
+        if len(recipes) < page_size:
+            return
+
+
+def assemble_page(page: Dict) -> Iterator[Dict]:
+    """One flat export row per recipe: recipe fields + creator_name, seasons, ingredients."""
+    seasons: Dict[str, List[str]] = {}
+    for r in page.get("seasons") or []:
+        seasons.setdefault(r["recipe_id"], []).append(r["season"])
+
+    lines: Dict[str, List[Dict]] = {}
+    for r in page.get("links") or []:
+        lines.setdefault(r["recipe_id"], []).append({
+            "name": r.get("ingredient_name"),
+            "quantity": r.get("quantity"),
+            "unit": r.get("unit"),
+            "comment": r.get("comment"),
+        })
+
+    creators = page.get("creators") or {}
+    for recipe in page["recipes"]:
+        rid = recipe["id"]
+        yield {
+            **recipe,
+            "creator_name": creators.get(recipe.get("created_by"), "Unknown"),
+            "seasons": sorted(seasons.get(rid, [])),
+            "ingredients": lines.get(rid, []),
+        }
+
+
+# =========================
+# Writers (append-only, bounded buffers)
+# =========================
+class ExportReport:
+    def __init__(self, fmt: str):
+        self.format = fmt
+        self.started = time.monotonic()
+        self.rows = 0
+        self.pages = 0
+        self.bytes = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    line = pa.struct([
+        ("name", pa.string()),
+        ("quantity", pa.string()),
+        ("unit", pa.string()),
+        ("comment", pa.string()),
+    ])
+    return pa.schema([
+        ("id", pa.string()),
+        ("name", pa.string()),
+        ("servings", pa.int32()),
+        ("prep_minutes", pa.int32()),
+        ("cook_minutes", pa.int32()),
+        ("total_minutes", pa.int32()),
+        ("created_by", pa.string()),
+        ("creator_name", pa.string()),
+        ("created_at", pa.string()),
+        ("updated_at", pa.string()),
+        ("instructions", pa.string()),
+        ("notes", pa.string()),
+        ("seasons", pa.list_(pa.string())),
+        ("ingredients", pa.list_(line)),
+    ])
+
+
+def export_cookbook(
+    out,
+    pages: Iterable[Dict],
+    fmt: str = "jsonl",
+    on_progress: Optional[Callable[[ExportReport], None]] = None,
+) -> ExportReport:
+    """
+    Stream `pages` (see iter_db_pages) into the binary file `out`.
+    - jsonl: one JSON object per recipe, written as each page arrives;
+    - parquet: row groups of PARQUET_ROW_GROUP recipes (pyarrow ParquetWriter).
+    Memory stays bounded by one page + one row group, whatever the cookbook size.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    report = ExportReport(fmt)
+
+    if fmt == "jsonl":
+        for page in pages:
+            chunk = "".join(
+                json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in assemble_page(page)
+            ).encode("utf-8")
+            out.write(chunk)
+            report.bytes += len(chunk)
+            report.rows += len(page["recipes"])
+            report.pages += 1
+            if on_progress is not None:
+                on_progress(report)
+        return report
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    buffer: List[Dict] = []
+    with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+        for page in pages:
+            buffer.extend(assemble_page(page))
+            report.rows += len(page["recipes"])
+            report.pages += 1
+            if len(buffer) >= PARQUET_ROW_GROUP:
+                writer.write_table(pa.Table.from_pylist(buffer, schema=schema))
+                buffer = []
+            if on_progress is not None:
+                on_progress(report)
+        if buffer:
+            writer.write_table(pa.Table.from_pylist(buffer, schema=schema))
+    if hasattr(out, "tell"):
+        report.bytes = out.tell()
+    return report
+
+
+# =========================
+# CLI: python -m app.lib.exporter --format parquet --out cookbook.parquet
+# =========================
+def _access_token(args) -> str:
+    if args.token:
+        return args.token
+    email = args.email or os.getenv("EXPORT_EMAIL", "")
+    password = os.getenv("EXPORT_PASSWORD", "")
+    if not (email and password):
+        sys.exit("Pass --token (or SUPABASE_ACCESS_TOKEN), or set EXPORT_EMAIL + EXPORT_PASSWORD.")
+    from app.lib.supabase_client import get_supabase
+
+    res = get_supabase().auth.sign_in_with_password({"email": email, "password": password})
+    return res.session.access_token
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the whole cookbook to JSONL or Parquet.")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--out", required=True, help="Output file path")
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE, help=f"Recipes per request (at most {PAGE_MAX_ROWS})"
+    )
+    parser.add_argument("--token", default=os.getenv("SUPABASE_ACCESS_TOKEN", ""), help="Supabase access token")
+    parser.add_argument("--email", default="", help="Sign in with this email (password from EXPORT_PASSWORD)")
+    args = parser.parse_args(argv)
+
+    token = _access_token(args)
+
+    def progress(rep: ExportReport):
+        print(f"\r{rep.rows} recipes · {rep.rows_per_second:,.0f} rows/s", end="", file=sys.stderr)
+
+    with open(args.out, "wb") as f:
+        report = export_cookbook(f, iter_db_pages(token, args.page_size), args.format, on_progress=progress)
+
+    print(
+        f"\nExported {report.rows} recipes to {args.out} ({report.bytes / 1e6:.1f} MB) "
+        f"in {report.elapsed:.1f} s — {report.rows_per_second:,.0f} rows/s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import json
+import threading
+from typing import Any, Dict, List
+
+from postgrest import APIError
+
+# =========================
+# Large PostgREST reads: compressed transfer + fast JSON decoding
+# =========================
+# postgrest-py decodes every response through pydantic (several times slower
+# than json.loads on catalog-sized bodies). fetch_rows() sends the query built
+# by the usual builder chain itself and decodes the body with orjson when it is
+# installed (stdlib json otherwise). It asks for brotli when a decoder is
+# installed, gzip otherwise; httpx decompresses either transparently.
+#
+# Only for row reads (GET): writes and RPCs keep .execute().
+
+try:
+    import orjson
+
+    loads = orjson.loads
+    JSON_DECODER = "orjson"
+except ImportError:
+    loads = json.loads
+    JSON_DECODER = "json"
+
+try:
+    import brotli  # noqa: F401  (httpx decodes "br" with it)
+
+    ACCEPT_ENCODING = "br, gzip"
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+
+        ACCEPT_ENCODING = "br, gzip"
+    except ImportError:
+        ACCEPT_ENCODING = "gzip"
+
+_stats_lock = threading.Lock()
+_stats = {"requests": 0, "wire_bytes": 0, "json_bytes": 0}
+
+
+def _api_error(resp) -> APIError:
+    # Same exception postgrest-py raises, so callers' error handling (and
+    # _raise_clean messages with the Postgres error code) are unchanged
+    try:
+        body: Any = loads(resp.content)
+    except ValueError:
+        body = None
+    if not isinstance(body, dict):
+        body = {"message": resp.text or resp.reason_phrase, "code": str(resp.status_code)}
+    return APIError(body)
+
+
+def fetch_rows(query) -> List[Dict]:
+    """Execute a PostgREST select builder and return its rows (same as .execute().data)."""
+    # postgrest >= 1 keeps the request on .request; older versions on the builder
+    req = getattr(query, "request", query)
+    headers = dict(req.headers)
+    headers["Accept-Encoding"] = ACCEPT_ENCODING
+
+    resp = req.session.request(
+        req.http_method,
+        str(req.path),
+        params=req.params,
+        headers=headers,
+        auth=getattr(req, "auth", None),
+    )
+    if not resp.is_success:
+        raise _api_error(resp)
+
+    body = resp.content
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["wire_bytes"] += resp.num_bytes_downloaded
+        _stats["json_bytes"] += len(body)
+    return loads(body) if body else []
+
+
+def transfer_stats() -> Dict:
+    """Requests made by fetch_rows, bytes received vs JSON decoded, and the codecs in use."""
+    with _stats_lock:
+        out = dict(_stats)
+    out["decoder"] = JSON_DECODER
+    out["accept_encoding"] = ACCEPT_ENCODING
+    return out
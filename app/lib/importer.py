@@ -0,0 +1,474 @@
+import csv
+import io
+import json
+import re
+import time
+import uuid
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from app.lib.repos import cached_ingredient_dictionary, create_ingredients, import_recipes
+
+ALL_SEASONS = ["winter", "spring", "summer", "fall"]
+SEASON_ALIASES = {"autumn": "fall", "all": "all", "all year": "all", "any": "all"}
+
+DEFAULT_CHUNK_SIZE = 500
+
+# SQLSTATE classes a bad record can cause: 22 data exception, 23 integrity violation
+DATA_ERROR_CLASSES = ("22", "23")
+
+# (row number in the file, parsed record or None, error message or None)
+Parsed = Tuple[int, Optional[Dict], Optional[str]]
+
+
+# =========================
+# Field parsing
+# =========================
+_LINE_SPLIT = re.compile(r"[;\n]")
+_COMMENT = re.compile(r"\(([^()]*)\)\s*$")
+_MINUTES = re.compile(r"^\s*(\d+)\s*(?:min(?:utes?)?)?\s*$", re.IGNORECASE)
+
+
+def parse_seasons(value) -> List[str]:
+    """'winter, fall' / ['Winter'] / 'all' -> sorted season names. Raises ValueError."""
+    if value is None:
+        return []
+    items = value if isinstance(value, list) else re.split(r"[,;|/]", str(value))
+    seasons = set()
+    for item in items:
+        s = str(item).strip().lower()
+        if not s:
+            continue
+        s = SEASON_ALIASES.get(s, s)
+        if s == "all":
+            seasons.update(ALL_SEASONS)
+        elif s in ALL_SEASONS:
+            seasons.add(s)
+        else:
+            raise ValueError(f"unknown season '{item}'")
+    return sorted(seasons)
+
+
+def parse_int(value, field: str, default: int, low: int, high: Optional[int] = None) -> int:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return default
+    m = _MINUTES.match(str(value))
+    if not m:
+        raise ValueError(f"{field} must be a whole number (got '{value}')")
+    n = int(m.group(1))
+    if n < low or (high is not None and n > high):
+        raise ValueError(f"{field} must be between {low} and {high if high is not None else '∞'} (got {n})")
+    return n
+
+
+def parse_ingredient_line(text: str) -> Optional[Dict]:
+    """
+    'Flour: 200 g (sifted)' -> {name: Flour, quantity: 200, unit: g, comment: sifted}
+    Same shape as the Browse details ("Name : qty unit (comment)"). Only the
+    name is required.
+    """
+    text = (text or "").strip().lstrip("-*•").strip()
+    if not text:
+        return None
+    comment = None
+    m = _COMMENT.search(text)
+    if m:
+        comment = m.group(1).strip() or None
+        text = text[:m.start()].strip()
+    name, _, amount = text.partition(":")
+    qty, _, unit = amount.strip().partition(" ")
+    return {
+        "name": name.strip(),
+        "quantity": qty.strip() or None,
+        "unit": unit.strip() or None,
+        "comment": comment,
+    }
+
+
+def parse_ingredients(value) -> List[Dict]:
+    """A list of dicts / strings, or one string with lines separated by ';' or newlines."""
+    if value is None:
+        return []
+    items = value if isinstance(value, list) else _LINE_SPLIT.split(str(value))
+    lines = []
+    for item in items:
+        if isinstance(item, dict):
+            line = {k: (str(item[k]).strip() or None) if item.get(k) is not None else None
+                    for k in ("name", "quantity", "unit", "comment")}
+        else:
+            line = parse_ingredient_line(str(item))
+        if line and line.get("name"):
+            lines.append(line)
+    return lines
+
+
+def normalize_record(raw: Dict) -> Dict:
+    """Raw parsed fields -> validated recipe record. Raises ValueError with a readable message."""
+    name = str(raw.get("name") or raw.get("title") or "").strip()
+    if not name:
+        raise ValueError("recipe name is required")
+
+    lines = parse_ingredients(raw.get("ingredients"))
+    seen = set()
+    for line in lines:
+        key = line["name"].strip().lower()
+        if key in seen:
+            raise ValueError(f"ingredient '{line['name']}' appears twice")
+        seen.add(key)
+
+    return {
+        "name": name,
+        "seasons": parse_seasons(raw.get("seasons", raw.get("season"))),
+        "servings": parse_int(raw.get("servings"), "servings", 1, 1, 100),
+        "prep_minutes": parse_int(raw.get("prep_minutes", raw.get("prep")), "prep_minutes", 0, 0),
+        "cook_minutes": parse_int(raw.get("cook_minutes", raw.get("cook")), "cook_minutes", 0, 0),
+        "instructions": (str(raw.get("instructions") or "").strip() or None),
+        "notes": (str(raw.get("notes") or "").strip() or None),
+        "ingredients": lines,
+    }
+
+
+def _checked(row_no: int, raw: Dict) -> Parsed:
+    try:
+        return row_no, normalize_record(raw), None
+    except ValueError as e:
+        return row_no, None, str(e)
+
+
+# =========================
+# Streaming readers (one record at a time, whatever the file size)
+# =========================
+def read_csv(f: TextIO) -> Iterator[Parsed]:
+    """
+    Header row with: name, seasons, servings, prep_minutes, cook_minutes,
+    instructions, notes, ingredients ("Flour: 200 g; Eggs: 2 (large)").
+    """
+    reader = csv.DictReader(f)
+    for row_no, row in enumerate(reader, start=2):
+        yield _checked(row_no, {(k or "").strip().lower(): v for k, v in row.items()})
+
+
+def read_json(f: TextIO, chunk_chars: int = 1 << 16) -> Iterator[Parsed]:
+    """
+    JSON Lines (one object per line) or one top-level JSON array of objects.
+    Arrays are decoded object by object from a sliding buffer, not loaded whole.
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_chars)
+    head = buf.lstrip()
+    if not head.startswith("["):
+        # JSON Lines
+        rest = io.StringIO(buf)
+        for row_no, line in enumerate(_chain_lines(rest, f), start=1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_no, None, f"invalid JSON: {e.msg}"
+                continue
+            yield _object(row_no, obj)
+        return
+
+    pos = buf.index("[") + 1
+    row_no = 0
+    eof = False
+    while True:
+        # Skip separators
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            more = f.read(chunk_chars)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+        if pos >= len(buf) or buf[pos] == "]":
+            return
+        try:
+            obj, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                yield row_no + 1, None, f"invalid JSON: {e.msg}"
+                return
+            more = f.read(chunk_chars)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            continue
+        row_no += 1
+        yield _object(row_no, obj)
+        pos = end
+        if pos > chunk_chars:
+            buf, pos = buf[pos:], 0
+
+
+def _chain_lines(first: TextIO, rest: TextIO) -> Iterator[str]:
+    # `first` holds the head already read from `rest`; its last line may be cut
+    tail = ""
+    for line in first:
+        if line.endswith("\n"):
+            yield tail + line
+            tail = ""
+        else:
+            tail += line
+    for line in rest:
+        if tail:
+            line, tail = tail + line, ""
+        yield line
+    if tail:
+        yield tail
+
+
+def _object(row_no: int, obj) -> Parsed:
+    if not isinstance(obj, dict):
+        return row_no, None, "expected a JSON object"
+    return _checked(row_no, {str(k).strip().lower(): v for k, v in obj.items()})
+
+
+_MD_META = re.compile(r"^\s*(seasons?|servings|prep(?:_minutes)?|cook(?:_minutes)?)\s*:\s*(.*)$", re.IGNORECASE)
+
+
+def read_markdown(f: TextIO) -> Iterator[Parsed]:
+    """
+    One recipe per '# Title' heading:
+
+        # Leek soup
+        Seasons: winter, fall
+        Servings: 4
+        Prep: 10 min
+        Cook: 30 min
+
+        ## Ingredients
+        - Leeks: 3
+        - Butter: 30 g (salted)
+
+        ## Instructions
+        ...
+
+        ## Notes
+        ...
+    """
+    raw: Optional[Dict] = None
+    start = 0
+    section = None
+
+    for line_no, line in enumerate(f, start=1):
+        line = line.rstrip("\n")
+        if line.startswith("# "):
+            if raw is not None:
+                yield _checked(start, _md_finish(raw))
+            raw = {"name": line[2:].strip(), "ingredients": [], "instructions": [], "notes": []}
+            start, section = line_no, None
+            continue
+        if raw is None:
+            continue
+        if line.startswith("## "):
+            title = line[3:].strip().lower()
+            section = next((s for s in ("ingredients", "instructions", "notes") if title.startswith(s)), None)
+            continue
+        if section is None:
+            m = _MD_META.match(line)
+            if m:
+                raw[_md_field(m.group(1))] = m.group(2)
+            continue
+        if section == "ingredients":
+            if line.strip():
+                raw["ingredients"].append(line)
+        else:
+            raw[section].append(line)
+
+    if raw is not None:
+        yield _checked(start, _md_finish(raw))
+
+
+def _md_field(label: str) -> str:
+    label = label.lower()
+    for prefix, field in (("season", "seasons"), ("prep", "prep_minutes"), ("cook", "cook_minutes")):
+        if label.startswith(prefix):
+            return field
+    return label
+
+
+def _md_finish(raw: Dict) -> Dict:
+    for key in ("instructions", "notes"):
+        raw[key] = "\n".join(raw[key]).strip() or None
+    return raw
+
+
+READERS = {"csv": read_csv, "json": read_json, "jsonl": read_json, "md": read_markdown, "markdown": read_markdown}
+
+
+def read_records(f: TextIO, fmt: str) -> Iterator[Parsed]:
+    """Pick the streaming reader from a format / file extension ("csv", "json", "jsonl", "md")."""
+    reader = READERS.get(fmt.lower().lstrip("."))
+    if reader is None:
+        raise ValueError(f"Unsupported import format: {fmt}")
+    return reader(f)
+
+
+# =========================
+# Pipeline
+# =========================
+class ImportReport:
+    """Running totals of an import, passed to on_progress() after every chunk."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.read = 0
+        self.imported = 0
+        self.new_ingredients = 0
+        self.errors: List[Dict] = []
+
+    @property
+    def failed(self) -> int:
+        return len(self.errors)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.imported / self.elapsed if self.elapsed > 0 else 0.0
+
+    def error(self, row_no: int, name: Optional[str], message: str):
+        self.errors.append({"row": row_no, "name": name or "", "error": message})
+
+
+def _is_data_error(e: Optional[BaseException]) -> bool:
+    """
+    True for a Postgres data exception or integrity violation (SQLSTATE class
+    22 / 23), read from the error or the one it wraps (repos re-raise with
+    `from e`): PostgREST's APIError.code, psycopg's sqlstate.
+    """
+    while e is not None:
+        code = getattr(e, "code", None) or getattr(e, "sqlstate", None)
+        if isinstance(code, str) and len(code) == 5:
+            return code[:2] in DATA_ERROR_CLASSES
+        e = e.__cause__
+    return False
+
+
+def _chunks(parsed: Iterable[Parsed], size: int, report: ImportReport) -> Iterator[List[Tuple[int, Dict]]]:
+    chunk = []
+    for row_no, record, error in parsed:
+        report.read += 1
+        if error:
+            report.error(row_no, None, error)
+            continue
+        chunk.append((row_no, record))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def run_import(
+    access_token: str,
+    user_id: str,
+    parsed: Iterable[Parsed],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    on_progress: Optional[Callable[[ImportReport], None]] = None,
+) -> ImportReport:
+    """
+    Import parsed records chunk by chunk. Per chunk:
+      1) every ingredient name is resolved against the cached dictionary, the
+         missing ones are created in ONE multi-row insert;
+      2) recipes + seasons + lines are written in ONE RPC (repos.import_recipes).
+    If a chunk is rejected for its data (a constraint or value error), it is
+    split in halves and retried until the bad recipes are isolated (a few extra
+    calls, not one per row): their errors are recorded and the batch goes on.
+    Any other error (network, expired session, permission) stops the import:
+    it is raised, and the chunks written before it stay saved.
+    """
+    report = ImportReport()
+    dictionary = cached_ingredient_dictionary(access_token)
+
+    for chunk in _chunks(parsed, chunk_size, report):
+        try:
+            ids = _resolve_ingredients(access_token, dictionary, [r for _, r in chunk], report)
+        except Exception as e:
+            if not _is_data_error(e):
+                raise
+            for row_no, record in chunk:
+                report.error(row_no, record["name"], f"ingredients: {e}")
+            _notify(on_progress, report)
+            continue
+
+        payload = []
+        for row_no, record in chunk:
+            try:
+                payload.append((row_no, _payload(record, ids)))
+            except ValueError as e:
+                report.error(row_no, record["name"], str(e))
+        if not payload:
+            _notify(on_progress, report)
+            continue
+
+        _write(access_token, user_id, payload, report)
+        _notify(on_progress, report)
+
+    return report
+
+
+def _write(access_token: str, user_id: str, payload: List[Tuple[int, Dict]], report: ImportReport):
+    try:
+        report.imported += import_recipes(access_token, user_id, [p for _, p in payload])
+    except Exception as e:
+        if not _is_data_error(e):
+            raise
+        if len(payload) == 1:
+            row_no, p = payload[0]
+            report.error(row_no, p["name"], str(e))
+            return
+        mid = len(payload) // 2
+        _write(access_token, user_id, payload[:mid], report)
+        _write(access_token, user_id, payload[mid:], report)
+
+
+def _resolve_ingredients(access_token: str, dictionary, records: List[Dict], report: ImportReport) -> Dict[str, str]:
+    """{lower(name): ingredient id} for every ingredient of the chunk, creating missing ones in one batch."""
+    ids: Dict[str, str] = {}
+    missing: Dict[str, str] = {}
+    for record in records:
+        for line in record["ingredients"]:
+            key = line["name"].strip().lower()
+            if key in ids or key in missing:
+                continue
+            known = dictionary.find(line["name"])
+            if known:
+                ids[key] = known["id"]
+            else:
+                missing[key] = line["name"].strip()
+
+    if missing:
+        # Also patches the cached dictionary (repos._patch_ingredient)
+        rows = create_ingredients(access_token, list(missing.values()))
+        report.new_ingredients += sum(1 for row in rows if row.get("inserted"))
+        for row in rows:
+            ids[row["name"].strip().lower()] = row["id"]
+    return ids
+
+
+def _payload(record: Dict, ids: Dict[str, str]) -> Dict:
+    unresolved = [line["name"] for line in record["ingredients"] if line["name"].strip().lower() not in ids]
+    if unresolved:
+        raise ValueError(f"could not create ingredient(s): {', '.join(unresolved)}")
+    return {
+        "id": str(uuid.uuid4()),
+        **{k: record[k] for k in ("name", "servings", "prep_minutes", "cook_minutes", "instructions", "notes", "seasons")},
+        "lines": [
+            {
+                "ingredient_id": ids[line["name"].strip().lower()],
+                "quantity": line.get("quantity"),
+                "unit": line.get("unit"),
+                "comment": line.get("comment"),
+            }
+            for line in record["ingredients"]
+        ],
+    }
+
+
+def _notify(on_progress: Optional[Callable[[ImportReport], None]], report: ImportReport):
+    if on_progress is not None:
+        on_progress(report)
@@ -0,0 +1,240 @@
+import bisect
+import heapq
+import re
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+
+# =========================
+# Name normalization
+# =========================
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def fold(name: str) -> str:
+    """Case- and accent-insensitive form: 'Crème Fraîche' -> 'creme fraiche'."""
+    decomposed = unicodedata.normalize("NFKD", name or "")
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+    return " ".join(_NON_ALNUM.sub(" ", stripped).split())
+
+
+def _singular(word: str) -> str:
+    if len(word) <= 3:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith(("s", "x")) and not word.endswith(("ss", "us")):
+        return word[:-1]
+    return word
+
+
+def normalize_name(name: str) -> str:
+    """fold() + naive singular per word: 'Tomatoes' / 'tomato' / 'Tomates' -> 'tomato' / 'tomate'."""
+    return " ".join(_singular(w) for w in fold(name).split())
+
+
+# =========================
+# Duplicate proposals
+# =========================
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def propose_duplicates(
+    ingredients: List[Dict],
+    usage: Optional[Dict[str, int]] = None,
+    threshold: float = 0.88,
+) -> List[Dict]:
+    """
+    Group likely duplicate ingredients ({id, name} rows) in one pass:
+    - identical normalize_name() keys are always grouped;
+    - distinct keys are grouped when their similarity ratio >= `threshold`.
+      Only keys sharing their first two characters and of compatible length are
+      compared, so this stays far from n² on a real dictionary.
+
+    Returns [{"target": id, "members": [{id, name, usage}], "score": float}],
+    biggest usage first. The proposed target is the most used member (then the
+    shortest name): merging into it repoints the fewest lines.
+    """
+    usage = usage or {}
+    rows = [r for r in ingredients or [] if r.get("id")]
+    if len(rows) < 2:
+        return []
+
+    # Exact key groups first: each key is compared once, whatever its group size
+    key_members: Dict[str, List[int]] = {}
+    for i, r in enumerate(rows):
+        key_members.setdefault(normalize_name(r.get("name") or ""), []).append(i)
+
+    uf = _UnionFind(len(rows))
+    score = [1.0] * len(rows)
+    for members in key_members.values():
+        for i in members[1:]:
+            uf.union(members[0], i)
+
+    keys = sorted(key_members)
+    blocks: Dict[str, List[str]] = {}
+    for k in keys:
+        blocks.setdefault(k[:2], []).append(k)
+
+    for block in blocks.values():
+        for a_pos, a in enumerate(block):
+            matcher = SequenceMatcher(None, a, autojunk=False)
+            for b in block[a_pos + 1:]:
+                if min(len(a), len(b)) / max(len(a), len(b), 1) < threshold:
+                    continue
+                matcher.set_seq2(b)
+                if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                    continue
+                ratio = matcher.ratio()
+                if ratio >= threshold:
+                    i, j = key_members[a][0], key_members[b][0]
+                    uf.union(i, j)
+                    score[i] = min(score[i], ratio)
+                    score[j] = min(score[j], ratio)
+
+    groups: Dict[int, List[int]] = {}
+    for i in range(len(rows)):
+        groups.setdefault(uf.find(i), []).append(i)
+
+    proposals = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        items = [
+            {"id": rows[i]["id"], "name": rows[i].get("name") or "", "usage": int(usage.get(rows[i]["id"], 0))}
+            for i in members
+        ]
+        items.sort(key=lambda m: (-m["usage"], len(m["name"]), m["name"]))
+        proposals.append({
+            "target": items[0]["id"],
+            "members": items,
+            "score": round(min(score[i] for i in members), 3),
+        })
+
+    proposals.sort(key=lambda p: (-sum(m["usage"] for m in p["members"]), p["members"][0]["name"]))
+    return proposals
+
+
+def usage_counts(links: List[Dict]) -> Dict[str, int]:
+    """{ingredient_id: number of recipe lines} from recipe_ingredients rows."""
+    counts: Dict[str, int] = {}
+    for r in links or []:
+        ing_id = r.get("ingredient_id")
+        if ing_id:
+            counts[ing_id] = counts.get(ing_id, 0) + 1
+    return counts
+
+
+# =========================
+# Ingredient dictionary (autocomplete)
+# =========================
+class IngredientDictionary:
+    """
+    In-memory ingredient dictionary shared by every session (see
+    repos.cached_ingredient_dictionary):
+    - rows()          -> [{id, name, usage_count}] sorted by name
+    - get(id) / find(name)  (find matches like the DB unique index: lower(trim(name)))
+    - search(prefix)  -> best matches for autocomplete, ranked by usage_count
+
+    The prefix index is a sorted list of (folded word-suffix, id): "fra" finds
+    "Crème fraîche" through "fraiche". Lookups are bisect + a short scan.
+    add() appends a new ingredient in place (no reload). Lists handed out are
+    never mutated afterwards: writers swap in new ones under the lock.
+    """
+
+    def __init__(self, rows: List[Dict]):
+        self._lock = threading.Lock()
+        self._rows = sorted(
+            ({"id": r["id"], "name": r.get("name") or "", "usage_count": int(r.get("usage_count") or 0)}
+             for r in rows or [] if r.get("id")),
+            key=lambda r: r["name"],
+        )
+        self._by_id = {r["id"]: r for r in self._rows}
+        self._by_name = {_name_key(r["name"]): r for r in self._rows}
+        self._keys = sorted(k for r in self._rows for k in _index_keys(r))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def rows(self) -> List[Dict]:
+        return self._rows
+
+    def get(self, ingredient_id: str) -> Optional[Dict]:
+        return self._by_id.get(ingredient_id)
+
+    def find(self, name: str) -> Optional[Dict]:
+        return self._by_name.get(_name_key(name))
+
+    def search(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Ingredients with a word starting with `prefix` (folded), most used first."""
+        q = fold(prefix)
+        if not q:
+            return self.top(limit)
+        keys = self._keys
+        found = {}
+        i = bisect.bisect_left(keys, (q, ""))
+        while i < len(keys) and keys[i][0].startswith(q):
+            ing_id = keys[i][1]
+            found[ing_id] = self._by_id[ing_id]
+            i += 1
+        return sorted(found.values(), key=_rank)[:limit]
+
+    def top(self, limit: int = 10) -> List[Dict]:
+        """Most used ingredients."""
+        return heapq.nsmallest(limit, self._rows, key=_rank)
+
+    def add(self, row: Dict) -> "IngredientDictionary":
+        """Append one new ingredient (e.g. right after create_ingredient). Returns self."""
+        if not row.get("id") or row["id"] in self._by_id:
+            return self
+        new = {"id": row["id"], "name": row.get("name") or "", "usage_count": int(row.get("usage_count") or 0)}
+        with self._lock:
+            rows = list(self._rows)
+            bisect.insort(rows, new, key=lambda r: r["name"])
+            keys = list(self._keys)
+            for k in _index_keys(new):
+                bisect.insort(keys, k)
+            self._by_id = {**self._by_id, new["id"]: new}
+            self._by_name = {**self._by_name, _name_key(new["name"]): new}
+            self._rows, self._keys = rows, keys
+        return self
+
+
+def _name_key(name: str) -> str:
+    # Same rule as the ingredients_name_norm_unique index (supabase/00_tables.sql)
+    return (name or "").strip().lower()
+
+
+def _index_keys(row: Dict) -> List[Tuple[str, str]]:
+    words = fold(row["name"]).split()
+    return [(" ".join(words[i:]), row["id"]) for i in range(len(words))]
+
+
+def _rank(row: Dict):
+    return (-row["usage_count"], row["name"].casefold())
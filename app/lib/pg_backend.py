@@ -0,0 +1,310 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from app.lib.supabase_client import _get_setting, get_optional_setting
+
+# =========================
+# Direct Postgres backend (REPO_BACKEND=postgres)
+# =========================
+# Implements app.lib.backend.RepoBackend over a psycopg connection pool:
+# - one transaction per call, run as the caller: the access token is verified
+#   (HS256, SUPABASE_JWT_SECRET) and its claims are set for the transaction
+#   exactly like PostgREST does, so auth.uid() and every RLS policy apply;
+# - statements are prepared server-side (PG_PREPARE_THRESHOLD executions,
+#   "none" to disable, e.g. behind a transaction-mode pooler);
+# - whole-table reads stream through a server-side cursor;
+# - rows come out in PostgREST's JSON shapes straight from SQL (uuid::text,
+#   timestamps through to_json), so no per-value conversion happens in Python;
+# - bulk import goes through COPY into temp tables + one insert ... select each.
+#
+# DATABASE_URL must be a role allowed to SET ROLE authenticated (the Supabase
+# "postgres" role or a dedicated authenticator role), not a superuser bypassing RLS.
+
+CURSOR_ITERSIZE = 5000
+_ALLOWED_ROLES = ("authenticated", "anon")
+
+RECIPE_COLUMNS = (
+    "r.id::text as id, r.name, r.servings, r.prep_minutes, r.cook_minutes, r.total_minutes,"
+    " r.created_by::text as created_by, r.instructions, r.notes"
+)
+EXPORT_RECIPE_COLUMNS = (
+    RECIPE_COLUMNS + ", to_json(r.created_at) #>> '{}' as created_at, to_json(r.updated_at) #>> '{}' as updated_at"
+)
+LINE_COLUMNS = "l.recipe_id::text as recipe_id, l.ingredient_id::text as ingredient_id, l.quantity, l.unit, l.comment"
+SEASON_COLUMNS = "s.recipe_id::text as recipe_id, s.season::text as season"
+
+
+def _fail(where: str, e: Exception):
+    # Same message shape as repos._raise_clean
+    raise RuntimeError(f"{where} failed: {type(e).__name__}: {e}") from e
+
+
+def _b64decode(part: str) -> bytes:
+    return base64.urlsafe_b64decode(part + "=" * (-len(part) % 4))
+
+
+def verify_jwt(token: str, secret: str, leeway: float = 30) -> Dict:
+    """Claims of an HS256 access token; raises ValueError if forged, malformed or expired."""
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(payload_b64))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"malformed access token: {e}") from e
+
+    if header.get("alg") != "HS256":
+        raise ValueError(f"unsupported token algorithm: {header.get('alg')}")
+    expected = hmac.new(secret.encode(), f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest()
+    if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+        raise ValueError("invalid access token signature")
+    if "exp" in claims and time.time() > float(claims["exp"]) + leeway:
+        raise ValueError("access token expired")
+    if claims.get("role") not in _ALLOWED_ROLES:
+        raise ValueError(f"unexpected token role: {claims.get('role')}")
+    return claims
+
+
+class PostgresBackend:
+    def __init__(
+        self,
+        dsn: str,
+        jwt_secret: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        prepare_threshold: Optional[int] = 0,
+    ):
+        from psycopg.rows import dict_row
+        from psycopg_pool import ConnectionPool
+
+        self._jwt_secret = jwt_secret
+        self.pool = ConnectionPool(
+            dsn,
+            min_size=min_size,
+            max_size=max_size,
+            kwargs={"row_factory": dict_row, "prepare_threshold": prepare_threshold, "autocommit": True},
+            name="repos",
+            open=True,
+        )
+
+    def close(self) -> None:
+        self.pool.close()
+
+    # -------- transactions as the caller
+    @contextmanager
+    def _as_user(self, access_token: str):
+        claims = verify_jwt(access_token, self._jwt_secret)
+        with self.pool.connection() as conn, conn.transaction():
+            conn.execute(
+                "select set_config('role', %s, true), "
+                "set_config('request.jwt.claims', %s, true), "
+                "set_config('request.jwt.claim.sub', %s, true)",
+                (claims["role"], json.dumps(claims), claims.get("sub") or ""),
+            )
+            yield conn
+
+    def _all(self, where: str, access_token: str, sql: str, params=()) -> List[Dict]:
+        try:
+            with self._as_user(access_token) as conn:
+                return conn.execute(sql, params).fetchall()
+        except Exception as e:
+            _fail(where, e)
+
+    def _stream(self, where: str, access_token: str, sql: str, params=()) -> List[Dict]:
+        """Whole-table read through a server-side cursor (bounded driver buffers)."""
+        try:
+            with self._as_user(access_token) as conn:
+                with conn.cursor(name=f"repos_{where}") as cur:
+                    cur.itersize = CURSOR_ITERSIZE
+                    cur.execute(sql, params)
+                    return list(cur)
+        except Exception as e:
+            _fail(where, e)
+
+    # -------- profiles / ingredients
+    def list_profiles_by_ids(self, access_token: str, user_ids: List[str]) -> List[Dict]:
+        if not user_ids:
+            return []
+        return self._all(
+            "list_profiles_by_ids", access_token,
+            "select id::text as id, first_name, last_name, role::text as role from public.profiles "
+            "where id = any(%s::uuid[])",
+            (list(user_ids),),
+        )
+
+    def list_ingredients(self, access_token: str) -> List[Dict]:
+        return self._stream(
+            "list_ingredients", access_token,
+            "select id::text as id, name, usage_count from public.ingredients i order by i.name, i.id",
+        )
+
+    def list_ingredients_by_ids(self, access_token: str, ingredient_ids: List[str]) -> List[Dict]:
+        if not ingredient_ids:
+            return []
+        return self._all(
+            "list_ingredients_by_ids", access_token,
+            "select id::text as id, name from public.ingredients where id = any(%s::uuid[])",
+            (list(ingredient_ids),),
+        )
+
+    # -------- recipes
+    def list_recipes(self, access_token: str) -> List[Dict]:
+        return self._stream(
+            "list_recipes", access_token,
+            f"select {RECIPE_COLUMNS} from public.recipes r order by r.name",
+        )
+
+    def list_my_recipes(self, access_token: str, user_id: str) -> List[Dict]:
+        return self._all(
+            "list_my_recipes", access_token,
+            f"select {EXPORT_RECIPE_COLUMNS} from public.recipes r where r.created_by = %s order by r.created_at desc",
+            (user_id,),
+        )
+
+    def list_recipe_ingredients(self, access_token: str) -> List[Dict]:
+        return self._stream(
+            "list_recipe_ingredients", access_token,
+            f"select {LINE_COLUMNS} from public.recipe_ingredients l",
+        )
+
+    def get_recipe_ingredients(self, access_token: str, recipe_id: str) -> List[Dict]:
+        return self._all(
+            "get_recipe_ingredients", access_token,
+            "select ingredient_id::text as ingredient_id, quantity, unit, comment "
+            "from public.recipe_ingredients where recipe_id = %s",
+            (recipe_id,),
+        )
+
+    def list_recipe_seasons(self, access_token: str) -> List[Dict]:
+        return self._stream(
+            "list_recipe_seasons", access_token,
+            f"select {SEASON_COLUMNS} from public.recipe_seasons s",
+        )
+
+    def get_recipe_seasons(self, access_token: str, recipe_id: str) -> List[str]:
+        rows = self._all(
+            "get_recipe_seasons", access_token,
+            "select season::text as season from public.recipe_seasons where recipe_id = %s order by 1",
+            (recipe_id,),
+        )
+        return [r["season"] for r in rows]
+
+    # -------- paged readers (export)
+    def list_recipes_page(self, access_token: str, after_id: Optional[str], limit: int) -> List[Dict]:
+        if after_id:
+            return self._all(
+                "list_recipes_page", access_token,
+                f"select {EXPORT_RECIPE_COLUMNS} from public.recipes r where r.id > %s order by r.id limit %s",
+                (after_id, limit),
+            )
+        return self._all(
+            "list_recipes_page", access_token,
+            f"select {EXPORT_RECIPE_COLUMNS} from public.recipes r order by r.id limit %s",
+            (limit,),
+        )
+
+    def list_recipe_seasons_range(self, access_token: str, first_id: str, last_id: str) -> List[Dict]:
+        return self._all(
+            "list_recipe_seasons_range", access_token,
+            f"select {SEASON_COLUMNS} from public.recipe_seasons s "
+            "where s.recipe_id between %s and %s order by s.recipe_id, s.season",
+            (first_id, last_id),
+        )
+
+    def list_recipe_ingredients_range(self, access_token: str, first_id: str, last_id: str) -> List[Dict]:
+        return self._all(
+            "list_recipe_ingredients_range", access_token,
+            f"select {LINE_COLUMNS} from public.recipe_ingredients l "
+            "where l.recipe_id between %s and %s order by l.recipe_id, l.ingredient_id",
+            (first_id, last_id),
+        )
+
+    # -------- bulk import (COPY)
+    def import_recipes(self, access_token: str, recipes: List[Dict]) -> int:
+        """
+        Same contract as the import_recipes RPC (supabase/13_import_recipes.sql),
+        with rows streamed by COPY instead of a JSON parameter. All-or-nothing.
+        """
+        if not recipes:
+            return 0
+        try:
+            with self._as_user(access_token) as conn:
+                conn.execute(
+                    "create temp table _import_recipes ("
+                    " id uuid, name text, servings int, prep_minutes int, cook_minutes int,"
+                    " instructions text, notes text) on commit drop;"
+                    "create temp table _import_seasons (recipe_id uuid, season text) on commit drop;"
+                    "create temp table _import_lines ("
+                    " recipe_id uuid, ingredient_id uuid, quantity text, unit text, comment text) on commit drop",
+                    prepare=False,
+                )
+                with conn.cursor() as cur:
+                    with cur.copy(
+                        "copy _import_recipes (id, name, servings, prep_minutes, cook_minutes, instructions, notes) "
+                        "from stdin"
+                    ) as copy:
+                        for r in recipes:
+                            copy.write_row((
+                                r["id"], r["name"], r.get("servings"), r.get("prep_minutes"),
+                                r.get("cook_minutes"), r.get("instructions"), r.get("notes"),
+                            ))
+                    with cur.copy("copy _import_seasons (recipe_id, season) from stdin") as copy:
+                        for r in recipes:
+                            for season in r.get("seasons") or []:
+                                copy.write_row((r["id"], season))
+                    with cur.copy(
+                        "copy _import_lines (recipe_id, ingredient_id, quantity, unit, comment) from stdin"
+                    ) as copy:
+                        for r in recipes:
+                            for line in r.get("lines") or []:
+                                copy.write_row((
+                                    r["id"], line["ingredient_id"], line.get("quantity"),
+                                    line.get("unit"), line.get("comment"),
+                                ))
+
+                # Runs as the caller: the editor + owner policies apply, created_by is auth.uid()
+                inserted = conn.execute(
+                    "insert into public.recipes "
+                    "(id, name, servings, prep_minutes, cook_minutes, instructions, notes, created_by) "
+                    "select id, name, coalesce(servings, 1), coalesce(prep_minutes, 0), coalesce(cook_minutes, 0), "
+                    "nullif(instructions, ''), nullif(notes, ''), auth.uid() from _import_recipes"
+                ).rowcount
+                conn.execute(
+                    "insert into public.recipe_seasons (recipe_id, season) "
+                    "select recipe_id, season::public.season_enum from _import_seasons on conflict do nothing"
+                )
+                conn.execute(
+                    "insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity, unit, comment) "
+                    "select recipe_id, ingredient_id, nullif(quantity, ''), nullif(unit, ''), nullif(comment, '') "
+                    "from _import_lines"
+                )
+                return inserted
+        except Exception as e:
+            _fail("import_recipes", e)
+
+
+# =========================
+# Process-wide instance
+# =========================
+_lock = threading.Lock()
+_backend: Optional[PostgresBackend] = None
+
+
+def get_backend() -> PostgresBackend:
+    global _backend
+    with _lock:
+        if _backend is None:
+            threshold = get_optional_setting("PG_PREPARE_THRESHOLD", "0")
+            _backend = PostgresBackend(
+                _get_setting("DATABASE_URL"),
+                _get_setting("SUPABASE_JWT_SECRET"),
+                min_size=int(get_optional_setting("PG_POOL_MIN_SIZE", "1")),
+                max_size=int(get_optional_setting("PG_POOL_MAX_SIZE", "10")),
+                prepare_threshold=None if threshold.lower() == "none" else int(threshold),
+            )
+        return _backend
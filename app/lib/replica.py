@@ -0,0 +1,519 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.lib.repos import (
+    list_ingredients,
+    list_profiles,
+    list_recipe_ingredients_for,
+    list_recipe_ingredients_range,
+    list_recipe_seasons_for,
+    list_recipe_seasons_range,
+    list_recipe_tombstones_since,
+    list_recipes_changed_since,
+    list_recipes_page,
+)
+from app.lib.supabase_client import get_optional_setting
+
+log = logging.getLogger(__name__)
+
+# =========================
+# Optional local read replica (SQLite)
+# =========================
+# A copy of the catalog tables in an embedded SQLite file, kept current by a
+# background incremental sync (recipes.updated_at cursor + tombstones, see
+# supabase/14_replica_sync.sql). Reads that scan the whole catalog (Browse
+# filters, Home analytics) run locally; writes still go to Supabase.
+#
+# Disabled unless REPLICA_PATH is set. Pages must check ensure_synced() and
+# fall back to the cached PostgREST loaders when it returns False.
+REPLICA_PATH = get_optional_setting("REPLICA_PATH", "")
+REPLICA_SYNC_SECONDS = float(get_optional_setting("REPLICA_SYNC_SECONDS", "30"))
+
+# updated_at is the transaction start time, so a row can become visible after
+# a later cursor was taken: every incremental sync re-reads this window.
+SYNC_OVERLAP_SECONDS = 60
+# Tombstones are purged after 30 days server-side: older replicas reload fully.
+FULL_RESYNC_AFTER = timedelta(days=29)
+
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+create table if not exists recipes (
+  id text primary key,
+  name text not null,
+  servings integer,
+  prep_minutes integer,
+  cook_minutes integer,
+  total_minutes integer,
+  created_by text,
+  created_at text,
+  updated_at text,
+  instructions text,
+  notes text
+);
+create index if not exists idx_recipes_name on recipes(name);
+create index if not exists idx_recipes_created_by on recipes(created_by);
+create index if not exists idx_recipes_total_minutes on recipes(total_minutes);
+
+create table if not exists recipe_seasons (
+  recipe_id text not null,
+  season text not null,
+  primary key (recipe_id, season)
+) without rowid;
+create index if not exists idx_recipe_seasons_season on recipe_seasons(season, recipe_id);
+
+create table if not exists recipe_ingredients (
+  recipe_id text not null,
+  ingredient_id text not null,
+  quantity text,
+  unit text,
+  comment text,
+  primary key (recipe_id, ingredient_id)
+) without rowid;
+create index if not exists idx_recipe_ingredients_ingredient on recipe_ingredients(ingredient_id, recipe_id);
+
+create table if not exists ingredients (
+  id text primary key,
+  name text not null,
+  usage_count integer not null default 0
+);
+create index if not exists idx_ingredients_name on ingredients(name);
+
+create table if not exists profiles (
+  id text primary key,
+  first_name text,
+  last_name text,
+  role text
+);
+
+create table if not exists sync_state (
+  key text primary key,
+  value text
+);
+"""
+
+_RECIPE_COLUMNS = (
+    "id", "name", "servings", "prep_minutes", "cook_minutes", "total_minutes",
+    "created_by", "created_at", "updated_at", "instructions", "notes",
+)
+_LINE_COLUMNS = ("recipe_id", "ingredient_id", "quantity", "unit", "comment")
+
+_local = threading.local()
+_sync_lock = threading.Lock()
+_sync_thread: Optional[threading.Thread] = None
+_last_error: Optional[str] = None
+
+_catalog_lock = threading.Lock()
+_catalog: Optional[Tuple[str, Tuple[List[Dict], List[Dict], List[Dict]]]] = None
+
+
+def enabled() -> bool:
+    return bool(REPLICA_PATH)
+
+
+# =========================
+# Connections (one per thread, WAL: readers never block the sync writer)
+# =========================
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    Path(REPLICA_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(REPLICA_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("pragma journal_mode = wal")
+    conn.execute("pragma synchronous = normal")
+    conn.execute("pragma temp_store = memory")
+
+    version = conn.execute("pragma user_version").fetchone()[0]
+    if version != SCHEMA_VERSION:
+        with _write(conn):
+            for table in ("recipes", "recipe_seasons", "recipe_ingredients", "ingredients", "profiles", "sync_state"):
+                conn.execute(f"drop table if exists {table}")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"pragma user_version = {SCHEMA_VERSION}")
+
+    _local.conn = conn
+    return conn
+
+
+@contextmanager
+def _write(conn: sqlite3.Connection):
+    # "begin immediate": several app processes may share one file; the second
+    # writer waits on the lock (timeout above) instead of failing mid-sync.
+    conn.execute("begin immediate")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("rollback")
+        raise
+    conn.execute("commit")
+
+
+def _get_state(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("select value from sync_state where key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_state(conn: sqlite3.Connection, **values: Any) -> None:
+    conn.executemany(
+        "insert into sync_state (key, value) values (?, ?) "
+        "on conflict (key) do update set value = excluded.value",
+        [(k, None if v is None else str(v)) for k, v in values.items()],
+    )
+
+
+# =========================
+# Sync
+# =========================
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _iso(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).isoformat()
+
+
+def _max_ts(current: Optional[str], rows: Iterable[Dict], col: str) -> Optional[str]:
+    best = _parse_ts(current) if current else None
+    for r in rows:
+        if r.get(col):
+            ts = _parse_ts(r[col])
+            if best is None or ts > best:
+                best = ts
+    return _iso(best) if best else current
+
+
+def _insert_recipes(conn: sqlite3.Connection, recipes: List[Dict]) -> None:
+    conn.executemany(
+        f"insert or replace into recipes ({','.join(_RECIPE_COLUMNS)}) "
+        f"values ({','.join('?' * len(_RECIPE_COLUMNS))})",
+        [tuple(r.get(c) for c in _RECIPE_COLUMNS) for r in recipes],
+    )
+
+
+def _insert_children(conn: sqlite3.Connection, seasons: List[Dict], links: List[Dict]) -> None:
+    conn.executemany(
+        "insert or ignore into recipe_seasons (recipe_id, season) values (?, ?)",
+        [(r["recipe_id"], r["season"]) for r in seasons],
+    )
+    conn.executemany(
+        f"insert or replace into recipe_ingredients ({','.join(_LINE_COLUMNS)}) values (?, ?, ?, ?, ?)",
+        [tuple(r.get(c) for c in _LINE_COLUMNS) for r in links],
+    )
+
+
+def _delete_recipes(conn: sqlite3.Connection, recipe_ids: List[str], children_only: bool = False) -> None:
+    for i in range(0, len(recipe_ids), 500):
+        batch = recipe_ids[i:i + 500]
+        marks = ",".join("?" * len(batch))
+        conn.execute(f"delete from recipe_seasons where recipe_id in ({marks})", batch)
+        conn.execute(f"delete from recipe_ingredients where recipe_id in ({marks})", batch)
+        if not children_only:
+            conn.execute(f"delete from recipes where id in ({marks})", batch)
+
+
+def _sync_reference_tables(conn: sqlite3.Connection, access_token: str) -> bool:
+    """
+    Small tables without a change cursor: read whole on every sync, rewritten
+    only when their checksum moved (a rename, a merge, a profile edit).
+    True if they changed.
+    """
+    ingredients = sorted((r["id"], r["name"], r.get("usage_count") or 0) for r in list_ingredients(access_token))
+    profiles = sorted(
+        (r["id"], r.get("first_name"), r.get("last_name"), r.get("role")) for r in list_profiles(access_token)
+    )
+    checksum = hashlib.sha1(repr((ingredients, profiles)).encode()).hexdigest()
+    if checksum == _get_state(conn, "reference_checksum"):
+        return False
+
+    conn.execute("delete from ingredients")
+    conn.executemany("insert into ingredients (id, name, usage_count) values (?, ?, ?)", ingredients)
+    conn.execute("delete from profiles")
+    conn.executemany("insert into profiles (id, first_name, last_name, role) values (?, ?, ?, ?)", profiles)
+    _set_state(conn, reference_checksum=checksum)
+    return True
+
+
+def _full_load(conn: sqlite3.Connection, access_token: str, started: datetime) -> int:
+    """Reload everything in one transaction (readers keep the previous copy until commit)."""
+    cursor: Optional[str] = None
+    count = 0
+    with _write(conn):
+        for table in ("recipes", "recipe_seasons", "recipe_ingredients"):
+            conn.execute(f"delete from {table}")
+
+        after_id = None
+        while True:
+            recipes = list_recipes_page(access_token, after_id, 1000)
+            if not recipes:
+                break
+            first_id, after_id = recipes[0]["id"], recipes[-1]["id"]
+            _insert_recipes(conn, recipes)
+            _insert_children(
+                conn,
+                list_recipe_seasons_range(access_token, first_id, after_id),
+                list_recipe_ingredients_range(access_token, first_id, after_id),
+            )
+            cursor = _max_ts(cursor, recipes, "updated_at")
+            count += len(recipes)
+            if len(recipes) < 1000:
+                break
+
+        _sync_reference_tables(conn, access_token)
+        _set_state(
+            conn,
+            recipes_cursor=cursor or _iso(started),
+            tombstones_cursor=_iso(started),
+            full_sync_at=_iso(started),
+        )
+    return count
+
+
+def _incremental(conn: sqlite3.Connection, access_token: str, started: datetime) -> int:
+    """
+    Apply recipes changed and deleted since the stored cursors. Returns how
+    many were, plus one if the reference tables changed (0: nothing did).
+    """
+    recipes_cursor = _get_state(conn, "recipes_cursor")
+    tombstones_cursor = _get_state(conn, "tombstones_cursor")
+    overlap = timedelta(seconds=SYNC_OVERLAP_SECONDS)
+
+    # Read first, write after: the write lock is held only for the local apply
+    changed: List[Dict] = []
+    since = _iso(_parse_ts(recipes_cursor) - overlap)
+    after = None
+    while True:
+        page = list_recipes_changed_since(access_token, since, after, 1000)
+        changed += page
+        if len(page) < 1000:
+            break
+        after = (page[-1]["updated_at"], page[-1]["id"])
+
+    changed_ids = [r["id"] for r in changed]
+    seasons = list_recipe_seasons_for(access_token, changed_ids) if changed_ids else []
+    links = list_recipe_ingredients_for(access_token, changed_ids) if changed_ids else []
+    tombstones = list_recipe_tombstones_since(access_token, _iso(_parse_ts(tombstones_cursor) - overlap))
+
+    with _write(conn):
+        if changed:
+            _insert_recipes(conn, changed)
+            _delete_recipes(conn, changed_ids, children_only=True)
+            _insert_children(conn, seasons, links)
+        # A recipe re-read in this sync is alive: it can't be behind its tombstone
+        alive = set(changed_ids)
+        _delete_recipes(conn, [t["recipe_id"] for t in tombstones if t["recipe_id"] not in alive])
+        references_changed = _sync_reference_tables(conn, access_token)
+        _set_state(
+            conn,
+            recipes_cursor=_max_ts(recipes_cursor, changed, "updated_at"),
+            tombstones_cursor=_max_ts(tombstones_cursor, tombstones, "deleted_at"),
+        )
+    return len(changed) + len(tombstones) + int(references_changed)
+
+
+def sync(access_token: str) -> None:
+    """One sync pass (full the first time or when too old, incremental otherwise)."""
+    global _last_error
+    conn = _connect()
+    started = datetime.now(timezone.utc)
+    t0 = time.monotonic()
+
+    full_sync_at = _get_state(conn, "full_sync_at")
+    synced_at = _get_state(conn, "synced_at")
+    full = (
+        not full_sync_at
+        or not _get_state(conn, "recipes_cursor")
+        or not synced_at
+        or started - _parse_ts(synced_at) > FULL_RESYNC_AFTER
+    )
+
+    try:
+        changes = _full_load(conn, access_token, started) if full else _incremental(conn, access_token, started)
+    except Exception as e:
+        _last_error = str(e)
+        raise
+    _last_error = None
+
+    with _write(conn):
+        state = {"synced_at": _iso(started), "last_sync_ms": round((time.monotonic() - t0) * 1000)}
+        if full or changes:
+            state["generation"] = int(_get_state(conn, "generation") or 0) + 1
+        _set_state(conn, **state)
+
+
+def _sync_in_background(access_token: str) -> None:
+    global _sync_thread
+
+    def _run():
+        global _sync_thread
+        try:
+            sync(access_token)
+        except Exception as e:
+            log.warning("Replica sync failed: %s", e)
+        finally:
+            with _sync_lock:
+                _sync_thread = None
+
+    with _sync_lock:
+        if _sync_thread is not None:
+            return
+        _sync_thread = threading.Thread(target=_run, name="replica-sync", daemon=True)
+        _sync_thread.start()
+
+
+def ready() -> bool:
+    """True once a full load has completed (the replica can serve reads)."""
+    if not enabled():
+        return False
+    try:
+        return _get_state(_connect(), "full_sync_at") is not None
+    except sqlite3.Error:
+        return False
+
+
+def ensure_synced(access_token: str) -> bool:
+    """
+    Never blocks on the network: starts a background sync when the replica is
+    older than REPLICA_SYNC_SECONDS, and returns whether it can serve reads now.
+    Until the first full load is done, callers use the cached PostgREST loaders.
+    """
+    if not enabled():
+        return False
+    try:
+        synced_at = _get_state(_connect(), "synced_at")
+    except sqlite3.Error as e:
+        log.warning("Replica unavailable: %s", e)
+        return False
+
+    age = (datetime.now(timezone.utc) - _parse_ts(synced_at)).total_seconds() if synced_at else None
+    if age is None or age > REPLICA_SYNC_SECONDS:
+        _sync_in_background(access_token)
+    return ready()
+
+
+def sync_soon(access_token: str) -> None:
+    """Ask for a sync now (e.g. right after a write), without waiting for it."""
+    if enabled():
+        _sync_in_background(access_token)
+
+
+# =========================
+# Reads
+# =========================
+def load_catalog() -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    (recipes, links, seasons) in the shapes of cached_list_recipes,
+    cached_list_recipe_ingredients and cached_list_recipe_seasons.
+    Rebuilt only when a sync changed something (shared, treat as read-only).
+    """
+    global _catalog
+    conn = _connect()
+    generation = _get_state(conn, "generation") or "0"
+    with _catalog_lock:
+        if _catalog is not None and _catalog[0] == generation:
+            return _catalog[1]
+
+    recipes = [dict(r) for r in conn.execute(
+        f"select {', '.join(_RECIPE_COLUMNS)} from recipes order by name"
+    )]
+    links = [
+        {
+            "recipe_id": r["recipe_id"],
+            "ingredient_id": r["ingredient_id"],
+            "quantity": r["quantity"],
+            "unit": r["unit"],
+            "comment": r["comment"],
+            "ingredient_name": r["name"],
+        }
+        for r in conn.execute(
+            "select ri.recipe_id, ri.ingredient_id, ri.quantity, ri.unit, ri.comment, i.name "
+            "from recipe_ingredients ri join ingredients i on i.id = ri.ingredient_id"
+        )
+    ]
+    seasons = [dict(r) for r in conn.execute("select recipe_id, season from recipe_seasons")]
+
+    catalog = (recipes, links, seasons)
+    with _catalog_lock:
+        _catalog = (generation, catalog)
+    return catalog
+
+
+def list_profiles_by_ids(user_ids: Iterable[str]) -> List[Dict]:
+    ids = list(user_ids)
+    if not ids:
+        return []
+    marks = ",".join("?" * len(ids))
+    return [dict(r) for r in _connect().execute(
+        f"select id, first_name, last_name from profiles where id in ({marks})", ids
+    )]
+
+
+def _match_clause(column: str, table: str, values: List[str], match_all: bool) -> Tuple[str, List[Any]]:
+    marks = ",".join("?" * len(values))
+    if match_all:
+        return (
+            f"r.id in (select recipe_id from {table} where {column} in ({marks}) "
+            f"group by recipe_id having count(distinct {column}) = ?)",
+            [*values, len(set(values))],
+        )
+    return f"r.id in (select recipe_id from {table} where {column} in ({marks}))", list(values)
+
+
+def filter_recipe_ids(
+    seasons: Optional[List[str]] = None,
+    seasons_match_all: bool = False,
+    creator_ids: Optional[List[str]] = None,
+    ingredient_ids: Optional[List[str]] = None,
+    ingredients_match_all: bool = False,
+    search: str = "",
+) -> set:
+    """Ids of recipes matching the Browse filters, answered from the replica's indexes."""
+    where: List[str] = []
+    params: List[Any] = []
+
+    if seasons:
+        clause, args = _match_clause("season", "recipe_seasons", seasons, seasons_match_all)
+        where.append(clause)
+        params += args
+
+    if creator_ids is not None:
+        marks = ",".join("?" * len(creator_ids)) or "null"
+        where.append(f"r.created_by in ({marks})")
+        params += creator_ids
+
+    if ingredient_ids:
+        clause, args = _match_clause("ingredient_id", "recipe_ingredients", ingredient_ids, ingredients_match_all)
+        where.append(clause)
+        params += args
+
+    if search.strip():
+        pattern = search.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        where.append("r.name like ? escape '\\'")
+        params.append(f"%{pattern}%")
+
+    sql = "select r.id from recipes r" + (" where " + " and ".join(where) if where else "")
+    return {row[0] for row in _connect().execute(sql, params)}
+
+
+def stats() -> Dict[str, Any]:
+    """Row counts and sync bookkeeping, for diagnostics."""
+    if not enabled():
+        return {"enabled": False}
+    conn = _connect()
+    out: Dict[str, Any] = {"enabled": True, "path": REPLICA_PATH, "last_error": _last_error}
+    for table in ("recipes", "recipe_seasons", "recipe_ingredients", "ingredients", "profiles"):
+        out[table] = conn.execute(f"select count(*) from {table}").fetchone()[0]
+    for key in ("synced_at", "full_sync_at", "last_sync_ms", "generation", "recipes_cursor"):
+        out[key] = _get_state(conn, key)
+    return out
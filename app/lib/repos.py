@@ -1,7 +1,14 @@
-from typing import Optional, List, Dict, Tuple
-import streamlit as st
+import functools
+import math
+import time
+from typing import Optional, List, Dict, Sequence, Tuple
 
-from app.lib.supabase_client import get_supabase, authed_postgrest
+from app.lib.backend import RepoBackend
+from app.lib.cache import LRUCache, SingleFlight, SWRCache, VersionProbe, memoize
+from app.lib.http_json import fetch_rows
+from app.lib.ingredients import IngredientDictionary
+from app.lib.snapshot import SharedTable
+from app.lib.supabase_client import get_supabase, authed_postgrest, get_optional_setting
 
 
 # =========================
@@ -12,6 +19,30 @@ def _sb(access_token: str):
     return authed_postgrest(get_supabase(), access_token)
 
 
+# REPO_BACKEND=postgres routes the reads and the bulk import of
+# app/lib/backend.RepoBackend to a direct Postgres connection pool
+# (app/lib/pg_backend.py). Everything else stays on PostgREST.
+REPO_BACKEND = get_optional_setting("REPO_BACKEND", "postgrest").strip().lower()
+
+
+def _direct() -> Optional[RepoBackend]:
+    if REPO_BACKEND != "postgres":
+        return None
+    from app.lib.pg_backend import get_backend
+
+    return get_backend()
+
+
+# Concurrent identical reads (e.g. every session missing the catalog cache at
+# once) share one in-flight request. See single_flight_stats().
+_flight = SingleFlight()
+
+
+def single_flight_stats() -> Dict:
+    """How many duplicate loader calls were absorbed by request coalescing."""
+    return _flight.stats()
+
+
 def _as_tuple_ids(ids: List[str] | Tuple[str, ...]) -> Tuple[str, ...]:
     """Streamlit cache hashing is more reliable with tuples."""
     if not ids:
@@ -25,6 +56,27 @@ def _mask_token(tok: str) -> str:
     return tok[:12] + "..." + tok[-6:]
 
 
+def _norm_value(v):
+    """Normalize a field value for diffing: NaN/blank -> None, numpy scalars -> Python."""
+    if v is None:
+        return None
+    if hasattr(v, "item") and not isinstance(v, (str, bytes)):
+        v = v.item()
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    if isinstance(v, str) and not v.strip():
+        return None
+    return v
+
+
+def _changed_fields(current: Dict, patch: Dict, allowed) -> Dict:
+    """Subset of `patch` (restricted to `allowed`) whose value differs from `current`."""
+    return {
+        k: v for k, v in patch.items()
+        if k in allowed and _norm_value(v) != _norm_value((current or {}).get(k))
+    }
+
+
 def _raise_clean(where: str, e: Exception):
     """
     Raise a non-redacted error message (safe) so Streamlit shows useful info.
@@ -87,6 +139,32 @@ def set_my_role(access_token: str, user_id: str, role: str) -> bool:
     return True
 
 
+def bootstrap_session(access_token: str, user_id: str) -> Dict:
+    """
+    Ensure my profile exists and return {role, display_name} in ONE round trip
+    (RPC public.bootstrap_session, see supabase/06_bootstrap_session.sql).
+    Falls back to ensure_my_profile + get_my_role if the RPC isn't deployed yet.
+    """
+    sb = _sb(access_token)
+    try:
+        res = sb.rpc("bootstrap_session", {}).execute()
+    except Exception as e:
+        # PGRST202 = function not found in the schema cache (migration not applied)
+        if "PGRST202" not in str(e):
+            _raise_clean("bootstrap_session", e)
+        ensure_my_profile(access_token, user_id)
+        return {"role": get_my_role(access_token, user_id), "display_name": None}
+
+    data = res.data or {}
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    return {
+        "role": data.get("role") or "reader",
+        "display_name": data.get("display_name"),
+    }
+
+
+@_flight.coalesce
 def list_profiles_by_ids(access_token: str, user_ids: List[str]) -> List[Dict]:
     """
     Fetch profiles for a set of user ids (UUIDs).
@@ -95,20 +173,19 @@ def list_profiles_by_ids(access_token: str, user_ids: List[str]) -> List[Dict]:
     ids = _as_tuple_ids(user_ids)
     if not ids:
         return []
+    if _direct():
+        return _direct().list_profiles_by_ids(access_token, list(ids))
 
     sb = _sb(access_token)
     try:
-        res = (
+        return fetch_rows(
             sb.table("profiles")
             .select("id,first_name,last_name,role")
             .in_("id", list(ids))
-            .execute()
         )
     except Exception as e:
         _raise_clean("list_profiles_by_ids", e)
 
-    return res.data or []
-
 
 def map_creator_ids_to_names(access_token: str, creator_ids: List[str]) -> Dict[str, str]:
     profiles = list_profiles_by_ids(access_token, creator_ids)
@@ -124,13 +201,62 @@ def map_creator_ids_to_names(access_token: str, creator_ids: List[str]) -> Dict[
 # =========================
 # Ingredients
 # =========================
+@_flight.coalesce
 def list_ingredients(access_token: str) -> List[Dict]:
+    """Every ingredient, paged past the response row cap (link rows are named from this list)."""
+    if _direct():
+        return _direct().list_ingredients(access_token)
+    sb = _sb(access_token)
+    columns = "id,name,usage_count"
+    rows: List[Dict] = []
+    while True:
+        try:
+            batch = fetch_rows(
+                sb.table("ingredients").select(columns).order("name").order("id")
+                .range(len(rows), len(rows) + PAGE_MAX_ROWS - 1)
+            )
+        except Exception as e:
+            # 42703 = undefined column (supabase/12_ingredient_usage_count.sql not applied yet)
+            if "42703" not in str(e) or columns == "id,name":
+                _raise_clean("list_ingredients", e)
+            columns = "id,name"
+            continue
+        rows += batch
+        if len(batch) < PAGE_MAX_ROWS:
+            return rows
+
+
+def list_ingredients_by_ids(access_token: str, ingredient_ids: List[str]) -> List[Dict]:
+    if _direct():
+        return _direct().list_ingredients_by_ids(access_token, ingredient_ids)
     sb = _sb(access_token)
+    rows: List[Dict] = []
     try:
-        res = sb.table("ingredients").select("id,name").order("name").execute()
+        for i in range(0, len(ingredient_ids), ID_BATCH):
+            rows += fetch_rows(sb.table("ingredients").select("id,name").in_("id", ingredient_ids[i:i + ID_BATCH]))
     except Exception as e:
-        _raise_clean("list_ingredients", e)
-    return res.data or []
+        _raise_clean("list_ingredients_by_ids", e)
+    return rows
+
+
+def _join_ingredient_names(access_token: str, links: List[Dict]) -> List[Dict]:
+    """
+    Link rows are fetched with ingredient_id only: set a flat `ingredient_name`
+    from the cached ingredient dictionary instead of embedding the ingredient
+    in every row. Ids the dictionary doesn't know yet (created since it was
+    loaded) are fetched and added to it.
+    """
+    dictionary = cached_ingredient_dictionary(access_token)
+    missing = sorted({r["ingredient_id"] for r in links if dictionary.get(r["ingredient_id"]) is None})
+    if missing:
+        for row in list_ingredients_by_ids(access_token, missing):
+            _patch_ingredient(row)
+        dictionary = cached_ingredient_dictionary(access_token)
+
+    for r in links:
+        row = dictionary.get(r["ingredient_id"])
+        r["ingredient_name"] = row["name"] if row else None
+    return links
 
 
 def create_ingredient(access_token: str, name: str) -> Dict:
@@ -139,7 +265,33 @@ def create_ingredient(access_token: str, name: str) -> Dict:
         res = sb.table("ingredients").insert({"name": name}).execute()
     except Exception as e:
         _raise_clean("create_ingredient", e)
-    return res.data[0] if res.data else {}
+    row = res.data[0] if res.data else {}
+    _patch_ingredient(row)
+    return row
+
+
+def create_ingredients(access_token: str, names: List[str]) -> List[Dict]:
+    """
+    Create many ingredients in ONE RPC (supabase/18_create_ingredients.sql,
+    20_create_ingredients_inserted.sql). Names that already exist under the
+    database's rule (lower(trim(name)): "basil" vs "Basil", or created
+    concurrently) are not inserted: their existing row is returned instead.
+    Returns the {id, name, inserted} rows for every requested name; `inserted`
+    is true only for the ingredients this call created.
+    """
+    names = sorted({n.strip() for n in names or [] if n and n.strip()})
+    if not names:
+        return []
+
+    sb = _sb(access_token)
+    try:
+        rows = sb.rpc("create_ingredients", {"p_names": names}).execute().data or []
+    except Exception as e:
+        _raise_clean("create_ingredients", e)
+
+    for row in rows:
+        _patch_ingredient(row)
+    return rows
 
 
 def find_ingredient_by_name(access_token: str, name: str) -> Optional[Dict]:
@@ -157,6 +309,32 @@ def find_ingredient_by_name(access_token: str, name: str) -> Optional[Dict]:
     return res.data
 
 
+def merge_ingredients(access_token: str, merges: Dict[str, List[str]]) -> Dict:
+    """
+    Merge duplicate ingredients: {target_id: [source_ids]}. Every recipe line is
+    repointed to its target (conflicting lines are folded into the target
+    line's comment) and the sources are deleted — all groups in ONE set-based
+    call (supabase/11_merge_ingredients.sql). Editors only.
+
+    Returns {"repointed": n, "folded": n, "deleted": n}.
+    """
+    payload = [
+        {"target": target, "sources": sorted({s for s in sources if s and s != target})}
+        for target, sources in (merges or {}).items()
+    ]
+    payload = [g for g in payload if g["sources"]]
+    if not payload:
+        return {"repointed": 0, "folded": 0, "deleted": 0}
+
+    sb = _sb(access_token)
+    try:
+        res = sb.rpc("merge_ingredients", {"p_merges": payload}).execute()
+    except Exception as e:
+        _raise_clean("merge_ingredients", e)
+    invalidate_ingredient_caches()
+    return res.data or {}
+
+
 # =========================
 # Recipes
 # =========================
@@ -166,19 +344,26 @@ def create_recipe(access_token: str, payload: Dict) -> Dict:
         res = sb.table("recipes").insert(payload).execute()
     except Exception as e:
         _raise_clean("create_recipe", e)
-    return res.data[0] if res.data else {}
+    row = res.data[0] if res.data else {}
+    if row.get("id"):
+        _patch_recipe(row["id"], row)
+    return row
+
+
+RECIPE_EDITABLE_FIELDS = {"name", "servings", "prep_minutes", "cook_minutes", "instructions", "notes"}
 
 
 def update_recipe(access_token: str, recipe_id: str, patch: Dict) -> Dict:
     sb = _sb(access_token)
-    allowed = {k: v for k, v in patch.items() if k in {
-        "name", "servings", "prep_minutes", "cook_minutes", "instructions", "notes"
-    }}
+    allowed = {k: v for k, v in patch.items() if k in RECIPE_EDITABLE_FIELDS}
     try:
         res = sb.table("recipes").update(allowed).eq("id", recipe_id).execute()
     except Exception as e:
         _raise_clean("update_recipe", e)
-    return res.data[0] if res.data else {}
+    row = res.data[0] if res.data else {}
+    if row:
+        _patch_recipe(recipe_id, row)
+    return row
 
 
 def delete_recipe(access_token: str, recipe_id: str) -> bool:
@@ -187,30 +372,81 @@ def delete_recipe(access_token: str, recipe_id: str) -> bool:
         sb.table("recipes").delete().eq("id", recipe_id).execute()
     except Exception as e:
         _raise_clean("delete_recipe", e)
+    _patch_recipe(recipe_id, delete=True)
     return True
 
 
+def clone_recipe(access_token: str, recipe_id: str) -> Dict:
+    """
+    Duplicate a recipe with its seasons and ingredient lines, server-side in one
+    transaction (supabase/10_clone_recipe.sql). The copy belongs to the caller
+    and is named "<name> (copy)". Returns the new recipe row.
+    """
+    sb = _sb(access_token)
+    try:
+        res = sb.rpc("clone_recipe", {"p_recipe_id": recipe_id}).execute()
+    except Exception as e:
+        _raise_clean("clone_recipe", e)
+    row = res.data or {}
+    if isinstance(row, list):
+        row = row[0] if row else {}
+    if row.get("id"):
+        _patch_recipe(row["id"], row)
+        _patch_clone_children(recipe_id, row["id"])
+    return row
+
+
+def import_recipes(access_token: str, user_id: str, recipes: List[Dict]) -> int:
+    """
+    Write a chunk of recipes with their seasons and ingredient lines in ONE RPC
+    (supabase/13_import_recipes.sql). Each recipe carries its own "id" (uuid
+    from the caller) plus "seasons" and "lines" ({ingredient_id, quantity,
+    unit, comment}). All-or-nothing per call. Returns how many recipes were
+    inserted.
+    """
+    if not recipes:
+        return 0
+
+    if _direct():
+        # Same statements, with the rows streamed by COPY
+        inserted = _direct().import_recipes(access_token, recipes)
+    else:
+        sb = _sb(access_token)
+        try:
+            res = sb.rpc("import_recipes", {"p_recipes": recipes}).execute()
+        except Exception as e:
+            _raise_clean("import_recipes", e)
+        inserted = int(res.data or 0)
+
+    _patch_imported(user_id, recipes)
+    return inserted
+
+
+@_flight.coalesce
 def list_recipes(access_token: str) -> List[Dict]:
+    if _direct():
+        return _direct().list_recipes(access_token)
     sb = _sb(access_token)
     try:
-        res = (
+        return fetch_rows(
             sb.table("recipes")
             .select(
                 "id,name,servings,prep_minutes,cook_minutes,total_minutes,created_by,"
                 "instructions,notes"
             )
             .order("name", desc=False)
-            .execute()
         )
     except Exception as e:
         _raise_clean("list_recipes", e)
-    return res.data or []
 
 
+@_flight.coalesce
 def list_my_recipes(access_token: str, user_id: str) -> List[Dict]:
+    if _direct():
+        return _direct().list_my_recipes(access_token, user_id)
     sb = _sb(access_token)
     try:
-        res = (
+        return fetch_rows(
             sb.table("recipes")
             .select(
                 "id,name,servings,prep_minutes,cook_minutes,total_minutes,created_by,"
@@ -218,14 +454,12 @@ def list_my_recipes(access_token: str, user_id: str) -> List[Dict]:
             )
             .eq("created_by", user_id)
             .order("created_at", desc=True)
-            .execute()
         )
     except Exception as e:
         _raise_clean(
             f"list_my_recipes(user_id={user_id}, token={_mask_token(access_token)})",
             e,
         )
-    return res.data or []
 
 
 # =========================
@@ -237,34 +471,42 @@ def add_recipe_ingredient(access_token: str, payload: Dict) -> Dict:
         res = sb.table("recipe_ingredients").insert(payload).execute()
     except Exception as e:
         _raise_clean("add_recipe_ingredient", e)
-    return res.data[0] if res.data else {}
+    row = res.data[0] if res.data else {}
+    if row:
+        _patch_link(row)
+    return row
 
 
+@_flight.coalesce
 def get_recipe_ingredients(access_token: str, recipe_id: str) -> List[Dict]:
+    if _direct():
+        return _join_ingredient_names(access_token, _direct().get_recipe_ingredients(access_token, recipe_id))
     sb = _sb(access_token)
     try:
         res = (
             sb.table("recipe_ingredients")
-            .select("ingredient_id,quantity,unit,comment,ingredients(name)")
+            .select("ingredient_id,quantity,unit,comment")
             .eq("recipe_id", recipe_id)
             .execute()
         )
     except Exception as e:
         _raise_clean("get_recipe_ingredients", e)
-    return res.data or []
+    return _join_ingredient_names(access_token, res.data or [])
 
 
+@_flight.coalesce
 def list_recipe_ingredients(access_token: str) -> List[Dict]:
+    if _direct():
+        return _join_ingredient_names(access_token, _direct().list_recipe_ingredients(access_token))
     sb = _sb(access_token)
     try:
-        res = (
+        rows = fetch_rows(
             sb.table("recipe_ingredients")
-            .select("recipe_id,quantity,unit,comment,ingredients(name)")
-            .execute()
+            .select("recipe_id,ingredient_id,quantity,unit,comment")
         )
     except Exception as e:
         _raise_clean("list_recipe_ingredients", e)
-    return res.data or []
+    return _join_ingredient_names(access_token, rows)
 
 
 def delete_recipe_ingredient_link(access_token: str, recipe_id: str, ingredient_id: str) -> bool:
@@ -273,32 +515,109 @@ def delete_recipe_ingredient_link(access_token: str, recipe_id: str, ingredient_
         sb.table("recipe_ingredients").delete().eq("recipe_id", recipe_id).eq("ingredient_id", ingredient_id).execute()
     except Exception as e:
         _raise_clean("delete_recipe_ingredient_link", e)
+    _patch_link({"recipe_id": recipe_id, "ingredient_id": ingredient_id}, delete=True)
     return True
 
 
-def update_recipe_ingredient_link(access_token: str, recipe_id: str, ingredient_id: str, patch: Dict) -> bool:
-    sb = _sb(access_token)
+def update_recipe_ingredient_link(
+    access_token: str,
+    recipe_id: str,
+    ingredient_id: str,
+    patch: Dict,
+    current: Optional[Dict] = None,
+) -> bool:
+    """
+    Update one link. With `current` (the cached line), only changed fields are sent
+    and nothing is sent at all if nothing changed. Returns whether a write happened.
+    """
     allowed = {k: v for k, v in patch.items() if k in {"quantity", "unit", "comment"}}
+    if current is not None:
+        allowed = _changed_fields(current, allowed, allowed.keys())
+    if not allowed:
+        return False
+
+    sb = _sb(access_token)
     try:
-        sb.table("recipe_ingredients").update(allowed).eq("recipe_id", recipe_id).eq("ingredient_id", ingredient_id).execute()
+        res = sb.table("recipe_ingredients").update(allowed).eq("recipe_id", recipe_id).eq("ingredient_id", ingredient_id).execute()
     except Exception as e:
         _raise_clean("update_recipe_ingredient_link", e)
+    for row in res.data or []:
+        _patch_link(row)
     return True
 
 
+LINE_FIELDS = ("quantity", "unit", "comment")
+
+
+def diff_ingredient_lines(current: List[Dict], lines: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """
+    (upserts, deleted_ids) to go from the cached lines `current` to `lines`.
+    Lines are keyed by ingredient_id; only new or changed lines are upserted.
+    """
+    cur = {r.get("ingredient_id"): r for r in current or [] if r.get("ingredient_id")}
+    wanted = {r.get("ingredient_id"): r for r in lines or [] if r.get("ingredient_id")}
+
+    upserts = []
+    for ing_id, line in wanted.items():
+        fields = {k: _norm_value(line.get(k)) for k in LINE_FIELDS}
+        old = cur.get(ing_id)
+        if old is None or any(fields[k] != _norm_value(old.get(k)) for k in LINE_FIELDS):
+            upserts.append({"ingredient_id": ing_id, **fields})
+
+    deleted = sorted(set(cur) - set(wanted))
+    return upserts, deleted
+
+
+def save_recipe_ingredient_lines(
+    access_token: str,
+    recipe_id: str,
+    current: List[Dict],
+    lines: List[Dict],
+) -> Dict:
+    """
+    Batched line editing: diff the edited `lines` against the cached `current`
+    lines and apply every add / edit / removal in ONE RPC
+    (supabase/08_recipe_ingredient_lines.sql). Nothing is sent if nothing changed.
+
+    Returns {"upserted": [...], "deleted": [...]}.
+    """
+    upserts, deleted = diff_ingredient_lines(current, lines)
+    changes = {"upserted": upserts, "deleted": deleted}
+    if not (upserts or deleted):
+        return changes
+
+    sb = _sb(access_token)
+    try:
+        sb.rpc("apply_recipe_ingredient_lines", {
+            "p_recipe_id": recipe_id,
+            "p_upserts": upserts,
+            "p_delete_ids": deleted,
+        }).execute()
+    except Exception as e:
+        _raise_clean("save_recipe_ingredient_lines", e)
+
+    _patch_recipe_lines(recipe_id, upserts, deleted)
+    return changes
+
+
 # =========================
 # Seasons (Option A join table)
 # =========================
+@_flight.coalesce
 def list_recipe_seasons(access_token: str) -> List[Dict]:
+    if _direct():
+        return _direct().list_recipe_seasons(access_token)
     sb = _sb(access_token)
     try:
-        res = sb.table("recipe_seasons").select("recipe_id,season").execute()
+        return fetch_rows(sb.table("recipe_seasons").select("recipe_id,season"))
     except Exception as e:
         _raise_clean("list_recipe_seasons", e)
-    return res.data or []
 
 
+@_flight.coalesce
 def get_recipe_seasons(access_token: str, recipe_id: str) -> List[str]:
+    if _direct():
+        return _direct().get_recipe_seasons(access_token, recipe_id)
     sb = _sb(access_token)
     try:
         res = sb.table("recipe_seasons").select("season").eq("recipe_id", recipe_id).execute()
@@ -308,66 +627,799 @@ def get_recipe_seasons(access_token: str, recipe_id: str) -> List[str]:
     return sorted({r.get("season") for r in rows if r.get("season")})
 
 
-def set_recipe_seasons(access_token: str, recipe_id: str, seasons: List[str]) -> bool:
+def set_recipe_seasons(
+    access_token: str,
+    recipe_id: str,
+    seasons: List[str],
+    current: Optional[List[str]] = None,
+) -> bool:
+    """
+    Make the recipe's seasons equal to `seasons`.
+    With `current` (the cached seasons), only removed seasons are deleted and only
+    added ones inserted; without it, falls back to delete-all + insert.
+    """
     sb = _sb(access_token)
 
     seasons = sorted({s for s in (seasons or []) if s})
 
-    try:
-        sb.table("recipe_seasons").delete().eq("recipe_id", recipe_id).execute()
-    except Exception as e:
-        _raise_clean("set_recipe_seasons(delete)", e)
+    if current is not None:
+        added, removed = diff_seasons(current, seasons)
+    else:
+        added, removed = seasons, None
 
-    if seasons:
-        rows = [{"recipe_id": recipe_id, "season": s} for s in seasons]
+    if removed is None:
+        try:
+            sb.table("recipe_seasons").delete().eq("recipe_id", recipe_id).execute()
+        except Exception as e:
+            _raise_clean("set_recipe_seasons(delete)", e)
+    elif removed:
+        try:
+            sb.table("recipe_seasons").delete().eq("recipe_id", recipe_id).in_("season", removed).execute()
+        except Exception as e:
+            _raise_clean("set_recipe_seasons(delete)", e)
+
+    if added:
+        rows = [{"recipe_id": recipe_id, "season": s} for s in added]
         try:
             sb.table("recipe_seasons").insert(rows).execute()
         except Exception as e:
             _raise_clean("set_recipe_seasons(insert)", e)
 
+    _patch_seasons(recipe_id, seasons)
     return True
 
 
+def diff_seasons(current: List[str], wanted: List[str]) -> Tuple[List[str], List[str]]:
+    """(added, removed) to go from `current` to `wanted`."""
+    cur = {s for s in (current or []) if s}
+    new = {s for s in (wanted or []) if s}
+    return sorted(new - cur), sorted(cur - new)
+
+
+# =========================
+# Diff-based recipe save
+# =========================
+def save_recipe_changes(
+    access_token: str,
+    recipe_id: str,
+    current: Dict,
+    patch: Dict,
+    current_seasons: List[str],
+    seasons: List[str],
+) -> Dict:
+    """
+    Save a recipe edit by sending only what differs from the cached state
+    (`current` row, `current_seasons`): changed fields + added/removed seasons,
+    in ONE RPC (supabase/07_save_recipe_changes.sql). An unchanged save costs
+    zero writes.
+
+    Returns {"fields": {...}, "added_seasons": [...], "removed_seasons": [...]}.
+    """
+    fields = _changed_fields(current, patch, RECIPE_EDITABLE_FIELDS)
+    added, removed = diff_seasons(current_seasons, seasons)
+    changes = {"fields": fields, "added_seasons": added, "removed_seasons": removed}
+
+    if not (fields or added or removed):
+        return changes
+
+    sb = _sb(access_token)
+    try:
+        sb.rpc("save_recipe_changes", {
+            "p_recipe_id": recipe_id,
+            "p_patch": fields,
+            "p_add_seasons": added,
+            "p_remove_seasons": removed,
+        }).execute()
+    except Exception as e:
+        _raise_clean("save_recipe_changes", e)
+
+    if fields:
+        _patch_recipe(recipe_id, fields, insert=False)
+    if added or removed:
+        kept = set(current_seasons or []) - set(removed)
+        _patch_seasons(recipe_id, sorted(kept | set(added)))
+    return changes
+
+
+# =========================
+# Bulk operations (N recipes, one request each)
+# =========================
+BULK_SEASON_MODES = ("replace", "add", "remove")
+
+
+def bulk_set_recipe_seasons(
+    access_token: str,
+    recipe_ids: List[str],
+    seasons: List[str],
+    mode: str = "replace",
+) -> int:
+    """
+    Re-tag many recipes at once (supabase/09_bulk_recipe_ops.sql). `mode` is
+    "replace" (exactly `seasons`), "add" or "remove". Returns how many recipes
+    were targeted.
+    """
+    if mode not in BULK_SEASON_MODES:
+        raise ValueError(f"bulk_set_recipe_seasons: unknown mode {mode!r}")
+    recipe_ids = sorted({r for r in recipe_ids or [] if r})
+    seasons = sorted({s for s in seasons or [] if s})
+    if not recipe_ids:
+        return 0
+
+    sb = _sb(access_token)
+    try:
+        sb.rpc("bulk_set_recipe_seasons", {
+            "p_recipe_ids": recipe_ids,
+            "p_seasons": seasons,
+            "p_mode": mode,
+        }).execute()
+    except Exception as e:
+        _raise_clean("bulk_set_recipe_seasons", e)
+
+    _patch_seasons_many(recipe_ids, seasons, mode)
+    return len(recipe_ids)
+
+
+def bulk_update_recipes(access_token: str, recipe_ids: List[str], patch: Dict) -> List[Dict]:
+    """Apply the same field patch to many recipes (one UPDATE ... WHERE id IN)."""
+    recipe_ids = sorted({r for r in recipe_ids or [] if r})
+    allowed = {k: _norm_value(v) for k, v in patch.items() if k in RECIPE_EDITABLE_FIELDS}
+    if not recipe_ids or not allowed:
+        return []
+
+    sb = _sb(access_token)
+    try:
+        res = sb.table("recipes").update(allowed).in_("id", recipe_ids).execute()
+    except Exception as e:
+        _raise_clean("bulk_update_recipes", e)
+    rows = res.data or []
+    if rows:
+        _patch_recipes({r["id"]: r for r in rows if r.get("id")})
+    return rows
+
+
+def bulk_delete_recipes(access_token: str, recipe_ids: List[str]) -> int:
+    """
+    Delete many recipes (one DELETE ... WHERE id IN). Links and seasons go with
+    them (on delete cascade). Returns how many rows were actually deleted: RLS
+    silently skips recipes that aren't yours.
+    """
+    recipe_ids = sorted({r for r in recipe_ids or [] if r})
+    if not recipe_ids:
+        return 0
+
+    sb = _sb(access_token)
+    try:
+        res = sb.table("recipes").delete().in_("id", recipe_ids).execute()
+    except Exception as e:
+        _raise_clean("bulk_delete_recipes", e)
+    deleted = [r["id"] for r in res.data or [] if r.get("id")]
+    _drop_recipes(deleted)
+    return len(deleted)
+
+
 # =========================
-# Caching (token-aware, TTL, safe hashing)
+# Paged readers (exports): constant memory, never the whole table
 # =========================
-@st.cache_data(ttl=60, show_spinner=False)
+# PostgREST caps every response (Supabase default: 1000 rows), so each reader
+# pages explicitly. Recipes use keyset pagination on id: each page is
+# "id > last id seen", which costs the same on page 1 and page 500.
+EXPORT_RECIPE_COLUMNS = (
+    "id,name,servings,prep_minutes,cook_minutes,total_minutes,created_by,"
+    "instructions,notes,created_at,updated_at"
+)
+PAGE_MAX_ROWS = 1000
+
+
+def list_recipes_page(access_token: str, after_id: Optional[str] = None, limit: int = 500) -> List[Dict]:
+    """Next `limit` recipes ordered by id, strictly after `after_id`."""
+    if _direct():
+        return _direct().list_recipes_page(access_token, after_id, limit)
+    sb = _sb(access_token)
+    try:
+        q = sb.table("recipes").select(EXPORT_RECIPE_COLUMNS).order("id").limit(min(limit, PAGE_MAX_ROWS))
+        if after_id:
+            q = q.gt("id", after_id)
+        return fetch_rows(q)
+    except Exception as e:
+        _raise_clean("list_recipes_page", e)
+
+
+def _list_id_range(access_token: str, table: str, columns: str, order: List[str], first_id: str, last_id: str) -> List[Dict]:
+    # Children of one recipes page: a short "recipe_id between" filter instead
+    # of an IN list of hundreds of uuids, paged past the response cap.
+    sb = _sb(access_token)
+    rows: List[Dict] = []
+    while True:
+        q = sb.table(table).select(columns).gte("recipe_id", first_id).lte("recipe_id", last_id)
+        for col in order:
+            q = q.order(col)
+        batch = fetch_rows(q.range(len(rows), len(rows) + PAGE_MAX_ROWS - 1))
+        rows += batch
+        if len(batch) < PAGE_MAX_ROWS:
+            return rows
+
+
+def list_recipe_seasons_range(access_token: str, first_id: str, last_id: str) -> List[Dict]:
+    """recipe_seasons rows for recipe ids in [first_id, last_id]."""
+    if _direct():
+        return _direct().list_recipe_seasons_range(access_token, first_id, last_id)
+    try:
+        return _list_id_range(access_token, "recipe_seasons", "recipe_id,season", ["recipe_id", "season"], first_id, last_id)
+    except Exception as e:
+        _raise_clean("list_recipe_seasons_range", e)
+
+
+def list_recipe_ingredients_range(access_token: str, first_id: str, last_id: str) -> List[Dict]:
+    """recipe_ingredients rows (with ingredient_name) for recipe ids in [first_id, last_id]."""
+    if _direct():
+        return _join_ingredient_names(
+            access_token, _direct().list_recipe_ingredients_range(access_token, first_id, last_id)
+        )
+    try:
+        rows = _list_id_range(
+            access_token,
+            "recipe_ingredients",
+            "recipe_id,ingredient_id,quantity,unit,comment",
+            ["recipe_id", "ingredient_id"],
+            first_id,
+            last_id,
+        )
+    except Exception as e:
+        _raise_clean("list_recipe_ingredients_range", e)
+    return _join_ingredient_names(access_token, rows)
+
+
+# =========================
+# Incremental sync readers (local replica, see app/lib/replica.py)
+# =========================
+# Children are fetched for explicit recipe ids: batches keep the IN list (and
+# the URL) short.
+ID_BATCH = 150
+
+
+def list_recipes_changed_since(
+    access_token: str,
+    since: str,
+    after: Optional[Tuple[str, str]] = None,
+    limit: int = 500,
+) -> List[Dict]:
+    """
+    Recipes with updated_at >= `since`, ordered by (updated_at, id). Pass the
+    last (updated_at, id) seen as `after` for the next page (keyset).
+    """
+    sb = _sb(access_token)
+    try:
+        q = sb.table("recipes").select(EXPORT_RECIPE_COLUMNS).gte("updated_at", since)
+        if after:
+            ts, rid = after
+            q = q.or_(f'updated_at.gt."{ts}",and(updated_at.eq."{ts}",id.gt.{rid})')
+        return fetch_rows(q.order("updated_at").order("id").limit(min(limit, PAGE_MAX_ROWS)))
+    except Exception as e:
+        _raise_clean("list_recipes_changed_since", e)
+
+
+def _list_for_recipe_ids(access_token: str, table: str, columns: str, order: List[str], recipe_ids: List[str]) -> List[Dict]:
+    sb = _sb(access_token)
+    rows: List[Dict] = []
+    for i in range(0, len(recipe_ids), ID_BATCH):
+        batch_ids = recipe_ids[i:i + ID_BATCH]
+        fetched = 0
+        while True:
+            q = sb.table(table).select(columns).in_("recipe_id", batch_ids)
+            for col in order:
+                q = q.order(col)
+            batch = fetch_rows(q.range(fetched, fetched + PAGE_MAX_ROWS - 1))
+            rows += batch
+            fetched += len(batch)
+            if len(batch) < PAGE_MAX_ROWS:
+                break
+    return rows
+
+
+def list_recipe_seasons_for(access_token: str, recipe_ids: List[str]) -> List[Dict]:
+    """recipe_seasons rows for the given recipe ids."""
+    try:
+        return _list_for_recipe_ids(access_token, "recipe_seasons", "recipe_id,season", ["recipe_id", "season"], recipe_ids)
+    except Exception as e:
+        _raise_clean("list_recipe_seasons_for", e)
+
+
+def list_recipe_ingredients_for(access_token: str, recipe_ids: List[str]) -> List[Dict]:
+    """recipe_ingredients rows for the given recipe ids (the replica names them from its own ingredients table)."""
+    try:
+        return _list_for_recipe_ids(
+            access_token,
+            "recipe_ingredients",
+            "recipe_id,ingredient_id,quantity,unit,comment",
+            ["recipe_id", "ingredient_id"],
+            recipe_ids,
+        )
+    except Exception as e:
+        _raise_clean("list_recipe_ingredients_for", e)
+
+
+def list_recipe_tombstones_since(access_token: str, since: str) -> List[Dict]:
+    """[{recipe_id, deleted_at}] for recipes deleted at or after `since` (supabase/14_replica_sync.sql)."""
+    sb = _sb(access_token)
+    rows: List[Dict] = []
+    try:
+        while True:
+            batch = fetch_rows(
+                sb.table("recipe_tombstones").select("recipe_id,deleted_at").gte("deleted_at", since)
+                .order("deleted_at").order("recipe_id").range(len(rows), len(rows) + PAGE_MAX_ROWS - 1)
+            )
+            rows += batch
+            if len(batch) < PAGE_MAX_ROWS:
+                return rows
+    except Exception as e:
+        _raise_clean("list_recipe_tombstones_since", e)
+
+
+def list_profiles(access_token: str) -> List[Dict]:
+    """Every profile {id, first_name, last_name, role} (readable by any logged-in user)."""
+    sb = _sb(access_token)
+    rows: List[Dict] = []
+    try:
+        while True:
+            batch = fetch_rows(
+                sb.table("profiles").select("id,first_name,last_name,role")
+                .order("id").range(len(rows), len(rows) + PAGE_MAX_ROWS - 1)
+            )
+            rows += batch
+            if len(batch) < PAGE_MAX_ROWS:
+                return rows
+    except Exception as e:
+        _raise_clean("list_profiles", e)
+
+
+# =========================
+# Caching (TTL, token NOT part of the key)
+# =========================
+# Parameters starting with "_" are not part of the cache key, so the access
+# token is only used to fetch. Keys are user ids / recipe ids instead, which
+# means a token refresh doesn't cold-miss every cache. Catalog tables are
+# readable by any authenticated user (see supabase/03_policies.sql), so those
+# caches are shared across users.
+#
+# All cached results are shared objects (no copy on hit): treat them as read-only.
+
+# Catalog loaders (whole tables): stale-while-revalidate instead of a blind TTL,
+# so a user never waits on a catalog reload unless the data is older than
+# CATALOG_MAX_STALE_SECONDS.
+CATALOG_TTL_SECONDS = float(get_optional_setting("CATALOG_TTL_SECONDS", "60"))
+CATALOG_MAX_STALE_SECONDS = float(get_optional_setting("CATALOG_MAX_STALE_SECONDS", "900"))
+
+# Every worker process on the host shares one copy of the catalog: a worker
+# that fetches a table publishes it as a memory-mapped Arrow file (see
+# app/lib/snapshot.py), and every worker, itself included, caches the mapped
+# file (an ArrowRows view), not a list of dicts. The others adopt it instead of
+# fetching their own while it is current. At process start, the published
+# tables are served at once (and revalidated in the background). A local patch
+# materializes its table in that process until the next reload maps it again.
+CATALOG_SHARED_DIR = get_optional_setting("CATALOG_SHARED_DIR", ".cache/catalog")
+
+
+# Data versions (supabase/15_catalog_version.sql): a probe of a few bytes,
+# at most every CATALOG_VERSION_PROBE_SECONDS per process and in the
+# background (reads use the last known versions), tells whether a cached table
+# changed. While versions are known they replace the TTLs above: an unchanged
+# table is never re-downloaded, a changed one is reloaded on the next read
+# after the probe saw it. "0" disables the probe (TTLs only).
+CATALOG_VERSION_PROBE_SECONDS = float(get_optional_setting("CATALOG_VERSION_PROBE_SECONDS", "5"))
+_versions = VersionProbe("catalog_version", CATALOG_VERSION_PROBE_SECONDS)
+
+
+def get_catalog_versions(access_token: str) -> Dict[str, int]:
+    """{table: version} for the cached tables (see supabase/15_catalog_version.sql)."""
+    sb = _sb(access_token)
+    try:
+        res = sb.rpc("get_catalog_versions", {}).execute()
+    except Exception as e:
+        _raise_clean("get_catalog_versions", e)
+    return {table: int(v) for table, v in (res.data or {}).items()}
+
+
+def _version_of(access_token: str, *tables: str) -> Optional[str]:
+    """Current data version of `tables` as one opaque key (None if unknown)."""
+    versions = _versions.current(lambda: get_catalog_versions(access_token))
+    if versions is None or any(t not in versions for t in tables):
+        return None
+    return ";".join(f"{t}={versions[t]}" for t in tables)
+
+
+def _catalog_cache(name: str) -> SWRCache:
+    return SWRCache(name, CATALOG_TTL_SECONDS, CATALOG_MAX_STALE_SECONDS)
+
+
+_recipes_cache = _catalog_cache("list_recipes")
+_recipe_ingredients_cache = _catalog_cache("list_recipe_ingredients")
+_recipe_seasons_cache = _catalog_cache("list_recipe_seasons")
+_CATALOG_CACHES = (_recipes_cache, _recipe_ingredients_cache, _recipe_seasons_cache)
+
+_shared_tables = {
+    name: SharedTable(CATALOG_SHARED_DIR, name)
+    for name in [cache.name for cache in _CATALOG_CACHES] + ["list_ingredients"]
+}
+
+
+def _shared_load(name: str, fetch, ttl: float, not_before: float, version: Optional[str] = None) -> Sequence[Dict]:
+    """
+    Rows of catalog table `name`, as the mapped shared file: adopted when
+    another process published it after `not_before` (this process's last local
+    write) and either at data `version` or, when the version is unknown, less
+    than `ttl` ago. Fetched and published otherwise; the fetched list is only
+    returned if the file can't be written (see SharedTable.publish).
+    """
+    shared = _shared_tables[name]
+    published_at = shared.published_at()
+    if published_at is not None and published_at >= not_before:
+        fresh = shared.version() == version if version is not None else time.time() - published_at < ttl
+        if fresh:
+            rows = shared.rows()
+            if rows is not None:
+                return rows
+
+    rows = fetch()
+    mapped = shared.publish(rows, version)
+    return mapped if mapped is not None else rows
+
+
+def _warm_catalog_from_snapshot() -> None:
+    for cache in _CATALOG_CACHES:
+        shared = _shared_tables[cache.name]
+        rows = shared.rows()
+        if rows is not None:
+            cache.seed(rows, shared.version())
+
+
+# Runs once per process (modules are imported once, not on every rerun)
+_warm_catalog_from_snapshot()
+
+# Everything keyed per user / per recipe: one LRU bounded by estimated bytes,
+# so keys can't grow without limit as users and recipes churn.
+CACHE_MAX_BYTES = int(get_optional_setting("CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+_lru = LRUCache(CACHE_MAX_BYTES)
+
+
+def _probed(fn):
+    """
+    Give the version probe its due turn (in the background) on every memoized
+    read: a table change it sees drops the stale entries (listeners below).
+    """
+
+    @functools.wraps(fn)  # also carries memoize's .clear / .key_for / .owner
+    def wrapper(access_token: str, *args):
+        _version_of(access_token)
+        return fn(access_token, *args)
+
+    return wrapper
+
+
 def cached_list_recipes(access_token: str) -> List[Dict]:
-    return list_recipes(access_token)
+    version = _version_of(access_token, "recipes")
+    return _recipes_cache.get(lambda: _shared_load(
+        _recipes_cache.name, lambda: list_recipes(access_token), _recipes_cache.ttl, _recipes_cache.changed_at, version
+    ), version)
 
 
-@st.cache_data(ttl=60, show_spinner=False)
 def cached_list_recipe_ingredients(access_token: str) -> List[Dict]:
-    return list_recipe_ingredients(access_token)
+    # Lines carry ingredient names: a rename changes them too
+    version = _version_of(access_token, "recipe_ingredients", "ingredients")
+    return _recipe_ingredients_cache.get(lambda: _shared_load(
+        _recipe_ingredients_cache.name, lambda: list_recipe_ingredients(access_token), _recipe_ingredients_cache.ttl, _recipe_ingredients_cache.changed_at, version
+    ), version)
+
+
+def cached_list_recipe_seasons(access_token: str) -> List[Dict]:
+    version = _version_of(access_token, "recipe_seasons")
+    return _recipe_seasons_cache.get(lambda: _shared_load(
+        _recipe_seasons_cache.name, lambda: list_recipe_seasons(access_token), _recipe_seasons_cache.ttl, _recipe_seasons_cache.changed_at, version
+    ), version)
+
+
+INGREDIENTS_TTL_SECONDS = 300
+# Wall-clock time of the last local ingredient write (see _shared_load)
+_ingredients_changed_at = 0.0
+
+
+@_probed
+@memoize(_lru, ttl=INGREDIENTS_TTL_SECONDS, copy=False)
+def cached_ingredient_dictionary(_access_token: str) -> IngredientDictionary:
+    """Shared ingredient dictionary with prefix search (see app/lib/ingredients.py)."""
+    return IngredientDictionary(_shared_load(
+        "list_ingredients",
+        lambda: list_ingredients(_access_token),
+        INGREDIENTS_TTL_SECONDS,
+        _ingredients_changed_at,
+        _version_of(_access_token, "ingredients"),
+    ))
 
 
-@st.cache_data(ttl=300, show_spinner=False)
 def cached_list_ingredients(access_token: str) -> List[Dict]:
-    return list_ingredients(access_token)
+    """[{id, name, usage_count}] sorted by name, from the shared dictionary."""
+    return cached_ingredient_dictionary(access_token).rows()
 
 
-@st.cache_data(ttl=300, show_spinner=False)
-def cached_list_profiles_by_ids(access_token: str, user_ids: Tuple[str, ...]) -> List[Dict]:
+@_probed
+@memoize(_lru, ttl=300, copy=False)
+def cached_list_profiles_by_ids(_access_token: str, user_ids: Tuple[str, ...]) -> List[Dict]:
     # IMPORTANT: accept tuple for reliable hashing
-    return list_profiles_by_ids(access_token, list(user_ids))
+    return list_profiles_by_ids(_access_token, list(user_ids))
 
 
-@st.cache_data(ttl=60, show_spinner=False)
-def cached_list_my_recipes(access_token: str, user_id: str) -> List[Dict]:
-    # Keep short TTL because tokens can expire / rotate
-    return list_my_recipes(access_token, user_id)
+@_probed
+@memoize(_lru, ttl=60, copy=False)
+def cached_list_my_recipes(_access_token: str, user_id: str) -> List[Dict]:
+    return list_my_recipes(_access_token, user_id)
 
 
-@st.cache_data(ttl=60, show_spinner=False)
-def cached_get_recipe_ingredients(access_token: str, recipe_id: str) -> List[Dict]:
-    return get_recipe_ingredients(access_token, recipe_id)
+@_probed
+@memoize(_lru, ttl=60, copy=False)
+def cached_get_recipe_ingredients(_access_token: str, recipe_id: str) -> List[Dict]:
+    return get_recipe_ingredients(_access_token, recipe_id)
 
 
-@st.cache_data(ttl=60, show_spinner=False)
-def cached_list_recipe_seasons(access_token: str) -> List[Dict]:
-    return list_recipe_seasons(access_token)
+@_probed
+@memoize(_lru, ttl=60, copy=False)
+def cached_get_recipe_seasons(_access_token: str, recipe_id: str) -> List[str]:
+    return get_recipe_seasons(_access_token, recipe_id)
+
+
+# A version change drops the per-user / per-recipe entries derived from that
+# table. Their TTLs remain the fallback while versions are unknown.
+_versions.on_change("ingredients", cached_ingredient_dictionary.clear)
+_versions.on_change("ingredients", cached_get_recipe_ingredients.clear)
+_versions.on_change("recipe_ingredients", cached_get_recipe_ingredients.clear)
+_versions.on_change("recipe_seasons", cached_get_recipe_seasons.clear)
+_versions.on_change("recipes", cached_list_my_recipes.clear)
+_versions.on_change("profiles", cached_list_profiles_by_ids.clear)
+
+
+def clear_caches() -> None:
+    """Drop every cache (LRU + catalog SWR caches). Call after writes."""
+    global _ingredients_changed_at
+    _ingredients_changed_at = time.time()
+    _lru.clear()
+    for cache in _CATALOG_CACHES:
+        cache.clear()
 
 
-@st.cache_data(ttl=60, show_spinner=False)
-def cached_get_recipe_seasons(access_token: str, recipe_id: str) -> List[str]:
-    return get_recipe_seasons(access_token, recipe_id)
+def invalidate_ingredient_caches() -> None:
+    """
+    Drop everything derived from ingredient ids (dictionary, catalog lines,
+    per-recipe lines) at once, after a write that rewrites lines across many
+    recipes (e.g. merge_ingredients).
+    """
+    global _ingredients_changed_at
+    _ingredients_changed_at = time.time()
+    cached_ingredient_dictionary.clear()
+    cached_get_recipe_ingredients.clear()
+    _recipe_ingredients_cache.clear()
+
+
+def cache_stats() -> Dict:
+    """Current LRU size, hits/misses, evictions and per-function footprint."""
+    return _lru.stats()
+
+
+# =========================
+# Optimistic cache patching (after writes)
+# =========================
+# Write functions apply the rows PostgREST returns straight to the cached data
+# instead of clearing every cache: the next rerun is instant and shows the
+# change. Patched catalog tables are then reconciled with the database by a
+# background refresh (see SWRCache.patch). Patch functions always build NEW
+# lists: cached values are shared with other sessions.
+def _ingredient_name(ingredient_id: str) -> Optional[str]:
+    hit, dictionary = _lru.get(cached_ingredient_dictionary.key_for())
+    row = dictionary.get(ingredient_id) if hit else None
+    return row.get("name") if row else None
+
+
+def _upsert_recipe_rows(updates: Dict[str, Dict], order_by: str, desc: bool, insert: bool):
+    """Patch fn merging `updates` ({recipe_id: fields}) into a list of recipe rows."""
+    def fn(rows):
+        rows = rows or []
+        by_id = {r.get("id"): r for r in rows}
+        changed = {}
+        for recipe_id, fields in updates.items():
+            old = by_id.get(recipe_id)
+            if old is None and not insert:
+                continue
+            new = {**(old or {}), **fields}
+            if "prep_minutes" in fields or "cook_minutes" in fields:
+                new["total_minutes"] = int(new.get("prep_minutes") or 0) + int(new.get("cook_minutes") or 0)
+            changed[recipe_id] = new
+        if not changed:
+            return rows
+        rest = [r for r in rows if r.get("id") not in changed]
+        return sorted(rest + list(changed.values()), key=lambda r: str(r.get(order_by) or ""), reverse=desc)
+    return fn
+
+
+def _patch_recipe(recipe_id: str, fields: Optional[Dict] = None, delete: bool = False, insert: bool = True) -> None:
+    """Insert / update / remove one recipe in the catalog and in "my recipes"."""
+    if delete:
+        _drop_recipes([recipe_id])
+    else:
+        _patch_recipes({recipe_id: fields or {}}, insert=insert)
+
+
+def _patch_recipes(updates: Dict[str, Dict], insert: bool = True) -> None:
+    """Insert / update many recipes ({recipe_id: fields}) with one patch per cached list."""
+    _recipes_cache.patch(_upsert_recipe_rows(updates, "name", False, insert))
+
+    by_owner: Dict[str, Dict[str, Dict]] = {}
+    partial: Dict[str, Dict] = {}
+    for recipe_id, fields in updates.items():
+        owner = fields.get("created_by")
+        if owner:
+            by_owner.setdefault(owner, {})[recipe_id] = fields
+        else:
+            partial[recipe_id] = fields
+
+    for owner, owned in by_owner.items():
+        _lru.update(
+            cached_list_my_recipes.key_for(user_id=owner),
+            _upsert_recipe_rows(owned, "created_at", True, insert),
+            added=list(owned.values()) if insert else (),
+        )
+    if partial:
+        # Partial patch: only touches lists that already contain the recipe
+        _lru.update_owner(cached_list_my_recipes.owner, _upsert_recipe_rows(partial, "created_at", True, False))
+
+
+def _drop_recipes(recipe_ids: List[str]) -> None:
+    """Remove recipes (and their links / seasons) from every cached list."""
+    ids = set(recipe_ids)
+    if not ids:
+        return
+
+    def drop(rows):
+        return [r for r in rows or [] if r.get("id") not in ids]
+
+    def drop_links(rows):
+        return [r for r in rows or [] if r.get("recipe_id") not in ids]
+
+    _recipes_cache.patch(drop)
+    _recipe_ingredients_cache.patch(drop_links)
+    _recipe_seasons_cache.patch(drop_links)
+    _lru.update_owner(cached_list_my_recipes.owner, drop)
+    for recipe_id in ids:
+        _lru.invalidate(cached_get_recipe_ingredients.key_for(recipe_id=recipe_id))
+        _lru.invalidate(cached_get_recipe_seasons.key_for(recipe_id=recipe_id))
+
+
+def _patch_seasons(recipe_id: str, seasons: List[str]) -> None:
+    """Make the cached seasons of one recipe equal to `seasons`."""
+    _patch_seasons_many([recipe_id], seasons, "replace")
+
+
+def _patch_seasons_many(recipe_ids: List[str], seasons: List[str], mode: str) -> None:
+    """Replace / add / remove `seasons` on many recipes in the cached data (see BULK_SEASON_MODES)."""
+    ids = set(recipe_ids)
+    seasons = {s for s in seasons or [] if s}
+
+    def new_for(old) -> List[str]:
+        if mode == "replace":
+            return sorted(seasons)
+        if mode == "add":
+            return sorted(set(old or []) | seasons)
+        return sorted(set(old or []) - seasons)
+
+    def fn(rows):
+        rows = rows or []
+        old: Dict[str, List[str]] = {}
+        for r in rows:
+            if r.get("recipe_id") in ids:
+                old.setdefault(r["recipe_id"], []).append(r.get("season"))
+        rest = [r for r in rows if r.get("recipe_id") not in ids]
+        return rest + [
+            {"recipe_id": recipe_id, "season": s}
+            for recipe_id in sorted(ids)
+            for s in new_for(old.get(recipe_id))
+        ]
+
+    _recipe_seasons_cache.patch(fn)
+    for recipe_id in ids:
+        _lru.update(cached_get_recipe_seasons.key_for(recipe_id=recipe_id), new_for)
+
+
+def _patch_link(row: Dict, delete: bool = False) -> None:
+    """Insert / update / remove one recipe_ingredients line in the cached data."""
+    recipe_id = row.get("recipe_id")
+    ingredient_id = row.get("ingredient_id")
+    fields = {k: row[k] for k in ("quantity", "unit", "comment") if k in row}
+
+    def same(r):
+        return r.get("ingredient_id") == ingredient_id
+
+    def upsert(rows, with_recipe_id: bool):
+        rows = rows or []
+        old = next((r for r in rows if same(r) and (not with_recipe_id or r.get("recipe_id") == recipe_id)), None)
+        rest = [r for r in rows if r is not old]
+        if delete:
+            return rest
+        new = dict(old or {"ingredient_id": ingredient_id, "ingredient_name": _ingredient_name(ingredient_id)})
+        if with_recipe_id:
+            new["recipe_id"] = recipe_id
+        new.update(fields)
+        return rest + [new]
+
+    _recipe_ingredients_cache.patch(lambda rows: upsert(rows, True))
+    _lru.update(
+        cached_get_recipe_ingredients.key_for(recipe_id=recipe_id),
+        lambda rows: upsert(rows, False),
+        added=() if delete else [row],
+    )
+
+
+def _patch_recipe_lines(recipe_id: str, upserts: List[Dict], deleted: List[str]) -> None:
+    """Apply a batched line edit to the cached data in one pass per cache."""
+    by_id = {u["ingredient_id"]: u for u in upserts}
+    gone = set(deleted)
+
+    def apply(rows, with_recipe_id: bool):
+        out, seen = [], set()
+        for r in rows or []:
+            if with_recipe_id and r.get("recipe_id") != recipe_id:
+                out.append(r)
+                continue
+            ing_id = r.get("ingredient_id")
+            if ing_id in gone:
+                continue
+            if ing_id in by_id:
+                r = {**r, **{k: by_id[ing_id][k] for k in LINE_FIELDS}}
+                seen.add(ing_id)
+            out.append(r)
+        for ing_id, u in by_id.items():
+            if ing_id not in seen:
+                new = {**u, "ingredient_name": _ingredient_name(ing_id)}
+                if with_recipe_id:
+                    new["recipe_id"] = recipe_id
+                out.append(new)
+        return out
+
+    _recipe_ingredients_cache.patch(lambda rows: apply(rows, True))
+    _lru.update(
+        cached_get_recipe_ingredients.key_for(recipe_id=recipe_id), lambda rows: apply(rows, False), added=upserts
+    )
+
+
+def _patch_imported(user_id: str, recipes: List[Dict]) -> None:
+    """Append an imported chunk to the catalog caches (one patch per cache)."""
+    fields = ("id", "name", "servings", "prep_minutes", "cook_minutes", "instructions", "notes")
+    _recipes_cache.patch(_upsert_recipe_rows(
+        {r["id"]: {**{k: r.get(k) for k in fields}, "created_by": user_id} for r in recipes},
+        "name", False, True,
+    ))
+
+    seasons = [{"recipe_id": r["id"], "season": s} for r in recipes for s in r.get("seasons") or []]
+    links = [
+        {**{k: ln.get(k) for k in ("ingredient_id", *LINE_FIELDS)}, "recipe_id": r["id"],
+         "ingredient_name": _ingredient_name(ln["ingredient_id"])}
+        for r in recipes for ln in r.get("lines") or []
+    ]
+    _recipe_seasons_cache.patch(lambda rows: (rows or []) + seasons)
+    _recipe_ingredients_cache.patch(lambda rows: (rows or []) + links)
+    # Ordered by created_at, which only the database knows: reload on next use
+    _lru.invalidate(cached_list_my_recipes.key_for(user_id=user_id))
+
+
+def _patch_clone_children(source_id: str, clone_id: str) -> None:
+    """Copy the cached seasons / ingredient lines of `source_id` onto its fresh clone."""
+    def copy_rows(rows):
+        rows = rows or []
+        return rows + [{**r, "recipe_id": clone_id} for r in rows if r.get("recipe_id") == source_id]
+
+    _recipe_seasons_cache.patch(copy_rows)
+    _recipe_ingredients_cache.patch(copy_rows)
+
+
+def _patch_ingredient(row: Dict) -> None:
+    """Append a newly created ingredient to the cached dictionary (no reload)."""
+    global _ingredients_changed_at
+    if not row.get("id"):
+        return
+    _ingredients_changed_at = time.time()
+    _lru.update(cached_ingredient_dictionary.key_for(), lambda dictionary: dictionary.add(row), added=[row])
@@ -1,5 +1,104 @@
+import threading
+import time
+
 import streamlit as st
-from app.lib.repos import ensure_my_profile
+from app.lib.repos import bootstrap_session
+from app.lib.supabase_client import get_supabase
+
+# Start a background refresh when the access token has less than this left...
+REFRESH_MARGIN_SECONDS = 300
+# ...and refresh inline (before any query runs) when it's closer than this.
+BLOCKING_REFRESH_MARGIN_SECONDS = 30
+
+
+def set_session(session, user=None):
+    """Single place where the auth session is stored (login, sign up, refresh)."""
+    st.session_state.session = session
+    st.session_state.user = user if user is not None else getattr(session, "user", None)
+
+
+def _refresh_worker(sb, refresh_token: str, result: dict):
+    # Runs off the script thread: no st.* calls here, only fill `result`.
+    try:
+        result["session"] = sb.auth.refresh_session(refresh_token).session
+    except Exception as e:
+        result["error"] = e
+    finally:
+        result["done"] = True
+
+
+def _start_refresh(session) -> dict:
+    result = {"refresh_token": session.refresh_token, "done": False}
+    thread = threading.Thread(
+        target=_refresh_worker,
+        args=(get_supabase(), session.refresh_token, result),
+        daemon=True,
+    )
+    result["thread"] = thread
+    st.session_state.token_refresh = result
+    thread.start()
+    return result
+
+
+def _adopt_refresh(result: dict) -> bool:
+    """Swap in a finished refresh. Returns False if it failed."""
+    st.session_state.token_refresh = None
+    current = st.session_state.session
+    new_session = result.get("session")
+    if not new_session:
+        return False
+    # Ignore results for a session that was replaced meanwhile (logout / re-login)
+    if current and current.refresh_token == result["refresh_token"]:
+        set_session(new_session)
+    return True
+
+
+def _ensure_fresh_token():
+    """
+    Proactively refresh the access token before `expires_at`, so queries never run
+    with an expired JWT. Normally the refresh happens in a background thread and is
+    picked up on the next rerun; only a rerun very close to expiry blocks on it.
+    """
+    session = st.session_state.session
+    if not session:
+        return
+
+    pending = st.session_state.get("token_refresh")
+    if pending and pending.get("done"):
+        _adopt_refresh(pending)
+        session = st.session_state.session
+        pending = None
+
+    expires_at = getattr(session, "expires_at", None)
+    if not expires_at:
+        return
+
+    remaining = expires_at - time.time()
+    if remaining > REFRESH_MARGIN_SECONDS:
+        return
+
+    if remaining > BLOCKING_REFRESH_MARGIN_SECONDS:
+        if not pending:
+            _start_refresh(session)
+        return
+
+    # Too close to (or past) expiry: wait for the refresh before rendering anything
+    if not pending:
+        pending = _start_refresh(session)
+    pending["thread"].join(timeout=15)
+
+    if not pending.get("done") or not _adopt_refresh(pending):
+        if remaining <= 0:
+            logout()
+            st.warning("Your session expired. Please log in again.")
+
+
+def _bootstrap_is_fresh(session) -> bool:
+    """Role/profile were resolved for THIS access token and it hasn't expired yet."""
+    if st.session_state.get("bootstrap_token") != session.access_token:
+        return False
+    expires_at = st.session_state.get("bootstrap_expires_at")
+    return expires_at is None or time.time() < expires_at
 
 
 def init_session():
@@ -7,14 +106,25 @@ def init_session():
         st.session_state.session = None
         st.session_state.user = None
         st.session_state.role = None
+        st.session_state.display_name = None
         st.session_state.profile_ready = False
+        st.session_state.bootstrap_token = None
+        st.session_state.bootstrap_expires_at = None
+        st.session_state.token_refresh = None
+
+    _ensure_fresh_token()
 
-    # If logged in and profile not ensured yet
-    if st.session_state.session and not st.session_state.profile_ready:
-        token = st.session_state.session.access_token
-        user_id = st.session_state.session.user.id
+    # If logged in: ensure profile + resolve role once per access token
+    session = st.session_state.session
+    if session and not _bootstrap_is_fresh(session):
+        token = session.access_token
+        user_id = session.user.id
 
-        ensure_my_profile(token, user_id)
+        boot = bootstrap_session(token, user_id)
+        st.session_state.role = boot["role"]
+        st.session_state.display_name = boot["display_name"]
+        st.session_state.bootstrap_token = token
+        st.session_state.bootstrap_expires_at = getattr(session, "expires_at", None)
         st.session_state.profile_ready = True
 
 def is_logged_in() -> bool:
@@ -24,3 +134,8 @@ def logout():
     st.session_state.session = None
     st.session_state.user = None
     st.session_state.role = None
+    st.session_state.display_name = None
+    st.session_state.profile_ready = False
+    st.session_state.bootstrap_token = None
+    st.session_state.bootstrap_expires_at = None
+    st.session_state.token_refresh = None
@@ -0,0 +1,226 @@
+import logging
+import os
+import tempfile
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+# =========================
+# Shared catalog snapshot (Arrow IPC files, memory-mapped)
+# =========================
+# One uncompressed Arrow IPC file per catalog table in a shared directory.
+# A worker that reloads a table publishes it; every worker process on the host
+# maps the file read-only (pages are shared through the OS page cache) instead
+# of fetching and holding its own copy.
+#
+# Files are replaced with os.replace(): a reader maps either the old or the new
+# file, never a half-written one. A mapping keeps its (now unlinked) file alive,
+# so nothing is invalidated under a reader's feet.
+#
+# Readers get ArrowRows views, not lists of dicts: a worker holds the mapping,
+# and Python objects only for what it reads (see ArrowRows).
+
+# Bump when the layout of the files changes: old files are ignored.
+SNAPSHOT_FORMAT = 3
+
+# Rows converted at a time when iterating an ArrowRows
+ITER_BATCH_ROWS = 4096
+
+_write_lock = threading.Lock()
+
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        return None
+    return pa
+
+
+def table_path(directory: str, name: str) -> Path:
+    return Path(directory) / f"{name}.v{SNAPSHOT_FORMAT}.arrow"
+
+
+def publish_table(directory: str, name: str, rows: List[Dict], version: Optional[str] = None) -> bool:
+    """
+    Write `rows` to the shared file of table `name`, atomically, tagged with
+    the data `version` they were loaded at (if known).
+    Returns False (nothing written) if pyarrow is unavailable or `rows` is empty
+    (an empty list has no schema to write).
+    """
+    pa = _arrow()
+    if pa is None or not rows:
+        return False
+
+    table = pa.Table.from_pylist(rows)
+    if version is not None:
+        table = table.replace_schema_metadata({"version": version})
+    target = table_path(directory, name)
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    with _write_lock:
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=target.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, table.schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    return True
+
+
+def _table_version(table) -> Optional[str]:
+    metadata = table.schema.metadata if table is not None else None
+    value = (metadata or {}).get(b"version")
+    return value.decode() if value is not None else None
+
+
+def _stat_key(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns
+
+
+class ArrowCells:
+    """One column of an Arrow table, indexable like a list; a cell is converted when read."""
+
+    __slots__ = ("_column",)
+
+    def __init__(self, column):
+        self._column = column
+
+    def __len__(self) -> int:
+        return len(self._column)
+
+    def __getitem__(self, i: int) -> Any:
+        return self._column[i].as_py()
+
+
+class ArrowRows(Sequence):
+    """
+    Read-only list of row dicts over a pyarrow.Table (a mapped snapshot) that
+    holds no row objects itself: rows are converted when read, iteration
+    converts one batch at a time and keeps none. Bulk readers take whole
+    columns instead: column() (converted values) or cells() (lazy).
+    Concatenating (rows + [...], used by cache patches) builds a plain list.
+    """
+
+    __slots__ = ("table",)
+
+    def __init__(self, table):
+        self.table = table
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step == 1:
+                return self.table.slice(start, max(stop - start, 0)).to_pylist()
+            return [self[k] for k in range(start, stop, step)]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return self.table.slice(i, 1).to_pylist()[0]
+
+    def __iter__(self) -> Iterator[Dict]:
+        for batch in self.table.to_batches(max_chunksize=ITER_BATCH_ROWS):
+            yield from batch.to_pylist()
+
+    def __add__(self, other) -> List[Dict]:
+        return list(self) + list(other)
+
+    def column(self, name: str) -> List[Any]:
+        """Values of column `name` (None for every row if the table lacks it)."""
+        if name not in self.table.column_names:
+            return [None] * len(self)
+        return self.table.column(name).to_pylist()
+
+    def cells(self, name: str):
+        """Column `name` without converting it: cells are read on access."""
+        if name not in self.table.column_names:
+            return [None] * len(self)
+        return ArrowCells(self.table.column(name))
+
+
+class SharedTable:
+    """
+    Read side of one shared table file. `table()` returns the mapped
+    pyarrow.Table (zero-copy), re-mapping only when the file was replaced.
+    """
+
+    def __init__(self, directory: str, name: str):
+        self.name = name
+        self.path = table_path(directory, name)
+        self._lock = threading.Lock()
+        self._key: Optional[Tuple[int, int]] = None
+        self._table = None
+
+    def published_at(self) -> Optional[float]:
+        """Wall-clock time the current file was published (None if missing)."""
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def table(self):
+        """The mapped table, or None if missing, unreadable or pyarrow is unavailable."""
+        pa = _arrow()
+        if pa is None:
+            return None
+        key = _stat_key(self.path)
+        with self._lock:
+            if key is None:
+                self._key, self._table = None, None
+                return None
+            if key == self._key:
+                return self._table
+            try:
+                source = pa.memory_map(str(self.path), "r")
+                table = pa.ipc.open_file(source).read_all()
+            except Exception as e:
+                log.warning("Ignoring unreadable catalog snapshot %s: %s", self.path, e)
+                return None
+            self._key, self._table = key, table
+            return table
+
+    def version(self) -> Optional[str]:
+        """Data version the current file was published at (None if missing or untagged)."""
+        return _table_version(self.table())
+
+    def publish(self, rows: List[Dict], version: Optional[str] = None) -> Optional[ArrowRows]:
+        """
+        Publish `rows` as this table's file and return it mapped, so the caller
+        can let go of its list. None if pyarrow is unavailable, `rows` is empty,
+        the file couldn't be written (logged) or another process replaced it
+        with a different version in the meantime.
+        """
+        try:
+            if not publish_table(str(self.path.parent), self.name, rows, version):
+                return None
+        except Exception as e:
+            log.warning("Could not publish catalog snapshot %s: %s", self.name, e)
+            return None
+        mapped = self.rows()
+        if mapped is None or (version is not None and _table_version(mapped.table) != version):
+            return None
+        return mapped
+
+    def rows(self) -> Optional[ArrowRows]:
+        """The mapped table as rows (an ArrowRows view: nothing is converted up front)."""
+        table = self.table()
+        return None if table is None else ArrowRows(table)
+
@@ -1,7 +1,7 @@
 import os
 import streamlit as st
 from dotenv import load_dotenv
-from supabase import create_client
+from supabase import ClientOptions, create_client
 
 load_dotenv()
 
@@ -24,11 +24,25 @@ def _get_setting(name: str) -> str:
     return val
 
 
+def get_optional_setting(name: str, default: str) -> str:
+    """Same lookup order as _get_setting, but returns `default` when unset."""
+    try:
+        val = st.secrets.get(name, None)
+        if val:
+            return str(val)
+    except Exception:
+        pass
+    return os.getenv(name, "") or default
+
+
 def get_supabase():
     url = _get_setting("SUPABASE_URL")
     key = _get_setting("SUPABASE_ANON_KEY")
-    
-    return create_client(url, key)
+
+    # Sessions live in st.session_state and are refreshed by app.lib.session.
+    # The client must not start its own refresh timer: it would rotate the
+    # refresh token behind our back on a throwaway client.
+    return create_client(url, key, options=ClientOptions(auto_refresh_token=False, persist_session=False))
 
 def authed_postgrest(sb, access_token: str):
     sb.postgrest.auth(access_token)
@@ -10,21 +10,23 @@ import pandas as pd
 
 from app.lib.session import init_session, is_logged_in
 from app.lib.repos import (
-    get_my_role,
+    clear_caches,
     cached_list_my_recipes,
-    update_recipe,
+    save_recipe_changes,
     delete_recipe,
-    cached_list_ingredients,
-    find_ingredient_by_name,
+    clone_recipe,
+    cached_ingredient_dictionary,
     create_ingredient,
     cached_get_recipe_ingredients,
     add_recipe_ingredient,
-    delete_recipe_ingredient_link,
-    update_recipe_ingredient_link,
+    save_recipe_ingredient_lines,
+    bulk_set_recipe_seasons,
+    bulk_update_recipes,
+    bulk_delete_recipes,
     # NEW (Option A)
     cached_list_recipe_seasons,
-    set_recipe_seasons,
 )
+from app.lib import replica
 from app.lib.ui import set_full_page_background, load_css
 from app.lib.brand import sidebar_brand
 
@@ -50,15 +52,20 @@ st.info(
     "- Use the **Search** box to quickly find a recipe, then select it to open the editor.\n"
     "- You’ll see three tabs:\n"
     "  - **✍️ Edit**: update recipe details (name, seasons, servings, times, instructions, notes).\n"
-    "  - **🧂 Ingredients**: view all ingredient lines, **edit/remove** an existing line, or **add** a new one.\n"
+    "  - **🧂 Ingredients**: edit all ingredient lines in one grid (**edit/add/remove**, saved at once), or create a new ingredient.\n"
     "  - **⚠️ Danger zone**: permanently delete the recipe (requires confirmation).\n"
+    "- **📄 Duplicate recipe** copies the selected recipe (seasons + ingredients) so you can make a variant.\n"
+    "- **📦 Bulk actions** apply to several recipes at once: set seasons, edit fields or delete.\n"
     "- Roles matter:\n"
     "  - **Editors** can save changes, edit ingredients, and delete recipes.\n"
     "  - **Readers** can view everything but cannot modify anything.\n"
     "- After saving or deleting, the page refreshes automatically to show the latest data."
 )
 
-st.caption("Tip: ingredient names must match exactly — 'Tomato' and 'Tomatoes' will be treated as different ingredients.")
+st.caption(
+    "Tip: ingredient names must match exactly — 'Tomato' and 'Tomatoes' will be treated as different ingredients. "
+    "Use the **Ingredients** page to find and merge duplicates."
+)
 
 if not is_logged_in():
     st.warning("Please log in via Home.")
@@ -68,11 +75,8 @@ token = st.session_state.session.access_token
 user = st.session_state.session.user
 user_id = user.id
 
-# Role (use session_state if already set)
-if st.session_state.get("role") is None:
-    st.session_state.role = get_my_role(token, user_id)
-
-role = st.session_state.role
+# Role is resolved once per access token by init_session()
+role = st.session_state.role or "reader"
 can_edit = (role == "editor")
 
 # -----------------------------
@@ -154,9 +158,91 @@ with top2:
     )
 with top3:
     if st.button("🔄 Refresh", width=True):
-        st.cache_data.clear()
+        clear_caches()
         st.rerun()
 
+
+# -----------------------------
+# Bulk actions (several recipes, one request per action)
+# -----------------------------
+@st.fragment
+def bulk_actions(df: pd.DataFrame):
+    labels = {
+        r["id"]: f"{r['name'] or '(unnamed)'} · {str(r['created_at'])[:10]} · {r['seasons_str']}"
+        for r in df[["id", "name", "created_at", "seasons_str"]].to_dict("records")
+    }
+
+    with st.expander("📦 Bulk actions", expanded=False):
+        c1, c2 = st.columns([4, 1])
+        with c2:
+            select_all = st.checkbox("Select all", key="bulk_select_all")
+        with c1:
+            selected = st.multiselect(
+                "Recipes",
+                list(labels),
+                default=list(labels) if select_all else None,
+                format_func=labels.get,
+                key=f"bulk_selected_{select_all}",
+                placeholder="Pick the recipes to change…",
+            )
+
+        if not selected:
+            st.caption("Select one or more recipes to enable the actions below.")
+            return
+
+        st.caption(f"**{len(selected)}** recipe(s) selected.")
+        tab_seasons, tab_fields, tab_delete = st.tabs(["🗓️ Set seasons", "✍️ Edit fields", "🗑️ Delete"])
+
+        with tab_seasons:
+            mode = st.radio(
+                "Mode",
+                ["replace", "add", "remove"],
+                format_func={"replace": "Replace with", "add": "Add", "remove": "Remove"}.get,
+                horizontal=True,
+                key="bulk_season_mode",
+            )
+            seasons = st.multiselect("Seasons", ["winter", "spring", "summer", "fall"], key="bulk_seasons")
+            if st.button("Apply seasons", width=True, disabled=not seasons and mode != "replace"):
+                n = bulk_set_recipe_seasons(token, selected, seasons, mode)
+                replica.sync_soon(token)
+                st.success(f"Seasons updated on {n} recipe(s) ✅")
+                st.rerun()
+
+        with tab_fields:
+            st.caption("Only the ticked fields are changed; the others keep each recipe's own value.")
+            patch = {}
+            f1, f2, f3 = st.columns(3)
+            with f1:
+                if st.checkbox("Servings", key="bulk_set_servings"):
+                    patch["servings"] = int(st.number_input("Servings", min_value=1, value=4, step=1, key="bulk_servings"))
+            with f2:
+                if st.checkbox("Prep (min)", key="bulk_set_prep"):
+                    patch["prep_minutes"] = int(st.number_input("Prep (min)", min_value=0, value=0, step=5, key="bulk_prep"))
+            with f3:
+                if st.checkbox("Cook (min)", key="bulk_set_cook"):
+                    patch["cook_minutes"] = int(st.number_input("Cook (min)", min_value=0, value=0, step=5, key="bulk_cook"))
+            if st.checkbox("Notes", key="bulk_set_notes"):
+                patch["notes"] = st.text_area("Notes", value="", height=100, key="bulk_notes")
+
+            if st.button("Apply to selected", width=True, disabled=not patch):
+                rows = bulk_update_recipes(token, selected, patch)
+                replica.sync_soon(token)
+                st.success(f"Updated {len(rows)} recipe(s) ✅")
+                st.rerun()
+
+        with tab_delete:
+            confirm = st.checkbox(f"I understand the {len(selected)} selected recipe(s) will be permanently deleted.")
+            if st.button("🗑️ Delete selected", disabled=not confirm, width=True):
+                n = bulk_delete_recipes(token, selected)
+                replica.sync_soon(token)
+                st.session_state.pop(f"bulk_selected_{select_all}", None)
+                st.success(f"Deleted {n} recipe(s) ✅")
+                st.rerun()
+
+
+if can_edit:
+    bulk_actions(df)
+
 st.divider()
 
 # -----------------------------
@@ -203,208 +289,271 @@ with left:
         st.caption(f"Created: {str(row.get('created_at'))[:19]}")
         st.caption(f"Updated: {str(row.get('updated_at'))[:19]}")
 
-# ===== Right: Tabs (Edit / Ingredients / Danger) =====
-with right:
-    tab_edit, tab_ings, tab_danger = st.tabs(["✍️ Edit", "🧂 Ingredients", "⚠️ Danger zone"])
-
-    # -------- Edit tab --------
-    with tab_edit:
-        with st.container(border=True):
-            st.subheader("Edit recipe")
-            st.caption("Changes are saved to Supabase. Total minutes is computed automatically.")
+    if can_edit and st.button("📄 Duplicate recipe", width=True):
+        copy = clone_recipe(token, recipe_id)
+        replica.sync_soon(token)
+        st.toast(f"Created “{copy.get('name', '')}” ✅")
+        st.rerun()
 
-            name = st.text_input("Name", value=row.get("name") or "", disabled=not can_edit)
+# ===== Right: Tabs (Edit / Ingredients / Danger) =====
+# Each tab is a fragment: widget changes inside a tab rerun only that tab,
+# not the recipe list / seasons aggregation above. Writes still trigger a
+# full-app rerun so the rest of the page picks up the new data.
 
-            ALL_SEASONS = ["winter", "spring", "summer", "fall"]
-            current_seasons = seasons_by_recipe.get(recipe_id, [])
-            current_seasons = [s for s in current_seasons if s in ALL_SEASONS]
 
-            seasons = st.multiselect(
-                "Seasons",
-                ALL_SEASONS,
-                default=current_seasons,
+@st.fragment
+def edit_tab(recipe_id: str, row: dict, current_seasons: list):
+    with st.container(border=True):
+        st.subheader("Edit recipe")
+        st.caption("Changes are saved to Supabase. Total minutes is computed automatically.")
+
+        name = st.text_input("Name", value=row.get("name") or "", disabled=not can_edit)
+
+        ALL_SEASONS = ["winter", "spring", "summer", "fall"]
+        default_seasons = [s for s in current_seasons if s in ALL_SEASONS]
+
+        seasons = st.multiselect(
+            "Seasons",
+            ALL_SEASONS,
+            default=default_seasons,
+            disabled=not can_edit,
+        )
+
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            servings = st.number_input(
+                "Servings",
+                min_value=1,
+                value=int(row.get("servings") or 1),
+                step=1,
                 disabled=not can_edit,
             )
-
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                servings = st.number_input(
-                    "Servings",
-                    min_value=1,
-                    value=int(row.get("servings") or 1),
-                    step=1,
-                    disabled=not can_edit,
-                )
-            with c2:
-                prep = st.number_input(
-                    "Prep (min)",
-                    min_value=0,
-                    value=int(row.get("prep_minutes") or 0),
-                    step=5,
-                    disabled=not can_edit,
-                )
-            with c3:
-                cook = st.number_input(
-                    "Cook (min)",
-                    min_value=0,
-                    value=int(row.get("cook_minutes") or 0),
-                    step=5,
-                    disabled=not can_edit,
-                )
-
-            st.caption(f"Total: **{int(prep) + int(cook)} min** (auto-computed in DB)")
-
-            instructions = st.text_area(
-                "Instructions",
-                value=row.get("instructions") or "",
-                height=220,
+        with c2:
+            prep = st.number_input(
+                "Prep (min)",
+                min_value=0,
+                value=int(row.get("prep_minutes") or 0),
+                step=5,
                 disabled=not can_edit,
             )
-            notes = st.text_area(
-                "Notes",
-                value=row.get("notes") or "",
-                height=120,
+        with c3:
+            cook = st.number_input(
+                "Cook (min)",
+                min_value=0,
+                value=int(row.get("cook_minutes") or 0),
+                step=5,
                 disabled=not can_edit,
             )
 
-            if can_edit and st.button("💾 Save changes", width=True):
-                update_recipe(token, recipe_id, {
+        st.caption(f"Total: **{int(prep) + int(cook)} min** (auto-computed in DB)")
+
+        instructions = st.text_area(
+            "Instructions",
+            value=row.get("instructions") or "",
+            height=220,
+            disabled=not can_edit,
+        )
+        notes = st.text_area(
+            "Notes",
+            value=row.get("notes") or "",
+            height=120,
+            disabled=not can_edit,
+        )
+
+        if can_edit and st.button("💾 Save changes", width=True):
+            # Only what differs from the cached row / seasons is sent (zero writes if nothing changed)
+            changes = save_recipe_changes(
+                token,
+                recipe_id,
+                row,
+                {
                     "name": name,
                     "servings": int(servings),
                     "prep_minutes": int(prep),
                     "cook_minutes": int(cook),
                     "instructions": instructions,
                     "notes": notes,
-                })
-                set_recipe_seasons(token, recipe_id, seasons)
+                },
+                current_seasons,
+                seasons,
+            )
 
-                st.cache_data.clear()
+            if not any(changes.values()):
+                st.info("Nothing changed.")
+            else:
+                replica.sync_soon(token)
                 st.success("Saved ✅")
                 st.rerun()
 
-        with st.container(border=True):
-            st.subheader("Preview")
-            if row.get("instructions"):
-                st.markdown("**Instructions**")
-                st.markdown((row["instructions"] or "").replace("\n", "  \n"))
-            if row.get("notes"):
-                st.markdown("**Notes**")
-                st.markdown((row["notes"] or "").replace("\n", "  \n"))
+    with st.container(border=True):
+        st.subheader("Preview")
+        if row.get("instructions"):
+            st.markdown("**Instructions**")
+            st.markdown((row["instructions"] or "").replace("\n", "  \n"))
+        if row.get("notes"):
+            st.markdown("**Notes**")
+            st.markdown((row["notes"] or "").replace("\n", "  \n"))
 
-    # -------- Ingredients tab --------
-    with tab_ings:
-        with st.container(border=True):
-            st.subheader("Ingredients")
-            links = cached_get_recipe_ingredients(token, recipe_id)
 
-            if not links:
-                st.info("No ingredients linked yet.")
-                df_links = pd.DataFrame(columns=["ingredient_id", "name", "quantity", "unit", "comment"])
-            else:
-                rows_links = []
-                for link in links:
-                    rows_links.append({
-                        "ingredient_id": link.get("ingredient_id"),
-                        "name": (link.get("ingredients") or {}).get("name", ""),
-                        "quantity": link.get("quantity") or "",
-                        "unit": link.get("unit") or "",
-                        "comment": link.get("comment") or "",
-                    })
-                df_links = pd.DataFrame(rows_links)
-
-            st.dataframe(df_links[["name", "quantity", "unit", "comment"]], hide_index=True, width="stretch")
-
-        with st.container(border=True):
-            st.subheader("Update / remove")
-            st.caption("Pick one ingredient line to edit.")
-
-            if df_links.empty:
-                st.info("Nothing to edit yet.")
+@st.fragment
+def ingredients_tab(recipe_id: str):
+    dictionary = cached_ingredient_dictionary(token)
+    all_ings = dictionary.rows()
+    name_to_id = {x["name"]: x["id"] for x in all_ings}
+
+    with st.container(border=True):
+        st.subheader("Ingredients")
+        links = cached_get_recipe_ingredients(token, recipe_id)
+
+        # Lines already on the recipe always resolve, even if the dictionary cache lags behind
+        for link in links:
+            nm = link.get("ingredient_name")
+            if nm and link.get("ingredient_id"):
+                name_to_id.setdefault(nm, link["ingredient_id"])
+
+        if not links:
+            st.info("No ingredients linked yet.")
+        if can_edit:
+            st.caption(
+                "Edit quantities, units and comments in the grid, add rows for existing "
+                "ingredients or delete rows — then save everything at once."
+            )
+
+        df_links = pd.DataFrame(
+            [
+                {
+                    "name": link.get("ingredient_name") or "",
+                    "quantity": link.get("quantity") or "",
+                    "unit": link.get("unit") or "",
+                    "comment": link.get("comment") or "",
+                }
+                for link in links
+            ],
+            columns=["name", "quantity", "unit", "comment"],
+        )
+
+        # Versioned key: after a save the grid restarts from the fresh rows
+        editor_key = f"lines_editor_{recipe_id}_{st.session_state.get('lines_editor_version', 0)}"
+        edited = st.data_editor(
+            df_links,
+            key=editor_key,
+            num_rows="dynamic" if can_edit else "fixed",
+            disabled=not can_edit,
+            hide_index=True,
+            width="stretch",
+            column_config={
+                "name": st.column_config.SelectboxColumn("Ingredient", options=sorted(name_to_id), required=True),
+                "quantity": st.column_config.TextColumn("Quantity"),
+                "unit": st.column_config.TextColumn("Unit"),
+                "comment": st.column_config.TextColumn("Comment"),
+            },
+        )
+
+        if can_edit and st.button("💾 Save ingredient lines", width=True):
+            names = [n for n in edited["name"].tolist() if isinstance(n, str) and n]
+            dupes = sorted({n for n in names if names.count(n) > 1})
+            if dupes:
+                st.error(f"Each ingredient can only appear once: {', '.join(dupes)}.")
+                st.stop()
+
+            lines = []
+            for r in edited.to_dict("records"):
+                ing_id = name_to_id.get(r.get("name"))
+                if not ing_id:
+                    continue  # empty new row
+                lines.append({
+                    "ingredient_id": ing_id,
+                    "quantity": r.get("quantity"),
+                    "unit": r.get("unit"),
+                    "comment": r.get("comment"),
+                })
+
+            # One round trip for every add / edit / removal
+            changes = save_recipe_ingredient_lines(token, recipe_id, links, lines)
+            if not (changes["upserted"] or changes["deleted"]):
+                st.info("Nothing changed.")
             else:
-                pick = st.selectbox("Ingredient", df_links["name"].tolist())
-                line = df_links[df_links["name"] == pick].iloc[0].to_dict()
-                ing_id = line["ingredient_id"]
-
-                q = st.text_input("Quantity", value=line.get("quantity", ""), disabled=not can_edit)
-                u = st.text_input("Unit", value=line.get("unit", ""), disabled=not can_edit)
-                c = st.text_input("Comment", value=line.get("comment", ""), disabled=not can_edit)
-
-                b1, b2 = st.columns(2)
-                with b1:
-                    if can_edit and st.button("Save ingredient line", width=True):
-                        update_recipe_ingredient_link(token, recipe_id, ing_id, {"quantity": q, "unit": u, "comment": c})
-                        st.cache_data.clear()
-                        st.success("Updated ✅")
-                        st.rerun()
-                with b2:
-                    if can_edit and st.button("Remove ingredient", width=True):
-                        delete_recipe_ingredient_link(token, recipe_id, ing_id)
-                        st.cache_data.clear()
-                        st.success("Removed ✅")
-                        st.rerun()
-
-        with st.container(border=True):
-            st.subheader("➕ Add ingredient")
-            all_ings = cached_list_ingredients(token)
-            ing_names = [x["name"] for x in all_ings]
-
-            mode = st.radio("Pick mode", ["Choose existing", "Create new"], horizontal=True)
+                replica.sync_soon(token)
+                st.session_state.lines_editor_version = st.session_state.get("lines_editor_version", 0) + 1
+                st.success("Saved ✅")
+                st.rerun()
 
+    with st.container(border=True):
+        st.subheader("➕ Add ingredient")
+        ing_names = [x["name"] for x in all_ings]
+
+        mode = st.radio("Pick mode", ["Choose existing", "Create new"], horizontal=True)
+
+        if mode == "Choose existing":
+            chosen_ing = st.selectbox("Ingredient", ["(select)"] + ing_names, index=0)
+            new_name = ""
+        else:
+            new_name = st.text_input("New ingredient name", value="")
+            chosen_ing = "(select)"
+
+        colx, coly, colz = st.columns(3)
+        with colx:
+            qty = st.text_input("Quantity (optional)", value="")
+        with coly:
+            unit = st.text_input("Unit (optional)", value="")
+        with colz:
+            comment = st.text_input("Comment (optional)", value="")
+
+        if can_edit and st.button("Add to recipe", width=True):
             if mode == "Choose existing":
-                chosen_ing = st.selectbox("Ingredient", ["(select)"] + ing_names, index=0)
-                new_name = ""
+                if chosen_ing == "(select)":
+                    st.error("Please select an ingredient.")
+                    st.stop()
+                ing_id = name_to_id[chosen_ing]
             else:
-                new_name = st.text_input("New ingredient name", value="")
-                chosen_ing = "(select)"
-
-            colx, coly, colz = st.columns(3)
-            with colx:
-                qty = st.text_input("Quantity (optional)", value="")
-            with coly:
-                unit = st.text_input("Unit (optional)", value="")
-            with colz:
-                comment = st.text_input("Comment (optional)", value="")
-
-            if can_edit and st.button("Add to recipe", width=True):
-                if mode == "Choose existing":
-                    if chosen_ing == "(select)":
-                        st.error("Please select an ingredient.")
-                        st.stop()
-                    ing = find_ingredient_by_name(token, chosen_ing)
-                    ing_id = ing["id"]
-                else:
-                    clean = (new_name or "").strip()
-                    if not clean:
-                        st.error("Please type a name for the new ingredient.")
-                        st.stop()
-                    created = create_ingredient(token, clean)
-                    ing_id = created["id"]
-
-                add_recipe_ingredient(token, {
-                    "recipe_id": recipe_id,
-                    "ingredient_id": ing_id,
-                    "quantity": qty or None,
-                    "unit": unit or None,
-                    "comment": comment or None,
-                })
-                st.cache_data.clear()
-                st.success("Added ✅")
+                clean = (new_name or "").strip()
+                if not clean:
+                    st.error("Please type a name for the new ingredient.")
+                    st.stop()
+                # Same name up to case/spaces = same ingredient (DB unique index)
+                existing = dictionary.find(clean)
+                ing_id = existing["id"] if existing else create_ingredient(token, clean)["id"]
+
+            add_recipe_ingredient(token, {
+                "recipe_id": recipe_id,
+                "ingredient_id": ing_id,
+                "quantity": qty or None,
+                "unit": unit or None,
+                "comment": comment or None,
+            })
+            replica.sync_soon(token)
+            st.session_state.lines_editor_version = st.session_state.get("lines_editor_version", 0) + 1
+            st.success("Added ✅")
+            st.rerun()
+
+        if not can_edit:
+            st.caption("Only editors can edit ingredients.")
+
+
+@st.fragment
+def danger_tab(recipe_id: str):
+    with st.container(border=True):
+        st.subheader("Delete recipe")
+
+        if not can_edit:
+            st.info("Only editors can delete recipes.")
+        else:
+            confirm = st.checkbox("I understand this is permanent.")
+            if st.button("🗑️ Delete recipe", disabled=not confirm, width=True):
+                delete_recipe(token, recipe_id)
+                replica.sync_soon(token)
+                st.success("Deleted ✅")
                 st.rerun()
 
-            if not can_edit:
-                st.caption("Only editors can edit ingredients.")
 
-    # -------- Danger tab --------
-    with tab_danger:
-        with st.container(border=True):
-            st.subheader("Delete recipe")
+with right:
+    tab_edit, tab_ings, tab_danger = st.tabs(["✍️ Edit", "🧂 Ingredients", "⚠️ Danger zone"])
 
-            if not can_edit:
-                st.info("Only editors can delete recipes.")
-            else:
-                confirm = st.checkbox("I understand this is permanent.")
-                if st.button("🗑️ Delete recipe", disabled=not confirm, width=True):
-                    delete_recipe(token, recipe_id)
-                    st.cache_data.clear()
-                    st.success("Deleted ✅")
-                    st.rerun()
+    with tab_edit:
+        edit_tab(recipe_id, row, seasons_by_recipe.get(recipe_id, []))
+
+    with tab_ings:
+        ingredients_tab(recipe_id)
+
+    with tab_danger:
+        danger_tab(recipe_id)
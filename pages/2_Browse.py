@@ -6,9 +6,10 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 import streamlit as st
-import pandas as pd
+import numpy as np
 import re
 import html
+import tempfile
 
 from app.lib.session import init_session, is_logged_in
 from app.lib.repos import (
@@ -16,7 +17,12 @@ from app.lib.repos import (
     cached_list_recipe_ingredients,
     cached_list_profiles_by_ids,
     cached_list_recipe_seasons,
+    clone_recipe,
 )
+from app.lib import replica
+from app.lib.catalog import catalog_for
+from app.lib.exporter import FORMATS, MIME_TYPES, export_cookbook, iter_db_pages
+from app.lib.supabase_client import get_optional_setting
 from app.lib.ui import set_full_page_background, load_css
 from app.lib.brand import sidebar_brand
 
@@ -110,7 +116,8 @@ st.info(
     "  - **Contains ANY** → recipes containing *at least one* selected ingredient.\n"
     "  - **Contains ALL** → recipes containing *all* selected ingredients.\n"
     "- Use **Search** to find recipes by name, and **Sort** to order results.\n"
-    "- Finally, pick a recipe in the **Details** section to view full ingredients + instructions."
+    "- Finally, pick a recipe in the **Details** section to view full ingredients + instructions.\n"
+    "- Editors can **Duplicate** any recipe into their own space to make a variant."
 )
 
 if not is_logged_in():
@@ -118,6 +125,7 @@ if not is_logged_in():
     st.stop()
 
 token = st.session_state.session.access_token
+can_edit = (st.session_state.role == "editor")
 
 
 def strip_trailing_id(s: str) -> str:
@@ -130,45 +138,26 @@ def strip_trailing_id(s: str) -> str:
 # =========================
 # Load data (efficiently)
 # =========================
-recipes = cached_list_recipes(token)
-links = cached_list_recipe_ingredients(token)
-season_rows = cached_list_recipe_seasons(token)
+# Local SQLite replica when configured and loaded, cached PostgREST reads otherwise
+use_replica = replica.ensure_synced(token)
+if use_replica:
+    recipes, links, season_rows = replica.load_catalog()
+else:
+    recipes = cached_list_recipes(token)
+    links = cached_list_recipe_ingredients(token)
+    season_rows = cached_list_recipe_seasons(token)
+
+catalog = catalog_for(recipes, links, season_rows)
 
-if not recipes:
+if not len(catalog):
     st.info("No recipes yet.")
     st.stop()
 
-df_recipes = pd.DataFrame(recipes)
-
-# Ensure columns exist
-for col in ["servings", "prep_minutes", "cook_minutes", "total_minutes", "created_by", "instructions", "notes"]:
-    if col not in df_recipes.columns:
-        df_recipes[col] = None
-
-df_recipes["name"] = df_recipes["name"].astype(str).apply(strip_trailing_id)
-
-# =========================
-# Seasons aggregation
-# =========================
-df_seasons = pd.DataFrame(season_rows)
-
-if df_seasons.empty:
-    seasons_by_recipe = {}
-else:
-    seasons_by_recipe = (
-        df_seasons.groupby("recipe_id")["season"]
-        .apply(lambda s: sorted(set([x for x in s.tolist() if x])))
-        .to_dict()
-    )
-
-df_recipes["seasons"] = df_recipes["id"].map(lambda rid: seasons_by_recipe.get(rid, []))
-df_recipes["seasons_str"] = df_recipes["seasons"].map(lambda xs: ", ".join(xs) if xs else "—")
-
 # =========================
 # Creator names
 # =========================
-creator_ids = tuple(sorted(df_recipes["created_by"].dropna().unique().tolist()))
-profiles = cached_list_profiles_by_ids(token, creator_ids)
+creator_ids = tuple(sorted(catalog.creators))
+profiles = replica.list_profiles_by_ids(creator_ids) if use_replica else cached_list_profiles_by_ids(token, creator_ids)
 
 id_to_name = {}
 for p in profiles:
@@ -177,21 +166,23 @@ for p in profiles:
     full = (fn + " " + ln).strip()
     id_to_name[p["id"]] = full if full else "Unknown"
 
-df_recipes["creator_name"] = df_recipes["created_by"].map(lambda uid: id_to_name.get(uid, "Unknown"))
-
 # =========================
-# Ingredients aggregation
+# Ingredient names (display name -> ingredient codes of the catalog)
 # =========================
-df_links = pd.DataFrame(links)
+ingredient_codes_by_name = {}
+for code, ing_name in enumerate(catalog.ingredient_names):
+    label = strip_trailing_id(ing_name)
+    if label:
+        ingredient_codes_by_name.setdefault(label, []).append(code)
 
 def safe_str(x):
     return (x or "").strip() if isinstance(x, str) else x
 
-def fmt_line(row) -> str:
-    ing_name = strip_trailing_id(((row.get("ingredients") or {}).get("name", "")))
-    qty = safe_str(row.get("quantity"))
-    unit = safe_str(row.get("unit"))
-    comment = safe_str(row.get("comment"))
+def fmt_line(line) -> str:
+    ing_name = strip_trailing_id(line.get("name") or "")
+    qty = safe_str(line.get("quantity"))
+    unit = safe_str(line.get("unit"))
+    comment = safe_str(line.get("comment"))
 
     left = " ".join([str(x) for x in [qty, unit] if x not in [None, "", "None"]]).strip()
     base = f"{left} — {ing_name}" if left else ing_name
@@ -199,30 +190,6 @@ def fmt_line(row) -> str:
         base = f"{base} ({comment})"
     return base
 
-if not df_links.empty:
-    df_links["ingredient_name"] = df_links["ingredients"].apply(
-        lambda x: strip_trailing_id((x or {}).get("name", ""))
-    )
-    df_links["ingredient_line"] = df_links.apply(fmt_line, axis=1)
-else:
-    df_links = pd.DataFrame(columns=["recipe_id", "ingredient_name", "ingredient_line"])
-
-ingredients_by_recipe = (
-    df_links.groupby("recipe_id")["ingredient_name"]
-    .apply(lambda s: sorted(set([x for x in s if x])))
-    .to_dict()
-)
-
-ingredient_lines_by_recipe = (
-    df_links.groupby("recipe_id")["ingredient_line"]
-    .apply(lambda s: [x for x in s.tolist() if x])
-    .to_dict()
-)
-
-df_recipes["ingredients"] = df_recipes["id"].map(lambda rid: ingredients_by_recipe.get(rid, []))
-df_recipes["ingredients_lines"] = df_recipes["id"].map(lambda rid: ingredient_lines_by_recipe.get(rid, []))
-df_recipes["ingredients_str"] = df_recipes["ingredients"].map(lambda xs: ", ".join(xs))
-
 # =========================
 # Filters UI
 # =========================
@@ -232,10 +199,10 @@ ALL_SEASONS = ["winter", "spring", "summer", "fall"]
 chosen_seasons = st.sidebar.multiselect("Seasons", ALL_SEASONS)
 season_match_mode = st.sidebar.radio("Season match", ["Contains ANY", "Contains ALL"], horizontal=False)
 
-creator_names = sorted(df_recipes["creator_name"].dropna().unique().tolist())
+creator_names = sorted({id_to_name.get(uid, "Unknown") for uid in catalog.creators})
 creator_choice = st.sidebar.selectbox("Creator", ["(any)"] + creator_names)
 
-all_ingredients = sorted(df_links["ingredient_name"].dropna().unique().tolist())
+all_ingredients = sorted(ingredient_codes_by_name)
 chosen_ingredients = st.sidebar.multiselect("Ingredients", all_ingredients)
 ingredient_match_mode = st.sidebar.radio("Ingredient match", ["Contains ANY", "Contains ALL"])
 
@@ -243,37 +210,76 @@ search = st.sidebar.text_input("Search recipe name")
 sort_choice = st.sidebar.selectbox("Sort by", ["Name (A→Z)", "Total time (low→high)", "Total time (high→low)"])
 
 # =========================
-# Apply filters
+# Export (whole cookbook, streamed page by page)
 # =========================
-df = df_recipes.copy()
-
-if chosen_seasons:
-    chosen_set = set(chosen_seasons)
-
-    def season_matches(season_list):
-        sset = set(season_list or [])
-        if season_match_mode == "Contains ANY":
-            return len(sset & chosen_set) > 0
-        return chosen_set.issubset(sset)
-
-    df = df[df["seasons"].apply(season_matches)]
-
-if creator_choice != "(any)":
-    df = df[df["creator_name"] == creator_choice]
-
-if chosen_ingredients:
-    chosen_set = set(chosen_ingredients)
-
-    def ing_matches(ing_list):
-        ing_set = set(ing_list or [])
-        if ingredient_match_mode == "Contains ANY":
-            return len(ing_set & chosen_set) > 0
-        return chosen_set.issubset(ing_set)
+# Streamlit keeps every download in memory until the session ends: bigger
+# exports are left to the CLI (python -m app.lib.exporter), which writes to disk
+EXPORT_MAX_DOWNLOAD_MB = float(get_optional_setting("EXPORT_MAX_DOWNLOAD_MB", "200"))
+
+st.sidebar.divider()
+st.sidebar.header("Export")
+export_format = st.sidebar.selectbox(
+    "Format",
+    FORMATS,
+    format_func={"jsonl": "JSON Lines (.jsonl)", "parquet": "Parquet (.parquet)"}.get,
+)
+if st.sidebar.button("⬇️ Prepare export"):
+    # Streamed to disk page by page; the file object goes straight to
+    # download_button (read once, into Streamlit's media store)
+    with tempfile.TemporaryFile() as export_file:
+        with st.spinner("Exporting the cookbook…"):
+            report = export_cookbook(export_file, iter_db_pages(token), export_format)
+        if report.bytes > EXPORT_MAX_DOWNLOAD_MB * 1e6:
+            st.sidebar.warning(
+                f"The export is {report.bytes / 1e6:.1f} MB, over the {EXPORT_MAX_DOWNLOAD_MB:g} MB "
+                f"browser download limit. Run `python -m app.lib.exporter --format {export_format} "
+                f"--out cookbook.{export_format}` instead."
+            )
+        else:
+            export_file.flush()
+            # download_button takes a read-only file (BufferedReader), not the read/write one
+            with open(export_file.fileno(), "rb", closefd=False) as reader:
+                st.sidebar.download_button(
+                    f"Download {report.rows} recipes",
+                    data=reader,
+                    file_name=f"cookbook.{export_format}",
+                    mime=MIME_TYPES[export_format],
+                )
+    st.sidebar.caption(f"{report.bytes / 1e6:.1f} MB · {report.rows_per_second:,.0f} recipes/s")
 
-    df = df[df["ingredients"].apply(ing_matches)]
+# =========================
+# Apply filters
+# =========================
+chosen_creator_ids = (
+    None if creator_choice == "(any)"
+    else [uid for uid in catalog.creators if id_to_name.get(uid, "Unknown") == creator_choice]
+)
+chosen_ingredient_codes = [code for name in chosen_ingredients for code in ingredient_codes_by_name.get(name, [])]
+
+if use_replica and (chosen_seasons or chosen_creator_ids is not None or chosen_ingredients or search.strip()):
+    # Answered by the replica's indexes
+    matching_ids = replica.filter_recipe_ids(
+        seasons=chosen_seasons,
+        seasons_match_all=(season_match_mode == "Contains ALL"),
+        creator_ids=chosen_creator_ids,
+        ingredient_ids=[catalog.ingredient_ids[code] for code in chosen_ingredient_codes],
+        ingredients_match_all=(ingredient_match_mode == "Contains ALL"),
+        search=search,
+    )
+    keep = np.fromiter((rid in matching_ids for rid in catalog.ids), dtype=bool, count=len(catalog))
+else:
+    keep = catalog.filter(
+        seasons=chosen_seasons,
+        seasons_match_all=(season_match_mode == "Contains ALL"),
+        creator_ids=chosen_creator_ids,
+        ingredient_codes=chosen_ingredient_codes,
+        ingredients_match_all=(ingredient_match_mode == "Contains ALL"),
+        search=search,
+    )
 
-if search.strip():
-    df = df[df["name"].str.contains(search.strip(), case=False, na=False)]
+# Strings (seasons, ingredient lists, creator names) are only built for the rows shown
+df = catalog.frame(np.flatnonzero(keep), id_to_name, clean_name=strip_trailing_id)
+df["name"] = df["name"].map(strip_trailing_id)
 
 if sort_choice == "Name (A→Z)":
     df = df.sort_values("name")
@@ -393,14 +399,16 @@ if selected_name != "(none)":
     else:
         row = candidates.iloc[0]
 
+    recipe = catalog.recipe(catalog.index[row["id"]])
+
     ingredients_html = "".join(
-        f"<li>{esc(reorder_ingredient(line))}</li>"
-        for line in (row.get("ingredients_lines") or [])
+        f"<li>{esc(reorder_ingredient(fmt_line(line)))}</li>"
+        for line in recipe.lines()
     ) or "<li><i>No ingredients."
 
 
-    instructions_html = render_text_or_bullets(row.get("instructions") or "", css_class="steps")
-    notes_html = render_text_or_bullets(row.get("notes") or "")
+    instructions_html = render_text_or_bullets(recipe.instructions or "", css_class="steps")
+    notes_html = render_text_or_bullets(recipe.notes or "")
 
     html_block = f"""
     <div class="details-panel">
@@ -408,7 +416,7 @@ if selected_name != "(none)":
 
       <div class="details-meta">
         <b>Creator:</b> {esc(row.get("creator_name"))}<br>
-        <b>Seasons:</b> {esc(seasons_label(row.get("seasons", [])))}<br>
+        <b>Seasons:</b> {esc(seasons_label(recipe.seasons))}<br>
         <b>Servings:</b> {esc(row.get("servings", 1))}<br>
         <b>Time:</b>
         Prep {esc(row.get("prep_minutes", 0))} min +
@@ -441,3 +449,8 @@ if selected_name != "(none)":
 
     st.markdown(html_block, unsafe_allow_html=True)
 
+    if can_edit and st.button("📄 Duplicate recipe"):
+        copy = clone_recipe(token, row["id"])
+        replica.sync_soon(token)
+        st.toast(f"Created “{copy.get('name', '')}” — find it in My Space ✅")
+        st.rerun()
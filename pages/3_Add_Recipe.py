@@ -1,3 +1,4 @@
+import io
 import sys
 from pathlib import Path
 
@@ -9,8 +10,7 @@ import streamlit as st
 
 from app.lib.session import init_session, is_logged_in
 from app.lib.repos import (
-    get_my_role,
-    list_ingredients,
+    cached_ingredient_dictionary,
     create_ingredient,
     find_ingredient_by_name,
     create_recipe,
@@ -18,6 +18,8 @@ from app.lib.repos import (
     # Option A (join table)
     set_recipe_seasons,
 )
+from app.lib import replica
+from app.lib.importer import read_records, run_import
 from app.lib.ui import set_full_page_background, load_css
 from app.lib.brand import sidebar_brand
 
@@ -79,8 +81,9 @@ st.info(
     "How it works:\n"
     "- Fill in the **recipe details** (name, seasons, servings, times, instructions).\n"
     "- Add your **ingredients line by line** (quantity + unit + optional comment).\n"
-    "- For each ingredient, you can either **select an existing one** from the list, "
-    "or **create a new ingredient** if it doesn’t exist yet.\n"
+    "- Start typing an ingredient name: suggestions match the start of any word (accents and case "
+    "don’t matter) and the most used ingredients come first. If nothing matches, pick **Create** "
+    "to add a new ingredient.\n"
     "- When you click **Create recipe now**, the recipe is saved, seasons are linked, "
     "and ingredients are automatically created (if needed) and attached to the recipe."
 )
@@ -92,10 +95,7 @@ if not is_logged_in():
 token = st.session_state.session.access_token
 user_id = st.session_state.session.user.id
 
-# Load role if needed
-if "role" not in st.session_state or st.session_state.role is None:
-    st.session_state.role = get_my_role(token, user_id)
-
+# Role is resolved once per access token by init_session()
 if st.session_state.role != "editor":
     st.error("You are read-only (reader). You can't add recipes.")
     st.stop()
@@ -108,37 +108,50 @@ def reset_ingredient_lines():
     st.session_state.ingredient_lines = []
 
 
+# Last suggestion when the typed name isn't in the dictionary yet
+CREATE_OPTION = "➕ Create “{name}”"
+
+
 # =========================
 # 1) Recipe form
 # =========================
 st.subheader("1) Recipe details")
 
-colA, colB, colC = st.columns([2, 1, 1])
 
-with colA:
-    name = st.text_input("Recipe name *")
+@st.fragment
+def recipe_details_form():
+    """Recipe fields live in their own fragment: editing them (e.g. the season
+    picker) only reruns this block. Values are read back via their keys."""
+    colA, colB, colC = st.columns([2, 1, 1])
 
-with colB:
-    seasons = st.multiselect(
-        "Seasons *",
-        ["winter", "spring", "summer", "fall"],
-        default=[],
-    )
+    with colA:
+        st.text_input("Recipe name *", key="new_recipe_name")
+
+    with colB:
+        st.multiselect(
+            "Seasons *",
+            ["winter", "spring", "summer", "fall"],
+            default=[],
+            key="new_recipe_seasons",
+        )
+
+    with colC:
+        st.caption("Total time is computed automatically (prep + cook).")
+
+    # ✅ Servings + Prep + Cook in one row
+    colS, colP, colK = st.columns(3)
+    with colS:
+        st.number_input("Servings", min_value=1, step=1, value=4, key="new_recipe_servings")
+    with colP:
+        st.number_input("Prep time (minutes)", min_value=0, step=5, value=0, key="new_recipe_prep")
+    with colK:
+        st.number_input("Cook time (minutes)", min_value=0, step=5, value=0, key="new_recipe_cook")
 
-with colC:
-    st.caption("Total time is computed automatically (prep + cook).")
+    st.text_area("Instructions", height=180, key="new_recipe_instructions")
+    st.text_area("Notes", height=100, key="new_recipe_notes")
 
-# ✅ Servings + Prep + Cook in one row
-colS, colP, colK = st.columns(3)
-with colS:
-    servings = st.number_input("Servings", min_value=1, step=1, value=4)
-with colP:
-    prep = st.number_input("Prep time (minutes)", min_value=0, step=5, value=0)
-with colK:
-    cook = st.number_input("Cook time (minutes)", min_value=0, step=5, value=0)
 
-instructions = st.text_area("Instructions", height=180)
-notes = st.text_area("Notes", height=100)
+recipe_details_form()
 
 st.divider()
 
@@ -147,79 +160,76 @@ st.divider()
 # =========================
 st.subheader("2) Ingredients (add lines)")
 
-ingredients = list_ingredients(token)
-existing_names = [i["name"] for i in ingredients]
-name_to_id = {i["name"]: i["id"] for i in ingredients}
 
-left, right = st.columns([2, 1])
+@st.fragment
+def ingredient_lines_editor():
+    """Ingredient-line editing reruns only this fragment (cached dictionary, no DB calls)."""
+    dictionary = cached_ingredient_dictionary(token)
 
-with left:
-    mode = st.radio(
-        "Choose ingredient input mode",
-        ["Select existing", "Create new"],
-        horizontal=True
-    )
+    left, right = st.columns([2, 1])
 
-    if mode == "Select existing":
-        if not existing_names:
-            st.info("No ingredients yet. Switch to 'Create new' to add the first ones.")
-            selected_name = None
-        else:
-            selected_name = st.selectbox("Ingredient", existing_names, index=0)
-        new_name = None
-    else:
-        selected_name = None
-        new_name = st.text_input("New ingredient name")
+    with left:
+        query = st.text_input(
+            "Ingredient",
+            key="ingredient_query",
+            placeholder="Start typing a name (e.g. tom, crème)…",
+        ).strip()
 
-    qty = st.text_input("Quantity (e.g., 200, 1/2)", key="qty")
-    unit = st.text_input("Unit (e.g., g, mL, spoon)", key="unit")
-    comment = st.text_input("Comment (optional)", key="comment")
+        # Prefix matches (case/accent insensitive), most used first
+        matches = dictionary.search(query, limit=8)
+        exact = dictionary.find(query) if query else None
 
-    add_line = st.button("➕ Add ingredient line")
+        options = [m["name"] for m in matches]
+        if query and not exact:
+            options.append(CREATE_OPTION.format(name=query))
 
-with right:
-    st.markdown("### Current ingredients")
-    if not st.session_state.ingredient_lines:
-        st.write("_None yet_")
-    else:
-        for idx, line in enumerate(st.session_state.ingredient_lines, start=1):
-            q = (line.get("quantity") or "")
-            u = (line.get("unit") or "")
-            c = line.get("comment")
-            c_txt = f" ({c})" if c else ""
-            st.write(f"{idx}. **{line['name']}** {q} {u}{c_txt}")
-
-        if st.button("🗑️ Clear ingredient list"):
-            reset_ingredient_lines()
-            st.rerun()
-
-# Handle adding an ingredient line (client-side only)
-if add_line:
-    if mode == "Select existing":
-        if not selected_name:
-            st.error("Select an ingredient first.")
+        if not options:
+            st.info("No ingredients yet. Type a name to create the first one.")
+            picked = None
         else:
-            st.session_state.ingredient_lines.append({
-                "name": selected_name,
-                "is_new": False,
-                "quantity": qty.strip() or None,
-                "unit": unit.strip() or None,
-                "comment": comment.strip() or None,
-            })
-            st.rerun()
-    else:
-        nm = (new_name or "").strip()
-        if not nm:
-            st.error("New ingredient name is required.")
+            picked = st.radio(
+                "Suggestions" if query else "Most used",
+                options,
+                index=options.index(exact["name"]) if exact and exact["name"] in options else 0,
+            )
+
+        qty = st.text_input("Quantity (e.g., 200, 1/2)", key="qty")
+        unit = st.text_input("Unit (e.g., g, mL, spoon)", key="unit")
+        comment = st.text_input("Comment (optional)", key="comment")
+
+        add_line = st.button("➕ Add ingredient line")
+
+        # Handle adding an ingredient line (client-side only).
+        # Done before rendering the list so no extra rerun is needed.
+        if add_line:
+            if not picked:
+                st.error("Type or pick an ingredient first.")
+            else:
+                is_new = picked == CREATE_OPTION.format(name=query)
+                st.session_state.ingredient_lines.append({
+                    "name": query if is_new else picked,
+                    "is_new": is_new,
+                    "quantity": qty.strip() or None,
+                    "unit": unit.strip() or None,
+                    "comment": comment.strip() or None,
+                })
+
+    with right:
+        st.markdown("### Current ingredients")
+        if not st.session_state.ingredient_lines:
+            st.write("_None yet_")
         else:
-            st.session_state.ingredient_lines.append({
-                "name": nm,
-                "is_new": True,
-                "quantity": qty.strip() or None,
-                "unit": unit.strip() or None,
-                "comment": comment.strip() or None,
-            })
-            st.rerun()
+            for idx, line in enumerate(st.session_state.ingredient_lines, start=1):
+                q = (line.get("quantity") or "")
+                u = (line.get("unit") or "")
+                c = line.get("comment")
+                c_txt = f" ({c})" if c else ""
+                st.write(f"{idx}. **{line['name']}** {q} {u}{c_txt}")
+
+            st.button("🗑️ Clear ingredient list", on_click=reset_ingredient_lines)
+
+
+ingredient_lines_editor()
 
 st.divider()
 
@@ -232,6 +242,14 @@ create_btn = st.button("✅ Create recipe now")
 
 if create_btn:
     # 0) Validate BEFORE any DB writes
+    name = st.session_state.get("new_recipe_name") or ""
+    seasons = st.session_state.get("new_recipe_seasons") or []
+    servings = st.session_state.get("new_recipe_servings", 4)
+    prep = st.session_state.get("new_recipe_prep", 0)
+    cook = st.session_state.get("new_recipe_cook", 0)
+    instructions = st.session_state.get("new_recipe_instructions") or ""
+    notes = st.session_state.get("new_recipe_notes") or ""
+
     problems = validate_before_create(name, seasons, st.session_state.ingredient_lines)
     if problems:
         st.warning("Please fix the following before creating the recipe:")
@@ -269,7 +287,8 @@ if create_btn:
 
     # 2) Set seasons (Option A join table)
     try:
-        set_recipe_seasons(token, created_recipe_id, seasons)
+        # New recipe: nothing to delete, only inserts
+        set_recipe_seasons(token, created_recipe_id, seasons, current=[])
         seasons_set = True
     except Exception as e:
         st.error("Recipe was created, but setting seasons failed.")
@@ -278,11 +297,13 @@ if create_btn:
         st.write("- Seasons: ❌ not set")
         st.write("- Ingredient links: 0")
         st.exception(e)
+        replica.sync_soon(token)
         st.info("You can fix this in **My Space** by editing the recipe seasons.")
         st.stop()
 
     # 3) Ensure ingredients exist, then link
-    cached_ids = dict(name_to_id)
+    dictionary = cached_ingredient_dictionary(token)
+    cached_ids = {}
 
     try:
         for line in st.session_state.ingredient_lines:
@@ -290,7 +311,8 @@ if create_btn:
             if not ing_name:
                 raise RuntimeError("One ingredient line is missing a name.")
 
-            ing_id = cached_ids.get(ing_name)
+            known = dictionary.find(ing_name)
+            ing_id = cached_ids.get(ing_name) or (known["id"] if known else None)
             if not ing_id:
                 try:
                     created = create_ingredient(token, ing_name)
@@ -326,10 +348,68 @@ if create_btn:
         st.write("Error details:")
         st.exception(e)
         st.info("Fix the issue and edit the recipe in **My Space** to finish linking ingredients.")
+        replica.sync_soon(token)
         st.stop()
 
     # Success
-    st.cache_data.clear()
+    replica.sync_soon(token)
     st.session_state.flash_success = "Recipe created ✅"
     reset_ingredient_lines()
     st.rerun()
+
+
+# =========================
+# 4) Bulk import (CSV / JSON / Markdown)
+# =========================
+st.divider()
+st.subheader("📥 Import recipes from a file")
+
+with st.expander("Import many recipes at once", expanded=False):
+    st.markdown(
+        "- **CSV**: header row `name, seasons, servings, prep_minutes, cook_minutes, instructions, notes, "
+        "ingredients`; ingredients as `Flour: 200 g; Eggs: 2 (large)`.\n"
+        "- **JSON**: an array of objects (or one object per line, `.jsonl`) with the same fields; "
+        "`ingredients` may be a list of `{name, quantity, unit, comment}`.\n"
+        "- **Markdown**: one `# Title` per recipe, then `Seasons:`, `Servings:`, `Prep:`, `Cook:` lines and "
+        "`## Ingredients` (one `- Name: qty unit (comment)` per line), `## Instructions`, `## Notes` sections.\n"
+        "- Missing ingredients are created automatically. Invalid recipes are listed below and skipped; "
+        "the others are imported."
+    )
+    uploaded = st.file_uploader("Recipe file", type=["csv", "json", "jsonl", "md", "markdown"])
+
+    if uploaded is not None and st.button("📥 Import recipes"):
+        progress = st.progress(0.0, text="Starting…")
+        total_bytes = max(uploaded.size, 1)
+
+        def on_progress(rep):
+            progress.progress(
+                min(uploaded.tell() / total_bytes, 1.0),
+                text=(
+                    f"{rep.read} read · {rep.imported} imported · {rep.failed} failed · "
+                    f"{rep.rows_per_second:.0f} recipes/s"
+                ),
+            )
+
+        text = io.TextIOWrapper(uploaded, encoding="utf-8-sig", newline="")
+        try:
+            report = run_import(token, user_id, read_records(text, Path(uploaded.name).suffix), on_progress=on_progress)
+        except Exception as e:
+            st.error("Import stopped (database error). Recipes from earlier chunks are saved.")
+            st.exception(e)
+            replica.sync_soon(token)
+            st.stop()
+        replica.sync_soon(token)
+        progress.progress(1.0, text="Done")
+
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Imported", report.imported)
+        c2.metric("Failed", report.failed)
+        c3.metric("New ingredients", report.new_ingredients)
+        c4.metric("Recipes / s", f"{report.rows_per_second:.0f}")
+        st.caption(f"{report.read} record(s) read in {report.elapsed:.1f} s.")
+
+        if report.errors:
+            st.warning("Some recipes were skipped:")
+            st.dataframe(report.errors, hide_index=True, width="stretch")
+        else:
+            st.success("All recipes imported ✅")
@@ -0,0 +1,149 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import streamlit as st
+import pandas as pd
+
+from app.lib.session import init_session, is_logged_in
+from app.lib.repos import (
+    clear_caches,
+    cached_list_ingredients,
+    cached_list_recipe_ingredients,
+    merge_ingredients,
+)
+from app.lib import replica
+from app.lib.ingredients import propose_duplicates, usage_counts
+from app.lib.ui import set_full_page_background, load_css
+from app.lib.brand import sidebar_brand
+
+# -----------------------------
+# Page config + styling
+# -----------------------------
+st.set_page_config(
+    page_title="Ingredients",
+    page_icon="🧂",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+set_full_page_background("app/static/bg_add_recipe.jpg")
+init_session()
+load_css()
+sidebar_brand()
+
+st.title("🧂 Ingredients")
+
+st.info(
+    "How the ingredient dictionary works:\n"
+    "- Every recipe line points to one shared ingredient, so **'Tomato' and 'Tomatoes'** end up as two ingredients.\n"
+    "- This page **proposes likely duplicates** (same name once case, accents and plurals are ignored, "
+    "or very similar spelling).\n"
+    "- Tick the groups you want to merge and pick which name to **keep**: every recipe line is moved to it "
+    "and the other names are deleted.\n"
+    "- If a recipe already uses both names, the extra line is kept in the comment of the remaining one.\n"
+    "- Only **editors** can merge."
+)
+
+if not is_logged_in():
+    st.warning("Please log in via Home.")
+    st.stop()
+
+token = st.session_state.session.access_token
+can_edit = (st.session_state.role == "editor")
+
+# -----------------------------
+# Load data
+# -----------------------------
+ingredients = cached_list_ingredients(token)
+usage = usage_counts(cached_list_recipe_ingredients(token))
+
+c1, c2, c3 = st.columns([2, 2, 1])
+with c1:
+    st.metric("Ingredients", len(ingredients))
+with c2:
+    st.metric("Unused", sum(1 for r in ingredients if not usage.get(r["id"])))
+with c3:
+    if st.button("🔄 Refresh", width=True):
+        clear_caches()
+        st.rerun()
+
+st.divider()
+
+# -----------------------------
+# Duplicate proposals
+# -----------------------------
+st.subheader("Likely duplicates")
+
+threshold = st.slider(
+    "Similarity",
+    min_value=0.70,
+    max_value=1.00,
+    value=0.88,
+    step=0.01,
+    help="1.00 only groups names that are identical once case, accents and plurals are ignored.",
+)
+proposals = propose_duplicates(ingredients, usage, threshold)
+
+if not proposals:
+    st.success("No duplicates found ✅")
+    st.stop()
+
+st.caption(f"**{len(proposals)}** group(s) found.")
+
+if not can_edit:
+    st.info("You are a **reader**. Only **editors** can merge ingredients.")
+
+merges = {}
+for i, group in enumerate(proposals):
+    members = group["members"]
+    by_id = {m["id"]: m for m in members}
+
+    def label(ing_id, by_id=by_id):
+        m = by_id[ing_id]
+        return f"{m['name']} ({m['usage']} recipe line(s))"
+
+    with st.container(border=True):
+        head, pick = st.columns([1, 3])
+        with head:
+            selected = st.checkbox(
+                " / ".join(m["name"] for m in members),
+                key=f"merge_pick_{i}",
+                disabled=not can_edit,
+            )
+            st.caption(f"Similarity: {group['score']:.2f}")
+        with pick:
+            target = st.selectbox(
+                "Keep",
+                [m["id"] for m in members],
+                format_func=label,
+                key=f"merge_target_{i}",
+                disabled=not (can_edit and selected),
+            )
+
+        if selected:
+            merges[target] = [m["id"] for m in members if m["id"] != target]
+
+if can_edit:
+    if merges:
+        preview = pd.DataFrame(
+            [
+                {"Keep": next(m["name"] for g in proposals for m in g["members"] if m["id"] == target),
+                 "Merged": len(sources)}
+                for target, sources in merges.items()
+            ]
+        )
+        st.dataframe(preview, hide_index=True, width="stretch")
+
+    if st.button(f"🔗 Merge {len(merges)} selected group(s)", disabled=not merges, width=True):
+        res = merge_ingredients(token, merges)
+        replica.sync_soon(token)
+        for key in [k for k in st.session_state if str(k).startswith(("merge_pick_", "merge_target_"))]:
+            del st.session_state[key]
+        st.toast(
+            f"Merged ✅ {res.get('deleted', 0)} ingredient(s) removed, "
+            f"{res.get('repointed', 0)} line(s) moved, {res.get('folded', 0)} folded into comments."
+        )
+        st.rerun()
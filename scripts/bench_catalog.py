@@ -0,0 +1,101 @@
+"""
+Catalog layout: lists of PostgREST dicts vs the columnar Catalog (app/lib/catalog.py).
+
+    python scripts/bench_catalog.py --recipes 20000
+
+Rows go through a JSON round trip first, so strings are not shared the way the
+generator shares them (PostgREST responses repeat each ingredient name per line).
+Reports retained memory of each layout and the time Browse / Home spend turning
+the cached tables into what they display.
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.lib.catalog import Catalog  # noqa: E402
+from scripts.synthetic_data import catalog  # noqa: E402
+
+
+def decoded_tables(n: int):
+    return tuple(json.loads(json.dumps(table)) for table in catalog(n))
+
+
+def measure(build):
+    """(value, retained bytes) of what build() returns."""
+    gc.collect()
+    tracemalloc.start()
+    value = build()
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, retained
+
+
+def legacy_browse(recipes, links, seasons, names):
+    """The per-rerun conversion Browse did on the lists of dicts."""
+    df = pd.DataFrame(recipes)
+    df_seasons = pd.DataFrame(seasons)
+    by_recipe = df_seasons.groupby("recipe_id")["season"].apply(lambda s: sorted(set(s))).to_dict()
+    df["seasons"] = df["id"].map(lambda rid: by_recipe.get(rid, []))
+    df["seasons_str"] = df["seasons"].map(lambda xs: ", ".join(xs) if xs else "—")
+    df["creator_name"] = df["created_by"].map(lambda uid: names.get(uid, "Unknown"))
+    df_links = pd.DataFrame(links)
+    ingredients = df_links.groupby("recipe_id")["ingredient_name"].apply(lambda s: sorted(set(s))).to_dict()
+    df["ingredients"] = df["id"].map(lambda rid: ingredients.get(rid, []))
+    df["ingredients_str"] = df["ingredients"].map(", ".join)
+    return df
+
+
+def timed(label: str, fn, repeat: int = 3):
+    best = min(_once(fn) for _ in range(repeat))
+    print(f"  {label:38} {best * 1000:9.1f} ms")
+
+
+def _once(fn) -> float:
+    t = time.perf_counter()
+    fn()
+    return time.perf_counter() - t
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=20_000)
+    args = parser.parse_args()
+
+    (recipes, links, seasons), list_bytes = measure(lambda: decoded_tables(args.recipes))
+    print(f"{len(recipes)} recipes, {len(links)} ingredient lines, {len(seasons)} season rows")
+
+    def columnar():
+        # Retained size: the source lists are dropped, only the Catalog stays
+        tables = decoded_tables(args.recipes)
+        return Catalog(*tables)
+
+    cat, catalog_bytes = measure(columnar)
+    print("memory")
+    print(f"  {'lists of dicts':38} {list_bytes / 1e6:9.1f} MB")
+    print(f"  {'Catalog':38} {catalog_bytes / 1e6:9.1f} MB  ({list_bytes / max(catalog_bytes, 1):.1f}x smaller)")
+
+    names = {uid: f"Cook {uid}" for uid in cat.creators}
+    all_rows = range(len(cat))
+    print("time")
+    timed("Browse frame from lists of dicts", lambda: legacy_browse(recipes, links, seasons, names))
+    timed("Catalog build (once per refresh)", lambda: Catalog(recipes, links, seasons))
+    timed("Browse frame from Catalog (all rows)", lambda: cat.frame(list(all_rows), names))
+    timed("Catalog filter (season + 2 ingredients)", lambda: cat.filter(["winter"], False, None, [0, 1], True, "soup"))
+    timed("Home: ingredient usage", lambda: pd.DataFrame(links)["ingredient_name"].value_counts())
+    timed("Home: ingredient usage from Catalog", cat.ingredient_usage)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Export throughput on the synthetic cookbook (no database needed):
+
+    python scripts/bench_export.py --recipes 100000
+
+Measures page assembly + JSONL / Parquet writing, i.e. everything the export
+does except the PostgREST round trips. For the end-to-end number against a
+real project, run `python -m app.lib.exporter` (it prints rows/s too).
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.lib.exporter import FORMATS, export_cookbook  # noqa: E402
+from scripts.synthetic_data import pages  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument("--format", choices=FORMATS + ("all",), default="all")
+    parser.add_argument("--memory", action="store_true", help="Also report peak allocations (tracemalloc: much slower)")
+    args = parser.parse_args()
+
+    # Generating the synthetic pages is not part of the export: materialize them first
+    t = time.perf_counter()
+    data = list(pages(args.recipes, args.page_size))
+    print(f"generated {args.recipes} recipes in {time.perf_counter() - t:.1f} s")
+
+    for fmt in FORMATS if args.format == "all" else (args.format,):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, f"cookbook.{fmt}")
+            if args.memory:
+                tracemalloc.start()
+            with open(path, "wb") as f:
+                report = export_cookbook(f, iter(data), fmt)
+            line = (
+                f"{fmt:8} {report.rows:>8} rows  {report.elapsed:6.2f} s  "
+                f"{report.rows_per_second:>10,.0f} rows/s  {os.path.getsize(path) / 1e6:7.1f} MB"
+            )
+            if args.memory:
+                line += f"  peak +{tracemalloc.get_traced_memory()[1] / 1e6:.1f} MB"
+                tracemalloc.stop()
+            print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
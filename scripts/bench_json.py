@@ -0,0 +1,103 @@
+"""
+Catalog response bodies: bytes on the wire and decode time (no database needed).
+
+    python scripts/bench_json.py --recipes 20000
+
+Builds the bodies PostgREST returns for the catalog reads (recipes, ingredient
+lines, seasons, ingredients) from the synthetic cookbook, then reports for each:
+- size as JSON, gzip and brotli (when the brotli package is installed);
+- decompression time;
+- decode time with postgrest-py's own decoder (what .execute() does), stdlib
+  json and orjson (app.lib.http_json.fetch_rows uses orjson when installed).
+"""
+import argparse
+import gzip
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.synthetic_data import catalog, ingredient_names  # noqa: E402
+
+# Dynamic-content levels of a typical CDN / reverse proxy
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def bodies(n: int):
+    recipes, links, seasons = catalog(n)
+    recipes = [{k: v for k, v in r.items() if k not in ("created_at", "updated_at")} for r in recipes]
+    links = [{k: v for k, v in r.items() if k != "ingredient_name"} for r in links]
+    ingredients = [{"id": f"{i + 1:032x}", "name": name, "usage_count": 0} for i, name in enumerate(ingredient_names())]
+    tables = {"recipes": recipes, "recipe_ingredients": links, "recipe_seasons": seasons, "ingredients": ingredients}
+    # PostgREST writes compact JSON
+    return {name: json.dumps(rows, separators=(",", ":")).encode() for name, rows in tables.items()}
+
+
+def best_time(fn, arg, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(arg)
+        times.append(time.perf_counter() - t)
+    return min(times)
+
+
+def decoders():
+    out = {}
+    try:
+        from postgrest.base_request_builder import JSONAdapter
+
+        out["postgrest"] = JSONAdapter.validate_json
+    except ImportError:
+        pass
+    out["json"] = json.loads
+    try:
+        import orjson
+
+        out["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("brotli not installed: br column skipped")
+
+    decode = decoders()
+    header = f"{'table':<20} {'json':>9} {'gzip':>9} {'br':>9} {'gunzip':>8} {'unbr':>8}" + "".join(
+        f" {name:>10}" for name in decode
+    )
+    print(header)
+    print("-" * len(header))
+    for name, body in bodies(args.recipes).items():
+        gz = gzip.compress(body, GZIP_LEVEL)
+        br = brotli.compress(body, quality=BROTLI_QUALITY) if brotli else None
+        cells = [
+            f"{name:<20}",
+            f"{len(body) / 1e6:7.2f}MB",
+            f"{len(gz) / 1e6:7.2f}MB",
+            f"{len(br) / 1e6:7.2f}MB" if br else f"{'-':>9}",
+            f"{best_time(gzip.decompress, gz, args.repeat) * 1000:6.0f}ms",
+            f"{best_time(brotli.decompress, br, args.repeat) * 1000:6.0f}ms" if br else f"{'-':>8}",
+        ]
+        cells += [f"{best_time(fn, body, args.repeat) * 1000:8.0f}ms" for fn in decode.values()]
+        print(" ".join(cells))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
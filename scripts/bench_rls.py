@@ -0,0 +1,135 @@
+"""
+Cost of the RLS write policies, before and after supabase/16_rls_helpers.sql:
+
+    python scripts/bench_rls.py --recipes 20000
+
+For each schema (migrations up to 15, then all), resets and seeds a local
+database (scripts/local_pg.py), then runs typical editor writes under EXPLAIN
+ANALYZE, each in a transaction that is rolled back:
+- as the table owner (no RLS): the cost of the write itself;
+- as the `authenticated` role with an editor's JWT claims.
+Reports the median execution time of --repeat runs. Triggers are disabled
+while measuring (session_replication_role = replica) so the columns differ
+by the policies only; --triggers keeps them.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts import local_pg  # noqa: E402
+
+RECIPE_ID = "00000000-0000-0000-00ff-000000000000"
+
+# (label, setup as table owner, statement as the editor)
+CASES = [
+    (
+        "insert 50 lines",
+        "",
+        "insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity) "
+        "select %(recipe)s, id, '1' from public.ingredients order by id limit 50",
+    ),
+    (
+        "insert 1000 lines",
+        "",
+        "insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity) "
+        "select %(recipe)s, id, '1' from public.ingredients order by id limit 1000",
+    ),
+    (
+        "update 1000 lines",
+        "insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity) "
+        "select %(recipe)s, id, '1' from public.ingredients order by id limit 1000",
+        "update public.recipe_ingredients set quantity = '2' where recipe_id = %(recipe)s",
+    ),
+    (
+        "delete 1000 lines",
+        "insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity) "
+        "select %(recipe)s, id, '1' from public.ingredients order by id limit 1000",
+        "delete from public.recipe_ingredients where recipe_id = %(recipe)s",
+    ),
+    (
+        "insert 1000 recipes",
+        "",
+        "insert into public.recipes (name, created_by) "
+        "select 'Bench ' || g, %(user)s::uuid from generate_series(1, 1000) g",
+    ),
+    (
+        "update own recipes",
+        "",
+        "update public.recipes set notes = coalesce(notes, '') where created_by = %(user)s",
+    ),
+    (
+        "insert seasons (own recipes)",
+        "",
+        "insert into public.recipe_seasons (recipe_id, season) "
+        "select id, 'all' from public.recipes where created_by = %(user)s on conflict do nothing",
+    ),
+]
+
+
+def run_case(conn, setup: str, statement: str, params, rls: bool, triggers: bool) -> float:
+    """Execution time (ms) of `statement`, rolled back."""
+    with conn.transaction(force_rollback=True):
+        conn.execute(
+            "insert into public.recipes (id, name, created_by) values (%(recipe)s, 'Bench recipe', %(user)s)",
+            params,
+        )
+        if setup:
+            conn.execute(setup, params)
+        if not triggers:
+            conn.execute("set local session_replication_role = replica")
+        claims = json.dumps({"sub": params["user"], "role": "authenticated"})
+        conn.execute("select set_config('request.jwt.claims', %s, true)", (claims,))
+        if rls:
+            conn.execute("select set_config('role', 'authenticated', true)")
+        plan = conn.execute("explain (analyze, format json) " + statement, params).fetchone()[0]
+        return plan[0]["Execution Time"]
+
+
+def bench(dsn: str, recipes: int, repeat: int, triggers: bool, before=None):
+    """{label: (ms as owner, ms as the editor)}"""
+    local_pg.reset(dsn, before)
+    local_pg.seed(dsn, recipes)
+    params = {"recipe": RECIPE_ID, "user": local_pg.user_id(0)}
+    results = {}
+    with local_pg.connect(dsn) as conn:
+        for label, setup, statement in CASES:
+            results[label] = tuple(
+                statistics.median(run_case(conn, setup, statement, params, rls, triggers) for _ in range(repeat))
+                for rls in (False, True)
+            )
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("LOCAL_PG_DSN"))
+    parser.add_argument("--datadir", default=".cache/pgdata")
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=11)
+    parser.add_argument("--triggers", action="store_true", help="Keep triggers enabled while measuring")
+    args = parser.parse_args()
+
+    dsn = args.dsn or local_pg.start_pgserver(args.datadir)
+    before = bench(dsn, args.recipes, args.repeat, args.triggers, before=16)
+    after = bench(dsn, args.recipes, args.repeat, args.triggers)
+
+    print(f"{'statement':<30} {'no RLS':>10} {'before 16':>10} {'after 16':>10}  policy cost")
+    for label in before:
+        owner = (before[label][0] + after[label][0]) / 2
+        old, new = before[label][1], after[label][1]
+        print(
+            f"{label:<30} {owner:8.1f}ms {old:8.1f}ms {new:8.1f}ms"
+            f"  {max(old - owner, 0):6.1f} -> {max(new - owner, 0):5.1f} ms"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
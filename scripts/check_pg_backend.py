@@ -0,0 +1,131 @@
+"""
+Checks the direct Postgres backend (REPO_BACKEND=postgres) against a local
+database built by scripts/local_pg.py:
+
+    python scripts/check_pg_backend.py --recipes 20000
+
+Resets and seeds the database, then, through app.lib.repos with
+REPO_BACKEND=postgres:
+- whole-table reads return every row in PostgREST's shapes (names joined);
+- the export readers page the table exactly once;
+- a COPY import as an editor lands every recipe, season and line;
+- RLS still applies: a reader's import, a forged and an expired token fail.
+Prints timings for the whole-table reads and the import.
+"""
+import argparse
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts import local_pg  # noqa: E402
+from scripts.synthetic_data import recipes as synthetic_recipes  # noqa: E402
+
+
+def _timed(label: str, fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    print(f"  {label:<32} {(time.perf_counter() - t0) * 1000:8.1f} ms")
+    return out
+
+
+def _expect_failure(label: str, fn, *args) -> None:
+    try:
+        fn(*args)
+    except Exception as e:
+        print(f"  {label:<32} rejected ({str(e).splitlines()[0][:80]})")
+        return
+    raise AssertionError(f"{label}: expected a failure")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("LOCAL_PG_DSN"))
+    parser.add_argument("--datadir", default=".cache/pgdata")
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--import-recipes", type=int, default=1000)
+    args = parser.parse_args()
+
+    dsn = args.dsn or local_pg.start_pgserver(args.datadir)
+    local_pg.reset(dsn)
+    counts = local_pg.seed(dsn, args.recipes)
+
+    os.environ.update({
+        "REPO_BACKEND": "postgres",
+        "DATABASE_URL": dsn,
+        "SUPABASE_JWT_SECRET": local_pg.JWT_SECRET,
+        "CATALOG_SHARED_DIR": str(Path(args.datadir).resolve().parent / "catalog-check"),
+    })
+    from app.lib import repos
+
+    editor_id, reader_id = local_pg.user_id(0), local_pg.user_id(local_pg.USERS - 1)
+    editor, reader = local_pg.mint_token(editor_id), local_pg.mint_token(reader_id)
+
+    print("Reads")
+    recipes = _timed("list_recipes", repos.list_recipes, reader)
+    links = _timed("list_recipe_ingredients", repos.list_recipe_ingredients, reader)
+    seasons = _timed("list_recipe_seasons", repos.list_recipe_seasons, reader)
+    ingredients = _timed("list_ingredients", repos.list_ingredients, reader)
+    assert len(recipes) == counts["recipes"], len(recipes)
+    assert len(links) == counts["lines"], len(links)
+    assert len(seasons) == counts["seasons"], len(seasons)
+    assert all(r["ingredient_name"] for r in links)
+    assert isinstance(recipes[0]["id"], str) and isinstance(recipes[0]["total_minutes"], int)
+    assert {r["id"] for r in ingredients} >= {r["ingredient_id"] for r in links}
+
+    first = recipes[0]["id"]
+    assert repos.get_recipe_seasons(reader, first) == sorted(s["season"] for s in seasons if s["recipe_id"] == first)
+    assert len(repos.get_recipe_ingredients(reader, first)) == sum(1 for r in links if r["recipe_id"] == first)
+    mine = repos.list_my_recipes(editor, editor_id)
+    assert mine and all(r["created_by"] == editor_id for r in mine)
+    assert repos.list_profiles_by_ids(reader, [editor_id])[0]["role"] == "editor"
+
+    t0, seen, after = time.perf_counter(), 0, None
+    while True:
+        page = repos.list_recipes_page(reader, after, 1000)
+        if not page:
+            break
+        repos.list_recipe_seasons_range(reader, page[0]["id"], page[-1]["id"])
+        repos.list_recipe_ingredients_range(reader, page[0]["id"], page[-1]["id"])
+        seen, after = seen + len(page), page[-1]["id"]
+    print(f"  {'export pages':<32} {(time.perf_counter() - t0) * 1000:8.1f} ms")
+    assert seen == counts["recipes"], seen
+
+    print("Import (COPY)")
+    ids = {r["name"]: r["id"] for r in ingredients}
+    batch = []
+    for r in synthetic_recipes(args.import_recipes, seed=7):
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "name": "Imported " + r["name"],
+            "servings": r["servings"],
+            "prep_minutes": r["prep_minutes"],
+            "cook_minutes": r["cook_minutes"],
+            "instructions": r["instructions"],
+            "notes": r["notes"],
+            "seasons": r["seasons"],
+            "lines": [{"ingredient_id": ids[ln["name"]], "quantity": ln["quantity"], "unit": ln["unit"],
+                       "comment": ln["comment"]} for ln in r["ingredients"]],
+        })
+    inserted = _timed(f"import_recipes ({len(batch)})", repos.import_recipes, editor, editor_id, batch)
+    assert inserted == len(batch), inserted
+    assert len(repos.list_recipes(reader)) == counts["recipes"] + len(batch)
+    assert len(repos.list_recipe_ingredients(reader)) == counts["lines"] + sum(len(r["lines"]) for r in batch)
+
+    print("Access control")
+    _expect_failure("import as a reader", repos.import_recipes, reader, reader_id, [dict(batch[0], id=str(uuid.uuid4()))])
+    _expect_failure("forged token", repos.list_recipes, local_pg.mint_token(editor_id, secret="not-the-secret" * 3))
+    _expect_failure("expired token", repos.list_recipes, local_pg.mint_token(editor_id, ttl=-3600))
+    assert repos.list_recipes(local_pg.mint_token(None, role="anon")) == []
+
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
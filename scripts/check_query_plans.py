@@ -0,0 +1,206 @@
+"""
+Plan and timing regression check for the app's hot reads:
+
+    python scripts/check_query_plans.py --recipes 20000
+
+Resets and seeds a local database (scripts/local_pg.py), then runs each read
+the way app/lib/repos.py issues it, as the `authenticated` role with an
+editor's JWT claims (RLS applies), under EXPLAIN ANALYZE. A check fails when
+its plan doesn't use the expected index, contains a node it must avoid (a
+Sort the index should make unnecessary, a Seq Scan), or its median time is
+over budget. Exits 1 on any failure, so a migration that drops or shadows an
+index is caught before it ships.
+
+Plans depend on the planner's cost settings: random_page_cost is set to 1.1
+(--random-page-cost), the SSD setting of managed hosts like Supabase; with
+the stock 4.0 Postgres prefers seq scan + sort for the 20% selectivity of
+the synthetic editors. Budgets are for a laptop: scale them with
+--budget-scale on slower machines.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts import local_pg  # noqa: E402
+
+RECIPE_COLUMNS = "id,name,servings,prep_minutes,cook_minutes,total_minutes,created_by,instructions,notes"
+EXPORT_RECIPE_COLUMNS = RECIPE_COLUMNS + ",created_at,updated_at"
+
+# (label, statement, accepted indexes, forbidden plan nodes, budget ms, required extension)
+CHECKS = [
+    (
+        "list_recipes",
+        f"select {RECIPE_COLUMNS} from public.recipes order by name",
+        ("idx_recipes_name",),
+        ("Sort", "Seq Scan"),
+        40.0,
+        None,
+    ),
+    (
+        "list_my_recipes",
+        f"select {EXPORT_RECIPE_COLUMNS} from public.recipes where created_by = %(user)s order by created_at desc",
+        ("idx_recipes_created_by_created_at",),
+        ("Sort", "Seq Scan"),
+        6.0,
+        None,
+    ),
+    (
+        "list_ingredients (page 2)",
+        "select id,name,usage_count from public.ingredients order by name, id offset 1000 limit 1000",
+        ("idx_ingredients_name_id",),
+        ("Sort", "Seq Scan"),
+        3.0,
+        None,
+    ),
+    (
+        "find_ingredient_by_name",
+        "select id,name from public.ingredients where name = %(ingredient)s",
+        ("idx_ingredients_name_id", "ingredients_name_key"),
+        ("Seq Scan",),
+        1.0,
+        None,
+    ),
+    (
+        "get_recipe_ingredients",
+        "select ingredient_id,quantity,unit,comment from public.recipe_ingredients where recipe_id = %(recipe)s",
+        ("recipe_ingredients_pkey",),
+        ("Seq Scan",),
+        1.0,
+        None,
+    ),
+    (
+        "get_recipe_seasons",
+        "select season from public.recipe_seasons where recipe_id = %(recipe)s",
+        ("recipe_seasons_pkey",),
+        ("Seq Scan",),
+        1.0,
+        None,
+    ),
+    (
+        "list_recipes_page",
+        f"select {EXPORT_RECIPE_COLUMNS} from public.recipes where id > %(recipe)s order by id limit 500",
+        ("recipes_pkey",),
+        ("Sort", "Seq Scan"),
+        5.0,
+        None,
+    ),
+    (
+        "export lines (id range)",
+        "select recipe_id,ingredient_id,quantity,unit,comment from public.recipe_ingredients "
+        "where recipe_id >= %(first)s and recipe_id <= %(last)s order by recipe_id, ingredient_id",
+        ("recipe_ingredients_pkey",),
+        ("Sort", "Seq Scan"),
+        8.0,
+        None,
+    ),
+    (
+        "list_recipes_changed_since",
+        f"select {EXPORT_RECIPE_COLUMNS} from public.recipes where updated_at >= %(since)s "
+        "order by updated_at, id limit 1000",
+        ("idx_recipes_updated_at",),
+        ("Sort", "Seq Scan"),
+        5.0,
+        None,
+    ),
+    (
+        "name search",
+        "select id,name from public.recipes where name ilike '%%cake #123%%' order by name",
+        ("idx_recipes_name_trgm",),
+        ("Seq Scan",),
+        5.0,
+        "pg_trgm",
+    ),
+]
+
+
+def plan_nodes(node):
+    """[(node type, index name or None)] of a JSON plan, depth first."""
+    out = [(node["Node Type"], node.get("Index Name"))]
+    for child in node.get("Plans", []):
+        out += plan_nodes(child)
+    return out
+
+
+def sample_params(conn) -> dict:
+    """A recipe, an id range of ~500 recipes, an ingredient name and a `since` ~500 recipes back."""
+    row = conn.execute(
+        "select (select id::text from public.recipes order by id offset 5000 limit 1),"
+        " (select id::text from public.recipes order by id offset 5500 limit 1),"
+        " (select name from public.ingredients order by name offset 100 limit 1),"
+        " (select updated_at from public.recipes order by updated_at desc offset 500 limit 1)"
+    ).fetchone()
+    return {"user": local_pg.user_id(1), "recipe": row[0], "first": row[0], "last": row[1],
+            "ingredient": row[2], "since": row[3]}
+
+
+def run_check(conn, statement: str, params: dict, random_page_cost: float):
+    """(execution ms, plan nodes) of `statement` as the editor."""
+    with conn.transaction(force_rollback=True):
+        claims = json.dumps({"sub": params["user"], "role": "authenticated"})
+        conn.execute(
+            "select set_config('request.jwt.claims', %s, true), set_config('random_page_cost', %s, true),"
+            " set_config('role', 'authenticated', true)",
+            (claims, str(random_page_cost)),
+        )
+        plan = conn.execute("explain (analyze, format json) " + statement, params).fetchone()[0][0]
+    return plan["Execution Time"], plan_nodes(plan["Plan"])
+
+
+def check(conn, repeat: int, random_page_cost: float, budget_scale: float) -> int:
+    params = sample_params(conn)
+    extensions = {r[0] for r in conn.execute("select extname from pg_extension")}
+    failures = 0
+    print(f"{'query':<28} {'median':>9} {'budget':>9}  plan")
+    for label, statement, indexes, forbidden, budget_ms, extension in CHECKS:
+        if extension and extension not in extensions:
+            print(f"{label:<28} {'-':>9} {'-':>9}  skipped: {extension} not installed")
+            continue
+        runs = [run_check(conn, statement, params, random_page_cost) for _ in range(repeat)]
+        ms = statistics.median(t for t, _ in runs)
+        nodes = runs[-1][1]
+        problems = []
+        if not any(index in indexes for _, index in nodes):
+            problems.append(f"expected {' or '.join(indexes)}")
+        problems += [f"has {node}" for node in forbidden if any(t == node for t, _ in nodes)]
+        budget = budget_ms * budget_scale
+        if ms > budget:
+            problems.append("over budget")
+        failures += bool(problems)
+        summary = " > ".join(f"{t}({index})" if index else t for t, index in nodes)
+        status = "FAIL: " + ", ".join(problems) if problems else "ok"
+        print(f"{label:<28} {ms:7.2f}ms {budget:7.1f}ms  {summary}  [{status}]")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("LOCAL_PG_DSN"))
+    parser.add_argument("--datadir", default=".cache/pgdata")
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--random-page-cost", type=float, default=1.1)
+    parser.add_argument("--budget-scale", type=float, default=1.0)
+    parser.add_argument("--no-reset", action="store_true", help="Reuse an already seeded database")
+    args = parser.parse_args()
+
+    dsn = args.dsn or local_pg.start_pgserver(args.datadir)
+    if not args.no_reset:
+        local_pg.reset(dsn)
+        local_pg.seed(dsn, args.recipes)
+    with local_pg.connect(dsn) as conn:
+        failures = check(conn, args.repeat, args.random_page_cost, args.budget_scale)
+    if failures:
+        print(f"{failures} check(s) failed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+"""
+Local Postgres with the app's schema, for backend checks and query-plan work.
+
+    # Reset + migrate + seed 20k synthetic recipes, print the DSN and a token
+    python scripts/local_pg.py --dsn postgresql://postgres@localhost/cookbook --recipes 20000
+
+Without --dsn (or LOCAL_PG_DSN), a throwaway server is started with the
+`pgserver` package if it is installed (pip install pgserver; dev only).
+
+The database is DROPPED AND RECREATED: never point this at a real project.
+A small shim stands in for what Supabase provides (the anon / authenticated
+roles, auth.users, auth.uid() reading the request's JWT claims), then every
+supabase/NN_*.sql migration is applied in order.
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.synthetic_data import ingredient_names, pages  # noqa: E402
+
+MIGRATIONS_DIR = ROOT / "supabase"
+JWT_SECRET = "local-development-secret-at-least-32-chars"
+USERS = 50
+
+SUPABASE_SHIM = """
+do $$ begin
+  create role anon nologin noinherit;
+exception when duplicate_object then null; end $$;
+do $$ begin
+  create role authenticated nologin noinherit;
+exception when duplicate_object then null; end $$;
+do $$ begin
+  create role service_role nologin noinherit bypassrls;
+exception when duplicate_object then null; end $$;
+
+drop schema if exists auth cascade;
+drop schema if exists public cascade;
+create schema public;
+create schema auth;
+
+create table auth.users (
+  id uuid primary key,
+  email text,
+  raw_user_meta_data jsonb not null default '{}'::jsonb,
+  created_at timestamptz not null default now()
+);
+
+create function auth.jwt() returns jsonb language sql stable as $$
+  select coalesce(nullif(current_setting('request.jwt.claims', true), ''), '{}')::jsonb
+$$;
+create function auth.uid() returns uuid language sql stable as $$
+  select coalesce(
+    nullif(current_setting('request.jwt.claim.sub', true), ''),
+    auth.jwt() ->> 'sub'
+  )::uuid
+$$;
+create function auth.role() returns text language sql stable as $$
+  select coalesce(nullif(current_setting('request.jwt.claim.role', true), ''), auth.jwt() ->> 'role')
+$$;
+
+grant usage on schema public, auth to anon, authenticated, service_role;
+grant execute on all functions in schema auth to anon, authenticated, service_role;
+alter default privileges in schema public grant all on tables to anon, authenticated, service_role;
+alter default privileges in schema public grant all on sequences to anon, authenticated, service_role;
+alter default privileges in schema public grant execute on functions to anon, authenticated, service_role;
+"""
+
+
+def connect(dsn: str):
+    import psycopg
+
+    return psycopg.connect(dsn, autocommit=True)
+
+
+def start_pgserver(datadir: str) -> str:
+    """DSN of a throwaway local server (pgserver package)."""
+    try:
+        import pgserver
+    except ImportError:
+        sys.exit("No --dsn given and pgserver is not installed (pip install pgserver).")
+    server = pgserver.get_server(datadir, cleanup_mode=None)
+    return server.get_uri()
+
+
+def migrations(before: Optional[int] = None) -> List[Path]:
+    """supabase/NN_*.sql in order (only NN < `before` if given)."""
+    paths = sorted(MIGRATIONS_DIR.glob("[0-9][0-9]_*.sql"))
+    return [p for p in paths if before is None or int(p.name[:2]) < before]
+
+
+def reset(dsn: str, before: Optional[int] = None) -> None:
+    """
+    Drop everything, install the Supabase shim and apply every migration
+    (or those numbered below `before`, to compare with an earlier schema).
+    Each file is one transaction. A file that needs a later one (02_rls.sql
+    references recipe_seasons, created by 05) is retried once the rest applied.
+    """
+    with connect(dsn) as conn:
+        conn.execute(SUPABASE_SHIM)
+        pending = migrations(before)
+        while pending:
+            failed = []
+            for path in pending:
+                try:
+                    conn.execute(path.read_text(encoding="utf-8"))
+                except Exception as e:
+                    failed.append((path, e))
+            if len(failed) == len(pending):
+                path, e = failed[0]
+                raise RuntimeError(f"{path.name}: {e}") from e
+            pending = [path for path, _ in failed]
+        conn.execute("analyze")
+
+
+def user_id(n: int) -> str:
+    return str(uuid.UUID(int=(2 << 64) + n))
+
+
+def _copy(conn, statement: str, rows) -> None:
+    with conn.cursor() as cur, cur.copy(statement) as copy:
+        for row in rows:
+            copy.write_row(row)
+
+
+def seed(dsn: str, recipes: int, seed_: int = 42, editors: int = 5) -> Dict[str, int]:
+    """
+    Load the synthetic cookbook (scripts/synthetic_data.py) as the table owner:
+    USERS users (the first `editors` are editors), the ingredient dictionary,
+    then recipes / seasons / lines with COPY.
+    """
+    counts = {"recipes": 0, "seasons": 0, "lines": 0}
+    with connect(dsn) as conn, conn.transaction():
+        _copy(
+            conn,
+            "copy auth.users (id, email, raw_user_meta_data) from stdin",
+            (
+                (user_id(u), f"cook{u}@example.test", json.dumps({"first_name": "Cook", "last_name": str(u)}))
+                for u in range(USERS)
+            ),
+        )
+        conn.execute(
+            "update public.profiles set role = 'editor' where id = any(%s::uuid[])",
+            ([user_id(u) for u in range(editors)],),
+        )
+        _copy(
+            conn,
+            "copy public.ingredients (id, name) from stdin",
+            ((str(uuid.UUID(int=i + 1)), name) for i, name in enumerate(ingredient_names())),
+        )
+        for page in pages(recipes, page_size=5000, seed=seed_):
+            _copy(
+                conn,
+                "copy public.recipes (id, name, servings, prep_minutes, cook_minutes, instructions, notes,"
+                " created_by, created_at, updated_at) from stdin",
+                (
+                    (r["id"], r["name"], r["servings"], r["prep_minutes"], r["cook_minutes"], r["instructions"],
+                     r["notes"], user_id(int(r["created_by"].split("-")[1]) % editors), r["created_at"],
+                     r["updated_at"])
+                    for r in page["recipes"]
+                ),
+            )
+            _copy(
+                conn,
+                "copy public.recipe_seasons (recipe_id, season) from stdin",
+                ((s["recipe_id"], s["season"]) for s in page["seasons"]),
+            )
+            _copy(
+                conn,
+                "copy public.recipe_ingredients (recipe_id, ingredient_id, quantity, unit, comment) from stdin",
+                ((ln["recipe_id"], ln["ingredient_id"], ln["quantity"], ln["unit"], ln["comment"])
+                 for ln in page["links"]),
+            )
+            counts["recipes"] += len(page["recipes"])
+            counts["seasons"] += len(page["seasons"])
+            counts["lines"] += len(page["links"])
+    with connect(dsn) as conn:
+        conn.execute("vacuum analyze")
+    return counts
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def mint_token(user: Optional[str], secret: str = JWT_SECRET, role: str = "authenticated", ttl: int = 3600) -> str:
+    """HS256 access token shaped like Supabase Auth's (sub, role, exp)."""
+    claims = {"role": role, "exp": int(time.time()) + ttl, "aud": role}
+    if user:
+        claims["sub"] = user
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64(json.dumps(claims).encode())
+    signature = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+    return f"{header}.{payload}.{_b64(signature)}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.environ.get("LOCAL_PG_DSN"))
+    parser.add_argument("--datadir", default=".cache/pgdata", help="pgserver data directory (without --dsn)")
+    parser.add_argument("--recipes", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    dsn = args.dsn or start_pgserver(args.datadir)
+    t0 = time.perf_counter()
+    reset(dsn)
+    counts = seed(dsn, args.recipes, args.seed)
+    print(f"Migrated and seeded in {time.perf_counter() - t0:.1f} s: {counts}", file=sys.stderr)
+    print(f"DATABASE_URL={dsn}")
+    print(f"SUPABASE_JWT_SECRET={JWT_SECRET}")
+    print(f"# editor token: {mint_token(user_id(0))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
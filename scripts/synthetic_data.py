@@ -0,0 +1,131 @@
+"""
+Synthetic cookbook for benchmarks and load tests (deterministic for a given --seed).
+
+    # Import file for a dev project (load it with Add Recipe > Import)
+    python scripts/synthetic_data.py --recipes 100000 --out synthetic.jsonl
+
+pages() yields the same recipes as export pages (see app.lib.exporter), so the
+export path can be benchmarked without a database.
+"""
+import argparse
+import itertools
+import json
+import random
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+SEASONS = ["winter", "spring", "summer", "fall"]
+UNITS = ["g", "kg", "mL", "L", "tbsp", "tsp", "pinch", None]
+WORDS = [
+    "leek", "tomato", "onion", "garlic", "butter", "flour", "egg", "milk", "cream", "carrot",
+    "potato", "rice", "lentil", "chickpea", "basil", "parsley", "thyme", "lemon", "apple", "pear",
+    "chicken", "beef", "salmon", "cod", "mushroom", "spinach", "zucchini", "pepper", "cheese", "honey",
+]
+DISHES = ["soup", "tart", "gratin", "salad", "stew", "pie", "risotto", "curry", "cake", "roast"]
+
+
+def ingredient_names(n: int = 2000) -> List[str]:
+    names = list(WORDS)
+    i = 0
+    while len(names) < n:
+        names.append(f"{WORDS[i % len(WORDS)]} {WORDS[(i * 7 + 3) % len(WORDS)]} {i}")
+        i += 1
+    return names[:n]
+
+
+def recipes(n: int, seed: int = 42, users: int = 50) -> Iterator[Dict]:
+    """Recipes in the importer's record shape (name, seasons, ..., ingredients)."""
+    rng = random.Random(seed)
+    names = ingredient_names()
+    # A few ingredients are used a lot (1/rank weights)
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(names))))
+    for i in range(n):
+        picked = set()
+        while len(picked) < rng.randint(3, 12):
+            picked.add(rng.choices(names, cum_weights=cum_weights)[0])
+        yield {
+            "name": f"{rng.choice(WORDS).title()} {rng.choice(DISHES)} #{i}",
+            "seasons": sorted(rng.sample(SEASONS, rng.randint(1, 4))),
+            "servings": rng.randint(1, 8),
+            "prep_minutes": rng.randrange(0, 60, 5),
+            "cook_minutes": rng.randrange(0, 180, 5),
+            "instructions": "\n".join(f"Step {s + 1}: {rng.choice(WORDS)} {rng.choice(DISHES)}." for s in range(rng.randint(2, 8))),
+            "notes": rng.choice([None, "Family favourite.", "Better the next day."]),
+            "ingredients": [
+                {"name": nm, "quantity": str(rng.randint(1, 500)), "unit": rng.choice(UNITS), "comment": None}
+                for nm in sorted(picked)
+            ],
+            "_user": f"user-{rng.randrange(users)}",
+        }
+
+
+def pages(n: int, page_size: int = 500, seed: int = 42) -> Iterator[Dict]:
+    """Export pages ({recipes, seasons, links, creators}) for n synthetic recipes."""
+    creators = {f"user-{u}": f"Cook {u}" for u in range(50)}
+    ingredient_ids = {nm: str(uuid.UUID(int=i + 1)) for i, nm in enumerate(ingredient_names())}
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    page = {"recipes": [], "seasons": [], "links": [], "creators": creators}
+    for i, r in enumerate(recipes(n, seed)):
+        rid = str(uuid.UUID(int=(1 << 64) + i))
+        ts = (t0 + timedelta(minutes=i)).isoformat()
+        page["recipes"].append({
+            "id": rid,
+            "name": r["name"],
+            "servings": r["servings"],
+            "prep_minutes": r["prep_minutes"],
+            "cook_minutes": r["cook_minutes"],
+            "total_minutes": r["prep_minutes"] + r["cook_minutes"],
+            "created_by": r["_user"],
+            "instructions": r["instructions"],
+            "notes": r["notes"],
+            "created_at": ts,
+            "updated_at": ts,
+        })
+        page["seasons"] += [{"recipe_id": rid, "season": s} for s in r["seasons"]]
+        page["links"] += [
+            {"recipe_id": rid, "ingredient_id": ingredient_ids[ln["name"]], "quantity": ln["quantity"],
+             "unit": ln["unit"], "comment": ln["comment"], "ingredient_name": ln["name"]}
+            for ln in r["ingredients"]
+        ]
+        if len(page["recipes"]) >= page_size:
+            yield page
+            page = {"recipes": [], "seasons": [], "links": [], "creators": creators}
+    if page["recipes"]:
+        yield page
+
+
+def catalog(n: int, seed: int = 42) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """(recipes, links, seasons) shaped like the cached catalog tables in app.lib.repos."""
+    recipes_, links, seasons = [], [], []
+    for page in pages(n, page_size=1000, seed=seed):
+        recipes_ += page["recipes"]
+        links += page["links"]
+        seasons += page["seasons"]
+    return recipes_, links, seasons
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Write a synthetic cookbook as an import file (JSON Lines).")
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        for r in recipes(args.recipes, args.seed):
+            r.pop("_user")
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    print(f"Wrote {args.recipes} recipes to {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+-- =========================
+-- Session bootstrap (one round trip per access token)
+-- Ensures the caller's profile row exists, then returns
+-- role + names so the app doesn't need a select/insert/select dance.
+-- Runs as the caller, so the "profiles: insert own" policy still applies.
+-- =========================
+create or replace function public.bootstrap_session()
+returns jsonb
+language plpgsql
+security invoker
+as $$
+declare
+  result jsonb;
+begin
+  if auth.uid() is null then
+    raise exception 'bootstrap_session: not authenticated';
+  end if;
+
+  insert into public.profiles (id, role)
+  values (auth.uid(), 'reader')
+  on conflict (id) do nothing;
+
+  select jsonb_build_object(
+    'id', p.id,
+    'role', p.role,
+    'first_name', p.first_name,
+    'last_name', p.last_name,
+    'display_name', nullif(trim(coalesce(p.first_name, '') || ' ' || coalesce(p.last_name, '')), '')
+  )
+  into result
+  from public.profiles p
+  where p.id = auth.uid();
+
+  return result;
+end;
+$$;
+
+grant execute on function public.bootstrap_session() to authenticated;
@@ -0,0 +1,49 @@
+-- =========================
+-- Diff-based recipe save (one round trip)
+-- The app sends ONLY what changed: a partial field patch plus the seasons to
+-- add / remove. Runs as the caller, so the recipes / recipe_seasons RLS
+-- policies (editor + owner) still apply.
+-- =========================
+create or replace function public.save_recipe_changes(
+  p_recipe_id uuid,
+  p_patch jsonb default '{}'::jsonb,
+  p_add_seasons public.season_enum[] default '{}',
+  p_remove_seasons public.season_enum[] default '{}'
+)
+returns void
+language plpgsql
+security invoker
+as $$
+begin
+  if p_patch is not null and p_patch <> '{}'::jsonb then
+    update public.recipes r
+    set
+      name         = case when p_patch ? 'name'         then p_patch->>'name'                   else r.name end,
+      servings     = case when p_patch ? 'servings'     then (p_patch->>'servings')::integer     else r.servings end,
+      prep_minutes = case when p_patch ? 'prep_minutes' then (p_patch->>'prep_minutes')::integer else r.prep_minutes end,
+      cook_minutes = case when p_patch ? 'cook_minutes' then (p_patch->>'cook_minutes')::integer else r.cook_minutes end,
+      instructions = case when p_patch ? 'instructions' then p_patch->>'instructions'           else r.instructions end,
+      notes        = case when p_patch ? 'notes'        then p_patch->>'notes'                  else r.notes end
+    where r.id = p_recipe_id;
+
+    if not found then
+      raise exception 'save_recipe_changes: recipe % not found (or not yours)', p_recipe_id;
+    end if;
+  end if;
+
+  if cardinality(p_remove_seasons) > 0 then
+    delete from public.recipe_seasons
+    where recipe_id = p_recipe_id
+      and season = any(p_remove_seasons);
+  end if;
+
+  if cardinality(p_add_seasons) > 0 then
+    insert into public.recipe_seasons (recipe_id, season)
+    select p_recipe_id, s
+    from unnest(p_add_seasons) as s
+    on conflict do nothing;
+  end if;
+end;
+$$;
+
+grant execute on function public.save_recipe_changes(uuid, jsonb, public.season_enum[], public.season_enum[]) to authenticated;
@@ -0,0 +1,65 @@
+-- =========================================================
+-- RECIPE_INGREDIENTS: batched line editing
+-- =========================================================
+
+-- Editors can update links ONLY for recipes they own
+-- (needed by the upsert below; single-line updates were silently no-ops without it)
+drop policy if exists "recipe_ingredients: update own (editor)" on public.recipe_ingredients;
+create policy "recipe_ingredients: update own (editor)"
+on public.recipe_ingredients
+for update
+to authenticated
+using (
+  exists (
+    select 1 from public.profiles p
+    where p.id = auth.uid() and p.role = 'editor'
+  )
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = auth.uid()
+  )
+)
+with check (
+  exists (
+    select 1 from public.profiles p
+    where p.id = auth.uid() and p.role = 'editor'
+  )
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = auth.uid()
+  )
+);
+
+-- Apply a whole grid edit in ONE round trip / one transaction:
+--   p_upserts    = [{"ingredient_id": ..., "quantity": ..., "unit": ..., "comment": ...}, ...]
+--   p_delete_ids = ingredient ids whose line must be removed
+-- Runs as the caller, so the policies above still apply.
+create or replace function public.apply_recipe_ingredient_lines(
+  p_recipe_id uuid,
+  p_upserts jsonb default '[]'::jsonb,
+  p_delete_ids uuid[] default '{}'
+)
+returns void
+language plpgsql
+security invoker
+as $$
+begin
+  if cardinality(p_delete_ids) > 0 then
+    delete from public.recipe_ingredients
+    where recipe_id = p_recipe_id
+      and ingredient_id = any(p_delete_ids);
+  end if;
+
+  if p_upserts is not null and jsonb_array_length(p_upserts) > 0 then
+    insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity, unit, comment)
+    select p_recipe_id, x.ingredient_id, nullif(x.quantity, ''), nullif(x.unit, ''), nullif(x.comment, '')
+    from jsonb_to_recordset(p_upserts) as x(ingredient_id uuid, quantity text, unit text, comment text)
+    on conflict (recipe_id, ingredient_id) do update
+    set quantity = excluded.quantity,
+        unit = excluded.unit,
+        comment = excluded.comment;
+  end if;
+end;
+$$;
+
+grant execute on function public.apply_recipe_ingredient_lines(uuid, jsonb, uuid[]) to authenticated;
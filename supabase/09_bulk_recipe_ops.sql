@@ -0,0 +1,50 @@
+-- =========================
+-- Bulk season re-tagging (one round trip for N recipes)
+-- p_mode:
+--   'replace' -> each recipe ends up with exactly p_seasons
+--   'add'     -> p_seasons are added, existing ones kept
+--   'remove'  -> p_seasons are removed, others kept
+-- Runs as the caller, so the recipe_seasons RLS policies (editor + owner)
+-- still apply: a recipe that isn't yours makes the whole call fail.
+-- (Bulk delete / bulk field edit need no function: they are plain
+-- DELETE / UPDATE ... WHERE id IN (...) requests.)
+-- =========================
+create or replace function public.bulk_set_recipe_seasons(
+  p_recipe_ids uuid[],
+  p_seasons public.season_enum[] default '{}',
+  p_mode text default 'replace'
+)
+returns void
+language plpgsql
+security invoker
+as $$
+begin
+  if p_mode not in ('replace', 'add', 'remove') then
+    raise exception 'bulk_set_recipe_seasons: unknown mode %', p_mode;
+  end if;
+
+  if cardinality(p_recipe_ids) = 0 then
+    return;
+  end if;
+
+  if p_mode = 'replace' then
+    delete from public.recipe_seasons
+    where recipe_id = any(p_recipe_ids)
+      and not (season = any(p_seasons));
+  elsif p_mode = 'remove' then
+    delete from public.recipe_seasons
+    where recipe_id = any(p_recipe_ids)
+      and season = any(p_seasons);
+  end if;
+
+  if p_mode in ('replace', 'add') and cardinality(p_seasons) > 0 then
+    insert into public.recipe_seasons (recipe_id, season)
+    select r, s
+    from unnest(p_recipe_ids) as r
+    cross join unnest(p_seasons) as s
+    on conflict do nothing;
+  end if;
+end;
+$$;
+
+grant execute on function public.bulk_set_recipe_seasons(uuid[], public.season_enum[], text) to authenticated;
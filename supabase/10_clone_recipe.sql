@@ -0,0 +1,44 @@
+-- =========================
+-- Server-side recipe clone (one round trip, one transaction)
+-- Copies the recipe row, its seasons and its ingredient lines with
+-- insert ... select. The copy belongs to the caller and is named
+-- "<name> (copy)". Runs as the caller: the source only has to be readable
+-- (any recipe), the inserts go through the editor + owner policies.
+-- =========================
+create or replace function public.clone_recipe(p_recipe_id uuid)
+returns public.recipes
+language plpgsql
+security invoker
+as $$
+declare
+  result public.recipes;
+begin
+  if auth.uid() is null then
+    raise exception 'clone_recipe: not authenticated';
+  end if;
+
+  insert into public.recipes (name, servings, prep_minutes, cook_minutes, instructions, notes, created_by)
+  select r.name || ' (copy)', r.servings, r.prep_minutes, r.cook_minutes, r.instructions, r.notes, auth.uid()
+  from public.recipes r
+  where r.id = p_recipe_id
+  returning * into result;
+
+  if result.id is null then
+    raise exception 'clone_recipe: recipe % not found', p_recipe_id;
+  end if;
+
+  insert into public.recipe_seasons (recipe_id, season)
+  select result.id, s.season
+  from public.recipe_seasons s
+  where s.recipe_id = p_recipe_id;
+
+  insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity, unit, comment)
+  select result.id, ri.ingredient_id, ri.quantity, ri.unit, ri.comment
+  from public.recipe_ingredients ri
+  where ri.recipe_id = p_recipe_id;
+
+  return result;
+end;
+$$;
+
+grant execute on function public.clone_recipe(uuid) to authenticated;
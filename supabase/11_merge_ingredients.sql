@@ -0,0 +1,109 @@
+-- =========================
+-- Ingredient merge / deduplication (one round trip, one transaction)
+-- p_merges = [{"target": <ingredient id to keep>, "sources": [<ids to merge into it>]}, ...]
+--
+-- For every recipe using a source ingredient:
+--   - recipe doesn't use the target yet -> one source line is repointed to the target
+--   - recipe already has a target line  -> the other lines are folded into its
+--     comment ("qty unit comment"), then removed (the primary key
+--     (recipe_id, ingredient_id) can't hold two lines for the same ingredient)
+-- Finally the source ingredients are deleted.
+--
+-- Lines belong to every user's recipes, which the per-owner policies don't
+-- allow to touch: the function runs as its owner (security definer) and checks
+-- the editor role itself.
+-- =========================
+create or replace function public.merge_ingredients(p_merges jsonb)
+returns jsonb
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_sources uuid[];
+  v_targets uuid[];
+  v_repointed integer := 0;
+  v_folded integer := 0;
+  v_deleted integer := 0;
+begin
+  if not exists (
+    select 1 from public.profiles p
+    where p.id = auth.uid() and p.role = 'editor'
+  ) then
+    raise exception 'merge_ingredients: editors only';
+  end if;
+
+  select array_agg(s::uuid), array_agg((g->>'target')::uuid)
+  into v_sources, v_targets
+  from jsonb_array_elements(coalesce(p_merges, '[]'::jsonb)) as g
+  cross join lateral jsonb_array_elements_text(g->'sources') as s
+  where s::uuid <> (g->>'target')::uuid;
+
+  if v_sources is null then
+    return jsonb_build_object('repointed', 0, 'folded', 0, 'deleted', 0);
+  end if;
+
+  if cardinality(v_sources) <> (select count(distinct s) from unnest(v_sources) as s) then
+    raise exception 'merge_ingredients: an ingredient is merged into two targets';
+  end if;
+
+  if v_sources && v_targets then
+    raise exception 'merge_ingredients: an ingredient is both merged and kept';
+  end if;
+
+  -- 1) Recipes without a target line: repoint ONE source line per (recipe, target)
+  with m as (
+    select * from unnest(v_sources, v_targets) as m(source_id, target_id)
+  ),
+  pick as (
+    select distinct on (ri.recipe_id, m.target_id) ri.recipe_id, ri.ingredient_id, m.target_id
+    from public.recipe_ingredients ri
+    join m on m.source_id = ri.ingredient_id
+    where not exists (
+      select 1 from public.recipe_ingredients t
+      where t.recipe_id = ri.recipe_id and t.ingredient_id = m.target_id
+    )
+    order by ri.recipe_id, m.target_id, ri.ingredient_id
+  )
+  update public.recipe_ingredients ri
+  set ingredient_id = pick.target_id
+  from pick
+  where ri.recipe_id = pick.recipe_id
+    and ri.ingredient_id = pick.ingredient_id;
+  get diagnostics v_repointed = row_count;
+
+  -- 2) Remaining source lines conflict with a target line: keep their text in its comment
+  with m as (
+    select * from unnest(v_sources, v_targets) as m(source_id, target_id)
+  ),
+  extra as (
+    select
+      ri.recipe_id,
+      m.target_id,
+      string_agg(nullif(concat_ws(' ', ri.quantity, ri.unit, ri.comment), ''), '; ') as text
+    from public.recipe_ingredients ri
+    join m on m.source_id = ri.ingredient_id
+    group by ri.recipe_id, m.target_id
+  )
+  update public.recipe_ingredients t
+  set comment = concat_ws('; ', nullif(t.comment, ''), extra.text)
+  from extra
+  where t.recipe_id = extra.recipe_id
+    and t.ingredient_id = extra.target_id
+    and extra.text is not null;
+
+  delete from public.recipe_ingredients
+  where ingredient_id = any(v_sources);
+  get diagnostics v_folded = row_count;
+
+  -- 3) The merged ingredients are now unused
+  delete from public.ingredients
+  where id = any(v_sources);
+  get diagnostics v_deleted = row_count;
+
+  return jsonb_build_object('repointed', v_repointed, 'folded', v_folded, 'deleted', v_deleted);
+end;
+$$;
+
+revoke execute on function public.merge_ingredients(jsonb) from public;
+grant execute on function public.merge_ingredients(jsonb) to authenticated;
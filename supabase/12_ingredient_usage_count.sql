@@ -0,0 +1,67 @@
+-- =========================
+-- ingredients.usage_count: number of recipe lines using the ingredient
+-- Used to rank autocomplete suggestions. Maintained by statement-level
+-- triggers on recipe_ingredients (transition tables), so a batched write
+-- (grid save, clone, merge, recipe delete cascade) costs one UPDATE per
+-- statement, not one per line.
+-- =========================
+alter table public.ingredients
+add column if not exists usage_count integer not null default 0;
+
+-- Backfill
+update public.ingredients i
+set usage_count = coalesce(c.n, 0)
+from (
+  select ing.id, count(ri.ingredient_id) as n
+  from public.ingredients ing
+  left join public.recipe_ingredients ri on ri.ingredient_id = ing.id
+  group by ing.id
+) c
+where c.id = i.id
+  and i.usage_count is distinct from coalesce(c.n, 0);
+
+-- Runs as its owner: ingredients has no UPDATE policy for editors,
+-- and the count must follow writes on everyone's recipes.
+create or replace function public.track_ingredient_usage()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if tg_op in ('INSERT', 'UPDATE') then
+    update public.ingredients i
+    set usage_count = i.usage_count + d.n
+    from (select ingredient_id, count(*) as n from new_rows group by ingredient_id) d
+    where i.id = d.ingredient_id;
+  end if;
+
+  if tg_op in ('DELETE', 'UPDATE') then
+    update public.ingredients i
+    set usage_count = greatest(i.usage_count - d.n, 0)
+    from (select ingredient_id, count(*) as n from old_rows group by ingredient_id) d
+    where i.id = d.ingredient_id;
+  end if;
+
+  return null;
+end;
+$$;
+
+-- One trigger per event: a trigger with transition tables can only have one
+drop trigger if exists trg_ingredient_usage_insert on public.recipe_ingredients;
+create trigger trg_ingredient_usage_insert
+after insert on public.recipe_ingredients
+referencing new table as new_rows
+for each statement execute function public.track_ingredient_usage();
+
+drop trigger if exists trg_ingredient_usage_update on public.recipe_ingredients;
+create trigger trg_ingredient_usage_update
+after update on public.recipe_ingredients
+referencing old table as old_rows new table as new_rows
+for each statement execute function public.track_ingredient_usage();
+
+drop trigger if exists trg_ingredient_usage_delete on public.recipe_ingredients;
+create trigger trg_ingredient_usage_delete
+after delete on public.recipe_ingredients
+referencing old table as old_rows
+for each statement execute function public.track_ingredient_usage();
@@ -0,0 +1,58 @@
+-- =========================
+-- Bulk recipe import (one round trip per chunk, one transaction)
+-- p_recipes = [{
+--   "id": <uuid generated by the app>, "name": ..., "servings": ..., "prep_minutes": ...,
+--   "cook_minutes": ..., "instructions": ..., "notes": ...,
+--   "seasons": ["winter", ...],
+--   "lines": [{"ingredient_id": ..., "quantity": ..., "unit": ..., "comment": ...}, ...]
+-- }, ...]
+-- Recipes, seasons and ingredient lines are written with three multi-row
+-- insert ... select statements. Ids come from the app so it can map rows back
+-- without relying on RETURNING order. Runs as the caller: the usual editor +
+-- owner policies apply, and created_by is always the caller.
+-- =========================
+create or replace function public.import_recipes(p_recipes jsonb)
+returns integer
+language plpgsql
+security invoker
+as $$
+declare
+  v_count integer;
+begin
+  if auth.uid() is null then
+    raise exception 'import_recipes: not authenticated';
+  end if;
+
+  insert into public.recipes (id, name, servings, prep_minutes, cook_minutes, instructions, notes, created_by)
+  select
+    r.id,
+    r.name,
+    coalesce(r.servings, 1),
+    coalesce(r.prep_minutes, 0),
+    coalesce(r.cook_minutes, 0),
+    nullif(r.instructions, ''),
+    nullif(r.notes, ''),
+    auth.uid()
+  from jsonb_to_recordset(p_recipes) as r(
+    id uuid, name text, servings integer, prep_minutes integer, cook_minutes integer,
+    instructions text, notes text
+  );
+  get diagnostics v_count = row_count;
+
+  insert into public.recipe_seasons (recipe_id, season)
+  select (r->>'id')::uuid, s::public.season_enum
+  from jsonb_array_elements(p_recipes) as r
+  cross join lateral jsonb_array_elements_text(coalesce(r->'seasons', '[]'::jsonb)) as s
+  on conflict do nothing;
+
+  insert into public.recipe_ingredients (recipe_id, ingredient_id, quantity, unit, comment)
+  select (r->>'id')::uuid, l.ingredient_id, nullif(l.quantity, ''), nullif(l.unit, ''), nullif(l.comment, '')
+  from jsonb_array_elements(p_recipes) as r
+  cross join lateral jsonb_to_recordset(coalesce(r->'lines', '[]'::jsonb))
+    as l(ingredient_id uuid, quantity text, unit text, comment text);
+
+  return v_count;
+end;
+$$;
+
+grant execute on function public.import_recipes(jsonb) to authenticated;
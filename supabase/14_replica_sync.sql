@@ -0,0 +1,106 @@
+-- =========================
+-- Incremental sync support (local read replica, see app/lib/replica.py)
+-- A client keeps a cursor on recipes.updated_at and asks for "what changed
+-- since". Two things are needed for that to be complete:
+--   1) editing a recipe's seasons / ingredient lines bumps recipes.updated_at
+--      (then the replica re-fetches that recipe's children);
+--   2) deleted recipes leave a tombstone, since a deleted row can't be
+--      returned by "updated_at > cursor".
+-- =========================
+
+-- 1) Touch the parent recipe when its children change (one UPDATE per statement)
+create or replace function public.touch_recipes_from_children()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  if tg_op in ('INSERT', 'UPDATE') then
+    update public.recipes r
+    set updated_at = now()
+    where r.id in (select distinct recipe_id from new_rows);
+  end if;
+
+  if tg_op in ('DELETE', 'UPDATE') then
+    update public.recipes r
+    set updated_at = now()
+    where r.id in (select distinct recipe_id from old_rows);
+  end if;
+
+  return null;
+end;
+$$;
+
+drop trigger if exists trg_touch_recipe_seasons_insert on public.recipe_seasons;
+create trigger trg_touch_recipe_seasons_insert
+after insert on public.recipe_seasons
+referencing new table as new_rows
+for each statement execute function public.touch_recipes_from_children();
+
+drop trigger if exists trg_touch_recipe_seasons_delete on public.recipe_seasons;
+create trigger trg_touch_recipe_seasons_delete
+after delete on public.recipe_seasons
+referencing old table as old_rows
+for each statement execute function public.touch_recipes_from_children();
+
+drop trigger if exists trg_touch_recipe_ingredients_insert on public.recipe_ingredients;
+create trigger trg_touch_recipe_ingredients_insert
+after insert on public.recipe_ingredients
+referencing new table as new_rows
+for each statement execute function public.touch_recipes_from_children();
+
+drop trigger if exists trg_touch_recipe_ingredients_update on public.recipe_ingredients;
+create trigger trg_touch_recipe_ingredients_update
+after update on public.recipe_ingredients
+referencing old table as old_rows new table as new_rows
+for each statement execute function public.touch_recipes_from_children();
+
+drop trigger if exists trg_touch_recipe_ingredients_delete on public.recipe_ingredients;
+create trigger trg_touch_recipe_ingredients_delete
+after delete on public.recipe_ingredients
+referencing old table as old_rows
+for each statement execute function public.touch_recipes_from_children();
+
+create index if not exists idx_recipes_updated_at on public.recipes(updated_at, id);
+
+-- 2) Tombstones for deleted recipes (kept 30 days; older replicas resync fully)
+create table if not exists public.recipe_tombstones (
+  recipe_id uuid primary key,
+  deleted_at timestamptz not null default now()
+);
+
+create index if not exists idx_recipe_tombstones_deleted_at on public.recipe_tombstones(deleted_at);
+
+alter table public.recipe_tombstones enable row level security;
+
+drop policy if exists "recipe_tombstones: read all" on public.recipe_tombstones;
+create policy "recipe_tombstones: read all"
+on public.recipe_tombstones
+for select
+to authenticated
+using (true);
+
+create or replace function public.record_recipe_tombstones()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  insert into public.recipe_tombstones (recipe_id, deleted_at)
+  select id, now() from old_rows
+  on conflict (recipe_id) do update set deleted_at = excluded.deleted_at;
+
+  delete from public.recipe_tombstones
+  where deleted_at < now() - interval '30 days';
+
+  return null;
+end;
+$$;
+
+drop trigger if exists trg_recipe_tombstones on public.recipes;
+create trigger trg_recipe_tombstones
+after delete on public.recipes
+referencing old table as old_rows
+for each statement execute function public.record_recipe_tombstones();
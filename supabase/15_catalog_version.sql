@@ -0,0 +1,99 @@
+-- =========================
+-- Data versions of the cached tables (see app/lib/repos.py)
+-- catalog_version holds one counter per table, bumped once per statement that
+-- changes at least one row. Clients probe get_catalog_versions() (a few bytes)
+-- and only reload a cached table when its counter moved, instead of
+-- re-downloading it every TTL.
+-- A bump row-locks that table's counter until commit: concurrent writes to
+-- the same table serialize on it (fine at this app's write rate).
+-- =========================
+create table if not exists public.catalog_version (
+  table_name text primary key,
+  version bigint not null default 0,
+  changed_at timestamptz not null default now()
+);
+
+insert into public.catalog_version (table_name)
+values ('recipes'), ('recipe_ingredients'), ('recipe_seasons'), ('ingredients'), ('profiles')
+on conflict (table_name) do nothing;
+
+alter table public.catalog_version enable row level security;
+
+drop policy if exists "catalog_version: read all" on public.catalog_version;
+create policy "catalog_version: read all"
+on public.catalog_version
+for select
+to authenticated
+using (true);
+
+-- Runs as its owner: nobody has a write policy on catalog_version
+create or replace function public.bump_catalog_version()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  -- Statements that matched no row don't count (nested ifs: a transition
+  -- table the trigger doesn't define must not even be planned)
+  if tg_op = 'INSERT' then
+    if not exists (select 1 from new_rows) then
+      return null;
+    end if;
+  elsif tg_op in ('UPDATE', 'DELETE') then
+    if not exists (select 1 from old_rows) then
+      return null;
+    end if;
+  end if;
+
+  update public.catalog_version
+  set version = version + 1, changed_at = now()
+  where table_name = tg_table_name;
+
+  return null;
+end;
+$$;
+
+do $$
+declare
+  t text;
+begin
+  foreach t in array array['recipes', 'recipe_ingredients', 'recipe_seasons', 'ingredients', 'profiles'] loop
+    execute format('drop trigger if exists trg_catalog_version_insert on public.%I', t);
+    execute format(
+      'create trigger trg_catalog_version_insert after insert on public.%I '
+      'referencing new table as new_rows '
+      'for each statement execute function public.bump_catalog_version()', t);
+
+    execute format('drop trigger if exists trg_catalog_version_update on public.%I', t);
+    execute format(
+      'create trigger trg_catalog_version_update after update on public.%I '
+      'referencing old table as old_rows new table as new_rows '
+      'for each statement execute function public.bump_catalog_version()', t);
+
+    execute format('drop trigger if exists trg_catalog_version_delete on public.%I', t);
+    execute format(
+      'create trigger trg_catalog_version_delete after delete on public.%I '
+      'referencing old table as old_rows '
+      'for each statement execute function public.bump_catalog_version()', t);
+
+    execute format('drop trigger if exists trg_catalog_version_truncate on public.%I', t);
+    execute format(
+      'create trigger trg_catalog_version_truncate after truncate on public.%I '
+      'for each statement execute function public.bump_catalog_version()', t);
+  end loop;
+end $$;
+
+-- {"recipes": 12, "recipe_ingredients": 40, ...}
+create or replace function public.get_catalog_versions()
+returns jsonb
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+  select coalesce(jsonb_object_agg(table_name, version), '{}'::jsonb)
+  from public.catalog_version;
+$$;
+
+grant execute on function public.get_catalog_versions() to authenticated;
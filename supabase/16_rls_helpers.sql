@@ -0,0 +1,176 @@
+-- =========================
+-- RLS policies: evaluate the caller's identity once per statement
+-- Policies used to call auth.uid() and probe profiles for the editor role on
+-- every row checked: a 50-line insert ran 100 subqueries. Now:
+--   - auth.uid() and is_editor() are wrapped in (select ...), which Postgres
+--     plans as an InitPlan: computed once per statement, not per row;
+--   - is_editor() is a STABLE SECURITY DEFINER helper, so its lookup skips
+--     the RLS of profiles;
+--   - the owner check of recipe_ingredients / recipe_seasons depends on the
+--     row, so it stays an inline primary-key probe of recipes (a helper
+--     function there can't be inlined: it measured ~2x slower per row), now
+--     with the caller's id computed once.
+-- Same rules as 02_rls.sql, 03_policies.sql and 08_recipe_ingredient_lines.sql.
+-- =========================
+
+create or replace function public.is_editor()
+returns boolean
+language sql
+stable
+security definer
+set search_path = public
+as $$
+  select exists (
+    select 1 from public.profiles p
+    where p.id = (select auth.uid()) and p.role = 'editor'
+  );
+$$;
+
+revoke execute on function public.is_editor() from public;
+grant execute on function public.is_editor() to authenticated;
+
+-- =========================================================
+-- PROFILES
+-- =========================================================
+drop policy if exists "profiles: update own" on public.profiles;
+create policy "profiles: update own"
+on public.profiles
+for update
+to authenticated
+using (id = (select auth.uid()))
+with check (id = (select auth.uid()));
+
+drop policy if exists "profiles: insert own" on public.profiles;
+create policy "profiles: insert own"
+on public.profiles
+for insert
+to authenticated
+with check (
+  id = (select auth.uid())
+  and role = 'reader'
+);
+
+-- =========================================================
+-- RECIPES
+-- =========================================================
+drop policy if exists "recipes: insert (editor)" on public.recipes;
+create policy "recipes: insert (editor)"
+on public.recipes
+for insert
+to authenticated
+with check (
+  (select public.is_editor())
+  and created_by = (select auth.uid())
+);
+
+drop policy if exists "recipes: update own (editor)" on public.recipes;
+create policy "recipes: update own (editor)"
+on public.recipes
+for update
+to authenticated
+using (
+  created_by = (select auth.uid())
+  and (select public.is_editor())
+)
+with check (
+  created_by = (select auth.uid())
+  and (select public.is_editor())
+);
+
+drop policy if exists "recipes: delete own (editor)" on public.recipes;
+create policy "recipes: delete own (editor)"
+on public.recipes
+for delete
+to authenticated
+using (
+  created_by = (select auth.uid())
+  and (select public.is_editor())
+);
+
+-- =========================================================
+-- INGREDIENTS
+-- =========================================================
+drop policy if exists "ingredients: insert (editor)" on public.ingredients;
+create policy "ingredients: insert (editor)"
+on public.ingredients
+for insert
+to authenticated
+with check ((select public.is_editor()));
+
+-- =========================================================
+-- RECIPE_INGREDIENTS
+-- =========================================================
+drop policy if exists "recipe_ingredients: insert own (editor)" on public.recipe_ingredients;
+create policy "recipe_ingredients: insert own (editor)"
+on public.recipe_ingredients
+for insert
+to authenticated
+with check (
+  (select public.is_editor())
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = (select auth.uid())
+  )
+);
+
+drop policy if exists "recipe_ingredients: update own (editor)" on public.recipe_ingredients;
+create policy "recipe_ingredients: update own (editor)"
+on public.recipe_ingredients
+for update
+to authenticated
+using (
+  (select public.is_editor())
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = (select auth.uid())
+  )
+)
+with check (
+  (select public.is_editor())
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = (select auth.uid())
+  )
+);
+
+drop policy if exists "recipe_ingredients: delete own (editor)" on public.recipe_ingredients;
+create policy "recipe_ingredients: delete own (editor)"
+on public.recipe_ingredients
+for delete
+to authenticated
+using (
+  (select public.is_editor())
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = (select auth.uid())
+  )
+);
+
+-- =========================================================
+-- RECIPE_SEASONS
+-- =========================================================
+drop policy if exists "recipe_seasons: insert own (editor)" on public.recipe_seasons;
+create policy "recipe_seasons: insert own (editor)"
+on public.recipe_seasons
+for insert
+to authenticated
+with check (
+  (select public.is_editor())
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = (select auth.uid())
+  )
+);
+
+drop policy if exists "recipe_seasons: delete own (editor)" on public.recipe_seasons;
+create policy "recipe_seasons: delete own (editor)"
+on public.recipe_seasons
+for delete
+to authenticated
+using (
+  (select public.is_editor())
+  and exists (
+    select 1 from public.recipes r
+    where r.id = recipe_id and r.created_by = (select auth.uid())
+  )
+);
@@ -0,0 +1,54 @@
+-- =========================
+-- Indexes for the hot reads (plans checked by scripts/check_query_plans.py)
+--   - list_recipes orders every recipe by name: idx_recipes_name returns them
+--     in order, no sort;
+--   - list_my_recipes filters created_by and orders by created_at desc: one
+--     composite index instead of a bitmap scan + sort. It also serves every
+--     created_by lookup (RLS owner checks, the auth.users foreign key), so the
+--     single-column index goes;
+--   - the dictionary pages (order by name, id) and find_ingredient_by_name
+--     read only id, name and usage_count: covered by idx_ingredients_name_id
+--     (index-only scans);
+--   - recipe_ingredients / recipe_seasons lookups by recipe_id already use the
+--     primary keys (recipe_id first): their single-column copies only cost
+--     writes, so they go;
+--   - name search (name ilike '%...%') gets a trigram index when pg_trgm is
+--     available.
+-- =========================
+create index if not exists idx_recipes_name on public.recipes(name);
+
+create index if not exists idx_recipes_created_by_created_at
+on public.recipes(created_by, created_at desc);
+drop index if exists public.idx_recipes_created_by;
+
+create index if not exists idx_ingredients_name_id
+on public.ingredients(name, id) include (usage_count);
+
+drop index if exists public.idx_recipe_ingredients_recipe_id;
+drop index if exists public.idx_recipe_seasons_recipe_id;
+
+-- pg_trgm lives in the `extensions` schema on Supabase; skipped (with a
+-- notice) on servers built without it
+do $$
+declare
+  trgm_schema text;
+begin
+  if not exists (select 1 from pg_available_extensions where name = 'pg_trgm') then
+    raise notice 'pg_trgm is not available: idx_recipes_name_trgm not created';
+    return;
+  end if;
+
+  if not exists (select 1 from pg_extension where extname = 'pg_trgm') then
+    create schema if not exists extensions;
+    create extension pg_trgm with schema extensions;
+  end if;
+
+  select n.nspname into trgm_schema
+  from pg_extension e
+  join pg_namespace n on n.oid = e.extnamespace
+  where e.extname = 'pg_trgm';
+
+  execute format(
+    'create index if not exists idx_recipes_name_trgm on public.recipes using gin (name %I.gin_trgm_ops)',
+    trgm_schema);
+end $$;
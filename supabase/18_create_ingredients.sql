@@ -0,0 +1,32 @@
+-- =========================
+-- Bulk ingredient creation (importer, one round trip per chunk)
+-- Inserts the names that don't exist yet under the ingredients_name_norm_unique
+-- rule (lower(trim(name)), supabase/00_tables.sql), skipping the others, then
+-- returns {id, name} of the ingredient behind EVERY requested name: existing
+-- ones keep their stored spelling ("Basil" for a requested "basil").
+-- The select is a separate statement so that it also sees a conflicting row
+-- another session committed while the insert waited on it.
+-- Runs as the caller: the editor insert policy applies.
+-- =========================
+create or replace function public.create_ingredients(p_names text[])
+returns table (id uuid, name text)
+language plpgsql
+security invoker
+set search_path = public
+as $$
+begin
+  insert into public.ingredients (name)
+  select distinct on (lower(trim(n))) trim(n)
+  from unnest(p_names) as n
+  where trim(coalesce(n, '')) <> ''
+  order by lower(trim(n)), trim(n)
+  on conflict (name_norm) do nothing;
+
+  return query
+  select i.id, i.name
+  from public.ingredients i
+  where i.name_norm in (select lower(trim(n)) from unnest(p_names) as n);
+end;
+$$;
+
+grant execute on function public.create_ingredients(text[]) to authenticated;
@@ -0,0 +1,47 @@
+-- =========================
+-- catalog_version: count only changes the caches can see
+-- Trigger-maintained columns are written by statements of their own:
+--   - ingredients.usage_count on every recipe_ingredients write (12);
+--   - recipes.updated_at on every child-row write (14).
+-- Those updates used to bump the version like an edit, so every ingredient
+-- line edit dropped the ingredient dictionary and every "my recipes" list.
+-- An UPDATE now bumps only if the rows minus those columns changed: the old
+-- and new projections are compared as multisets (no primary key needed, so the
+-- same function serves every table of 15_catalog_version.sql).
+-- =========================
+create or replace function public.bump_catalog_version()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+declare
+  v_ignored constant text[] := array['usage_count', 'updated_at'];
+begin
+  -- Statements that matched no row don't count (nested ifs: a transition
+  -- table the trigger doesn't define must not even be planned)
+  if tg_op = 'INSERT' then
+    if not exists (select 1 from new_rows) then
+      return null;
+    end if;
+  elsif tg_op = 'UPDATE' then
+    if not exists (
+      (select to_jsonb(o) - v_ignored from old_rows o)
+      except all
+      (select to_jsonb(n) - v_ignored from new_rows n)
+    ) then
+      return null;
+    end if;
+  elsif tg_op = 'DELETE' then
+    if not exists (select 1 from old_rows) then
+      return null;
+    end if;
+  end if;
+
+  update public.catalog_version
+  set version = version + 1, changed_at = now()
+  where table_name = tg_table_name;
+
+  return null;
+end;
+$$;
@@ -0,0 +1,38 @@
+-- =========================
+-- create_ingredients: say which rows it inserted
+-- 18_create_ingredients.sql returns the ingredient behind every requested
+-- name, existing or new, so a caller counting "new ingredients" (the
+-- importer's report) counted the existing ones too. Each row now carries
+-- `inserted`: true only for the rows this call created.
+-- The return type changes, so the function is dropped and re-created.
+-- =========================
+drop function if exists public.create_ingredients(text[]);
+
+create function public.create_ingredients(p_names text[])
+returns table (id uuid, name text, inserted boolean)
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_inserted uuid[];
+begin
+  with ins as (
+    insert into public.ingredients (name)
+    select distinct on (lower(trim(n))) trim(n)
+    from unnest(p_names) as n
+    where trim(coalesce(n, '')) <> ''
+    order by lower(trim(n)), trim(n)
+    on conflict (name_norm) do nothing
+    returning ingredients.id
+  )
+  select coalesce(array_agg(ins.id), '{}') into v_inserted from ins;
+
+  return query
+  select i.id, i.name, i.id = any(v_inserted)
+  from public.ingredients i
+  where i.name_norm in (select lower(trim(n)) from unnest(p_names) as n);
+end;
+$$;
+
+grant execute on function public.create_ingredients(text[]) to authenticated;